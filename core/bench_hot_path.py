@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmark untuk hot path per frame di realtime_plank_squat_tflite.py.
+
+Setiap bagian diukur terpisah (tanpa kamera / MediaPipe), pakai frame
+landmark sintetis dari baris squat_model/train.csv:
+
+    plank_features   TFLitePoseClassifier._build_plank_feature_vector
+    squat_features   TFLitePoseClassifier._build_generic_feature_vector
+    plank_predict    TFLitePoseClassifier.predict (termasuk invoke)
+    squat_predict    TFLitePoseClassifier.predict (termasuk invoke)
+    squat_predict_numpy  sama, backend numpy (matmul dari bobot .npz)
+    squat_temporal   TemporalStageClassifier.predict (ring buffer, invoke tiap stride frame)
+    feet_knee        analyze_squat_feet_knee
+    standing         is_standing_pose
+    overlay_text     draw_text_with_outline (frame 640x480)
+    overlay_sprites  TEXT_SPRITES.draw (sprite cache, 20 teks berulang)
+    squat_counter    SquatCounter.update
+    landmarks_array  landmarks_to_array (protobuf -> ndarray)
+    mirror_landmarks mirror_landmarks (pengganti cv2.flip frame sebelum pose)
+    analyze_squat    ExerciseAnalyzer.analyze end-to-end (protobuf input)
+
+Output: us/op (mean, p50, p95, p99) + peak alokasi per op (tracemalloc),
+lalu dibandingkan dengan baseline JSON. Case yang p50-nya lebih lambat dari
+baseline * --tolerance ditandai REGRESSION dan exit code jadi 1.
+
+Contoh:
+    python bench_hot_path.py                       # bandingkan dengan bench_baseline.json
+    python bench_hot_path.py --save-baseline       # update baseline
+    python bench_hot_path.py --only overlay_sprites --save-baseline   # tambah / update 1 case
+    python bench_hot_path.py --only predict --iterations 20000
+"""
+
+import argparse
+import csv
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import cv2
+from mediapipe.framework.formats import landmark_pb2
+
+from realtime_plank_squat_tflite import (
+    JOINT_NAME_TO_MP,
+    NUM_LANDMARKS,
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TEMPORAL_META,
+    SQUAT_TEMPORAL_TFLITE,
+    SQUAT_TFLITE,
+    ExerciseAnalyzer,
+    TEXT_SPRITES,
+    SquatCounter,
+    TemporalStageClassifier,
+    TFLitePoseClassifier,
+    analyze_squat_feet_knee,
+    draw_text_with_outline,
+    is_standing_pose,
+    landmarks_to_array,
+    load_squat_thresholds,
+    mirror_landmarks,
+)
+
+THIS_DIR = Path(__file__).resolve().parent
+TRAIN_CSV = THIS_DIR / "squat_model" / "train.csv"
+BASELINE_PATH = THIS_DIR / "bench_baseline.json"
+
+# Landmark yang tidak ada di CSV diisi dengan titik tengah badan + visibility ini
+FILL_VISIBILITY = 0.5
+
+
+# -------------------------- SYNTHETIC FRAMES -------------------------- #
+
+def load_synthetic_frames(csv_path: Path = TRAIN_CSV, max_frames: int = 512):
+    """
+    Baris train.csv -> (landmarks (N, 33, 4) float32, labels).
+    Kolom <joint>_x/_y/_z/_v diisi ke index MediaPipe; landmark lain
+    (wajah, tangan, kaki) diisi titik tengah hip supaya tetap valid.
+    """
+    with open(csv_path, "r", encoding="utf-8") as f:
+        rows = []
+        for i, row in enumerate(csv.DictReader(f)):
+            if i >= max_frames:
+                break
+            rows.append(row)
+    if not rows:
+        raise ValueError(f"CSV kosong: {csv_path}")
+
+    lm = np.empty((len(rows), NUM_LANDMARKS, 4), dtype=np.float32)
+    labels = []
+    for i, row in enumerate(rows):
+        labels.append(row["label"])
+        for name, mp_idx in JOINT_NAME_TO_MP.items():
+            lm[i, int(mp_idx)] = [float(row[f"{name}_{c}"]) for c in ("x", "y", "z", "v")]
+
+        hips = lm[i, [int(JOINT_NAME_TO_MP["left_hip"]), int(JOINT_NAME_TO_MP["right_hip"])]]
+        center = hips.mean(axis=0)
+        center[3] = FILL_VISIBILITY
+        known = [int(idx) for idx in JOINT_NAME_TO_MP.values()]
+        missing = np.setdiff1d(np.arange(NUM_LANDMARKS), known)
+        lm[i, missing] = center
+    return lm, labels
+
+
+def to_landmark_list(lm: np.ndarray) -> landmark_pb2.NormalizedLandmarkList:
+    """(33, 4) -> NormalizedLandmarkList, bentuk yang keluar dari MediaPipe."""
+    out = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, v in lm.tolist():
+        p = out.landmark.add()
+        p.x, p.y, p.z, p.visibility = x, y, z, v
+    return out
+
+
+# -------------------------- TIMING -------------------------- #
+
+def time_case(fn: Callable[[int], object], n_frames: int, iterations: int, warmup: int) -> np.ndarray:
+    """Panggil fn(i % n_frames) satu per satu, return durasi per call (us)."""
+    for i in range(warmup):
+        fn(i % n_frames)
+
+    samples = np.empty(iterations, dtype=np.float64)
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        t0 = clock()
+        fn(i % n_frames)
+        samples[i] = clock() - t0
+    return samples / 1000.0
+
+
+def alloc_per_op(fn: Callable[[int], object], n_frames: int, iterations: int = 200) -> float:
+    """Rata-rata peak memori sementara (byte) yang dialokasikan Python/NumPy per call."""
+    for i in range(20):
+        fn(i % n_frames)
+    total = 0
+    tracemalloc.start()
+    try:
+        for i in range(iterations):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn(i % n_frames)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / iterations
+
+
+def summarize(samples: np.ndarray) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "mean_us": round(float(samples.mean()), 3),
+        "p50_us": round(float(p50), 3),
+        "p95_us": round(float(p95), 3),
+        "p99_us": round(float(p99), 3),
+    }
+
+
+# -------------------------- CASES -------------------------- #
+
+def build_cases(lm: np.ndarray, labels: List[str]) -> Dict[str, Callable[[int], object]]:
+    plank_cls = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank", num_threads=1)
+    squat_cls = TFLitePoseClassifier(SQUAT_TFLITE, SQUAT_META, "squat_stage", num_threads=1)
+    squat_numpy = TFLitePoseClassifier(SQUAT_TFLITE, SQUAT_META, "squat_stage", backend="numpy")
+    temporal_cls = TemporalStageClassifier(SQUAT_TEMPORAL_TFLITE, SQUAT_TEMPORAL_META, num_threads=1)
+    thresholds = load_squat_thresholds()
+
+    frames = [lm[i] for i in range(len(lm))]
+    protos = [to_landmark_list(f) for f in frames]
+    standing = [is_standing_pose(f) for f in frames]
+    form_ok = [analyze_squat_feet_knee(f, thresholds) == ("correct", "correct") for f in frames]
+
+    canvas = np.zeros((480, 640, 3), dtype=np.uint8)
+    counter = SquatCounter()
+    analyzer = ExerciseAnalyzer(plank_cls, squat_cls, thresholds)
+
+    return {
+        "plank_features": lambda i: plank_cls._build_plank_feature_vector(frames[i]),
+        "squat_features": lambda i: squat_cls._build_generic_feature_vector(frames[i]),
+        "plank_predict": lambda i: plank_cls.predict(frames[i]),
+        "squat_predict": lambda i: squat_cls.predict(frames[i]),
+        "squat_predict_numpy": lambda i: squat_numpy.predict(frames[i]),
+        "squat_temporal": lambda i: temporal_cls.predict(frames[i]),
+        "feet_knee": lambda i: analyze_squat_feet_knee(frames[i], thresholds),
+        "standing": lambda i: is_standing_pose(frames[i]),
+        "overlay_text": lambda i: draw_text_with_outline(
+            canvas, f"SQUAT COUNT: {i}", (20, 80), 0.7, (255, 255, 255), 2
+        ),
+        "overlay_sprites": lambda i: TEXT_SPRITES.draw(
+            canvas, f"SQUAT COUNT: {i % 20}", (20, 80), 0.7, (255, 255, 255), 2
+        ),
+        "squat_counter": lambda i: counter.update(labels[i], True, standing[i], form_ok[i]),
+        "landmarks_array": lambda i: landmarks_to_array(protos[i]),
+        "mirror_landmarks": lambda i: mirror_landmarks(frames[i]),
+        "analyze_squat": lambda i: analyzer.analyze(protos[i], "squat"),
+    }
+
+
+# -------------------------- BASELINE -------------------------- #
+
+def host_info() -> dict:
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.is_file():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """Print tabel vs baseline, return nama case yang regress."""
+    regressions = []
+    base_cases = baseline.get("cases", {})
+    print()
+    print(f"{'case':<20} {'p50 now':>10} {'p50 base':>10} {'ratio':>7}")
+    for name, res in results.items():
+        base = base_cases.get(name)
+        if base is None:
+            print(f"{name:<20} {res['p50_us']:>10.2f} {'-':>10} {'new':>7}")
+            continue
+        ratio = res["p50_us"] / max(base["p50_us"], 1e-9)
+        flag = ""
+        if ratio > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<20} {res['p50_us']:>10.2f} {base['p50_us']:>10.2f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+# -------------------------- MAIN -------------------------- #
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark hot path per frame (us/op).")
+    parser.add_argument("--csv", type=Path, default=TRAIN_CSV, help="Sumber frame sintetis.")
+    parser.add_argument("--frames", type=int, default=512, help="Jumlah baris CSV yang dipakai.")
+    parser.add_argument("--iterations", type=int, default=5000, help="Jumlah call terukur per case.")
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--only", nargs="+", default=None, help="Hanya case yang namanya mengandung teks ini.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Tulis hasil run ini ke --baseline (bukan membandingkan). Dengan --only, case lain di baseline tetap.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="p50 > baseline * tolerance dianggap regresi (default: 1.25).",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Simpan hasil run ini ke file JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    lm, labels = load_synthetic_frames(args.csv, args.frames)
+    cases = build_cases(lm, labels)
+    case_order = list(cases)
+    if args.only:
+        cases = {k: v for k, v in cases.items() if any(s in k for s in args.only)}
+
+    print(f"=== Hot path benchmark: {len(lm)} frames, {args.iterations} iterations/case ===")
+    print(f"{'case':<20} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'peak B/op':>11}")
+
+    results: Dict[str, dict] = {}
+    for name, fn in cases.items():
+        samples = time_case(fn, len(lm), args.iterations, args.warmup)
+        res = summarize(samples)
+        res["peak_alloc_bytes"] = round(alloc_per_op(fn, len(lm)), 1)
+        results[name] = res
+        print(
+            f"{name:<20} {res['mean_us']:>9.2f} {res['p50_us']:>9.2f} "
+            f"{res['p95_us']:>9.2f} {res['p99_us']:>9.2f} {res['peak_alloc_bytes']:>11.0f}"
+        )
+
+    report = {"host": host_info(), "iterations": args.iterations, "cases": results}
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        saved = report
+        previous = load_baseline(args.baseline)
+        if args.only and previous is not None:
+            # --only: hanya case yang diukur yang diganti, case lain tetap
+            if previous.get("host") != report["host"]:
+                print("\n[WARN] Baseline lama dibuat di host / versi library berbeda.")
+            merged = {**previous.get("cases", {}), **results}
+            saved = {**previous, "cases": {name: merged[name] for name in case_order if name in merged}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline saved to: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nBaseline tidak ada ({args.baseline}), jalankan dengan --save-baseline dulu.")
+        return 0
+    if baseline.get("host") != report["host"]:
+        print("\n[WARN] Baseline dibuat di host / versi library berbeda, bandingkan dengan hati-hati.")
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inference service (asyncio, aiohttp) untuk scoring landmark di server.
+
+App mobile mengirim landmark per frame (33 x [x, y, z, visibility]), server
+menjalankan TFLitePoseClassifier + form check + squat counting dan membalas
+hasilnya. State squat (count / up-down) disimpan per session.
+
+Frame dari banyak session digabung jadi micro-batch: batch di-flush kalau
+sudah MAX_BATCH frame, atau paling lambat max_wait_ms setelah frame pertama
+masuk, lalu diproses dengan 1x predict_batch() (1 invoke) di worker thread
+sehingga event loop tidak ikut terblokir. Frame yang masuk selama invoke
+di-flush begitu batch itu selesai. Biaya invoke dibagi ke semua session.
+Kalau frame antre + in-flight sudah --max-pending, frame baru ditolak
+("overloaded" / HTTP 503).
+
+Endpoint:
+    GET    /ws?mode=squat            WebSocket, 1 koneksi = 1 session
+    POST   /sessions                 body {"mode": "squat"} -> {"session_id": "..."}
+    POST   /sessions/{id}/frames     body frame -> hasil
+    DELETE /sessions/{id}
+    GET    /stats                    jumlah session, batch size, latency p50/p99
+
+Frame (WebSocket text / HTTP body):
+    {"landmarks": [[x, y, z, v], ... 33] atau null, "mode": "plank"|"squat" (opsional),
+     "reset": true (opsional, squat count -> 0)}
+WebSocket binary: 528 byte = 33 x 4 float32 little-endian.
+
+Hasil:
+    {"frame", "mode", "label", "prob", "feet_status", "knee_status",
+     "form_correct", "squat_count"}
+
+Butuh aiohttp (pip install aiohttp).
+
+Contoh:
+    python inference_service.py --port 8765 --max-wait-ms 5
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from aiohttp import WSMsgType, web
+except ImportError:  # dependency opsional, hanya untuk service ini
+    web = None
+
+from realtime_plank_squat_tflite import (
+    INFERENCE_BACKENDS,
+    NUM_LANDMARKS,
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TFLITE,
+    ExerciseAnalyzer,
+    TFLitePoseClassifier,
+    classifier_loader,
+    load_squat_thresholds,
+)
+
+MODES = ("plank", "squat")
+
+# Default micro-batching
+MAX_BATCH = 256
+MAX_WAIT_MS = 5.0
+# Frame antre + in-flight per batcher sebelum request ditolak (backpressure)
+MAX_PENDING = 8192
+
+# Session HTTP dihapus kalau tidak ada frame selama ini (detik)
+SESSION_TTL = 300.0
+
+# Jumlah sampel latency untuk p50 / p99 di /stats
+LATENCY_WINDOW = 10000
+
+_FRAME_BYTES = NUM_LANDMARKS * 4 * 4
+
+# Task background expire_sessions() di app (None kalau aiohttp tidak ada)
+EXPIRE_TASK = web.AppKey("expire_task", asyncio.Task) if web is not None else None
+
+
+class Overloaded(Exception):
+    """Antrian batcher penuh."""
+
+
+class MicroBatcher:
+    """
+    Kumpulkan frame dari banyak session, flush dengan 1x predict_batch().
+
+    predict_batch() jalan di 1 worker thread (interpreter tidak thread-safe),
+    jadi event loop tetap melayani request selama invoke. Maksimal 1 batch
+    in-flight per batcher; frame yang masuk selama batch jalan di-flush
+    begitu batch itu selesai. Frame pending + in-flight dibatasi max_pending
+    (lebih dari itu -> Overloaded). State batcher hanya disentuh dari event loop.
+    """
+
+    def __init__(
+        self,
+        classifier: TFLitePoseClassifier,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = MAX_WAIT_MS,
+        max_pending: int = MAX_PENDING,
+    ):
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+        self._lm: List[np.ndarray] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-{classifier.exercise_name}")
+        self._running = 0  # jumlah frame di batch yang sedang di-invoke
+        self.batches = 0
+        self.frames = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Frame yang belum selesai: antre + sedang di-invoke."""
+        return len(self._lm) + self._running
+
+    def submit(self, lm: np.ndarray) -> asyncio.Future:
+        """lm (33, 4) -> future berisi (label, prob, probs)."""
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded()
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._lm.append(lm)
+        self._futures.append(fut)
+        if self._running:
+            # Di-flush saat batch yang sedang jalan selesai (_batch_done)
+            return fut
+        if len(self._lm) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            # Deadline dihitung dari frame pertama di batch ini
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._running or not self._lm:
+            return
+        lm = self._lm[:self.max_batch]
+        futures = self._futures[:self.max_batch]
+        del self._lm[:self.max_batch], self._futures[:self.max_batch]
+
+        self._running = len(lm)
+        task = asyncio.get_running_loop().run_in_executor(self._executor, self._predict, lm)
+        task.add_done_callback(functools.partial(self._batch_done, futures))
+
+    def _predict(self, lm: List[np.ndarray]):
+        """Di worker thread: stack + 1x predict_batch()."""
+        return self.classifier.predict_batch(np.stack(lm))
+
+    def _batch_done(self, futures: List[asyncio.Future], task: asyncio.Future):
+        n, self._running = self._running, 0
+        exc = task.exception() if not task.cancelled() else asyncio.CancelledError()
+        if exc is not None:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(exc)
+        else:
+            labels, probs = task.result()
+            prob = probs.max(axis=1).tolist()
+            for i, fut in enumerate(futures):
+                if not fut.done():  # client bisa sudah disconnect
+                    fut.set_result((labels[i], prob[i], probs[i]))
+            self.batches += 1
+            self.frames += n
+
+        # Frame yang masuk selama invoke sudah menunggu >= 1 batch, langsung flush
+        self._flush()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Session:
+    """State 1 user: ExerciseAnalyzer sendiri (squat counter), mode, nomor frame."""
+
+    def __init__(self, service: "InferenceService", mode: str):
+        self.service = service
+        self.mode = mode
+        self.analyzer = service.new_analyzer()
+        self.frames = 0
+        self.last_seen = time.monotonic()
+
+    async def process(self, frame: dict) -> dict:
+        t0 = time.perf_counter()
+        if not isinstance(frame, dict):
+            raise ValueError("frame harus JSON object")
+        self.last_seen = time.monotonic()
+        if frame.get("reset"):
+            self.analyzer = self.service.new_analyzer()
+        mode = frame.get("mode", self.mode)
+        if mode not in MODES:
+            raise ValueError(f"mode harus salah satu dari {MODES}")
+        self.mode = mode
+
+        lm = parse_landmarks(frame.get("landmarks"))
+        return await self.process_array(lm, t0)
+
+    async def process_array(self, lm: Optional[np.ndarray], t0: Optional[float] = None) -> dict:
+        if t0 is None:
+            t0 = time.perf_counter()
+        if lm is None:
+            prediction = (None, 0.0, None)
+        else:
+            prediction = await self.service.batchers[self.mode].submit(lm)
+
+        info = self.analyzer.analyze(lm, self.mode, prediction=prediction)
+        frame_idx = self.frames
+        self.frames += 1
+        self.service.latencies.append(time.perf_counter() - t0)
+        return {
+            "frame": frame_idx,
+            "mode": info["mode"],
+            "label": info["label"],
+            "prob": round(float(info["prob"]), 4),
+            "feet_status": info["feet_status"],
+            "knee_status": info["knee_status"],
+            "form_correct": info["form_correct"],
+            "squat_count": info["squat_count"],
+        }
+
+
+def parse_landmarks(data) -> Optional[np.ndarray]:
+    """List JSON / bytes -> ndarray (33, 4) float32, None kalau pose tidak ada."""
+    if data is None:
+        return None
+    if isinstance(data, (bytes, bytearray)):
+        if len(data) != _FRAME_BYTES:
+            raise ValueError(f"Frame binary harus {_FRAME_BYTES} byte")
+        return np.frombuffer(data, dtype="<f4").reshape(NUM_LANDMARKS, 4).astype(np.float32)
+    lm = np.asarray(data, dtype=np.float32)
+    if lm.shape != (NUM_LANDMARKS, 4):
+        raise ValueError(f"landmarks harus berukuran ({NUM_LANDMARKS}, 4), bukan {lm.shape}")
+    return lm
+
+
+class InferenceService:
+    def __init__(
+        self,
+        max_batch: int = MAX_BATCH,
+        max_wait_ms: float = MAX_WAIT_MS,
+        session_ttl: float = SESSION_TTL,
+        backend: str = "tflite",
+        max_pending: int = MAX_PENDING,
+    ):
+        # 1 thread per interpreter: throughput diskalakan dengan proses, bukan thread
+        plank_cls = classifier_loader(PLANK_TFLITE, PLANK_META, "plank", num_threads=1, backend=backend)
+        squat_cls = classifier_loader(SQUAT_TFLITE, SQUAT_META, "squat_stage", num_threads=1, backend=backend)
+        self._loaders = (plank_cls, squat_cls)
+        self.squat_thresholds = load_squat_thresholds()
+        self.batchers: Dict[str, MicroBatcher] = {
+            "plank": MicroBatcher(plank_cls(), max_batch, max_wait_ms, max_pending),
+            "squat": MicroBatcher(squat_cls(), max_batch, max_wait_ms, max_pending),
+        }
+        self.sessions: Dict[str, Session] = {}
+        self.session_ttl = session_ttl
+        self.ws_sessions = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def new_analyzer(self) -> ExerciseAnalyzer:
+        # Prediksi selalu datang dari batcher, classifier di analyzer tidak dipanggil
+        return ExerciseAnalyzer(*self._loaders, self.squat_thresholds)
+
+    def stats(self) -> dict:
+        lat = np.asarray(self.latencies) * 1000.0
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99]).tolist() if lat.size else (0.0, 0.0, 0.0)
+        return {
+            "http_sessions": len(self.sessions),
+            "ws_sessions": self.ws_sessions,
+            "batches": {
+                mode: {
+                    "batches": b.batches,
+                    "frames": b.frames,
+                    "mean_batch": round(b.frames / b.batches, 2) if b.batches else 0.0,
+                    "in_flight": b.in_flight,
+                    "rejected": b.rejected,
+                }
+                for mode, b in self.batchers.items()
+            },
+            "latency_ms": {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)},
+        }
+
+    # ---------- HTTP / WebSocket handlers ---------- #
+
+    async def handle_ws(self, request):
+        mode = request.query.get("mode", "squat")
+        if mode not in MODES:
+            raise web.HTTPBadRequest(text=f"mode harus salah satu dari {MODES}")
+        ws = web.WebSocketResponse(heartbeat=30.0)
+        await ws.prepare(request)
+
+        session = Session(self, mode)
+        self.ws_sessions += 1
+        try:
+            async for msg in ws:
+                try:
+                    if msg.type == WSMsgType.BINARY:
+                        result = await session.process_array(parse_landmarks(msg.data))
+                    elif msg.type == WSMsgType.TEXT:
+                        result = await session.process(json.loads(msg.data))
+                    else:
+                        continue
+                except (ValueError, TypeError) as exc:
+                    result = {"error": str(exc)}
+                except Overloaded:
+                    result = {"error": "overloaded"}
+                await ws.send_str(json.dumps(result))
+        finally:
+            self.ws_sessions -= 1
+        return ws
+
+    async def handle_create_session(self, request):
+        try:
+            body = await request.json() if request.can_read_body else {}
+        except ValueError as exc:
+            raise web.HTTPBadRequest(text=str(exc))
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="body harus JSON object")
+        mode = body.get("mode", "squat")
+        if mode not in MODES:
+            raise web.HTTPBadRequest(text=f"mode harus salah satu dari {MODES}")
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = Session(self, mode)
+        return web.json_response({"session_id": session_id, "mode": mode})
+
+    async def handle_frame(self, request):
+        session = self.sessions.get(request.match_info["session_id"])
+        if session is None:
+            raise web.HTTPNotFound(text="session tidak ditemukan / expired")
+        try:
+            result = await session.process(await request.json())
+        except (ValueError, TypeError) as exc:
+            raise web.HTTPBadRequest(text=str(exc))
+        except Overloaded:
+            raise web.HTTPServiceUnavailable(text="overloaded")
+        return web.json_response(result)
+
+    async def handle_delete_session(self, request):
+        session = self.sessions.pop(request.match_info["session_id"], None)
+        if session is None:
+            raise web.HTTPNotFound(text="session tidak ditemukan / expired")
+        return web.json_response({"frames": session.frames, "squat_count": session.analyzer.squat_counter.count})
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats())
+
+    async def expire_sessions(self):
+        while True:
+            await asyncio.sleep(min(30.0, self.session_ttl))
+            now = time.monotonic()
+            for sid in [sid for sid, s in self.sessions.items() if now - s.last_seen > self.session_ttl]:
+                del self.sessions[sid]
+
+    def make_app(self):
+        app = web.Application()
+        app.add_routes([
+            web.get("/ws", self.handle_ws),
+            web.post("/sessions", self.handle_create_session),
+            web.post("/sessions/{session_id}/frames", self.handle_frame),
+            web.delete("/sessions/{session_id}", self.handle_delete_session),
+            web.get("/stats", self.handle_stats),
+        ])
+
+        async def start_background(app):
+            app[EXPIRE_TASK] = asyncio.create_task(self.expire_sessions())
+
+        async def stop_background(app):
+            app[EXPIRE_TASK].cancel()
+            for batcher in self.batchers.values():
+                batcher.close()
+
+        app.on_startup.append(start_background)
+        app.on_cleanup.append(stop_background)
+        return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Asyncio inference service (WebSocket / HTTP) dengan micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help=f"Maks frame per invoke (default: {MAX_BATCH}).")
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=MAX_WAIT_MS,
+        help=f"Maks tunggu sebelum batch di-flush (default: {MAX_WAIT_MS}).",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=MAX_PENDING,
+        help=f"Maks frame antre + in-flight per model sebelum ditolak (default: {MAX_PENDING}).",
+    )
+    parser.add_argument("--session-ttl", type=float, default=SESSION_TTL, help="Idle timeout session HTTP (detik).")
+    parser.add_argument(
+        "--backend",
+        choices=INFERENCE_BACKENDS,
+        default="tflite",
+        help="Backend MLP: tflite atau numpy (bobot .npz, tanpa runtime TFLite).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if web is None:
+        raise SystemExit("inference_service.py butuh aiohttp: pip install aiohttp")
+    args = parse_args(argv)
+    service = InferenceService(
+        args.max_batch, args.max_wait_ms, args.session_ttl, backend=args.backend, max_pending=args.max_pending
+    )
+    print(f"=== Inference service: max_batch={args.max_batch}, max_wait={args.max_wait_ms} ms ===")
+    web.run_app(service.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
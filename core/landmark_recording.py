@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rekaman landmark per frame (.lmrec) + replay tanpa video / MediaPipe.
+
+Format file (little-endian, append-only, bisa di-np.memmap):
+
+    header 32 byte : magic "LMREC\\0\\0\\1", num_landmarks (u4), record_size (u4),
+                     start_time (f8, unix detik), reserved 8 byte
+    record x N     : t_ms (f8), frame (u4), present (u1), pad (3 byte),
+                     landmarks (33, 4) float32 [x, y, z, visibility]
+
+present = 0 berarti pose tidak terdeteksi di frame itu (landmark diisi 0).
+Record ditulis utuh per frame; kalau proses mati di tengah, record terakhir
+yang terpotong diabaikan saat dibaca.
+
+Rekam:
+    python realtime_plank_squat_tflite.py --record sesi1.lmrec
+    python offline_video.py recordings/ --record-dir lmrec/
+
+Replay (classifier + squat state machine, ribuan frame/detik):
+    python landmark_recording.py sesi1.lmrec --mode squat --out replay.jsonl
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from offline_video import ResultWriter, frame_record
+from realtime_plank_squat_tflite import (
+    NUM_LANDMARKS,
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TFLITE,
+    ExerciseAnalyzer,
+    classifier_loader,
+    load_squat_thresholds,
+)
+
+MAGIC = b"LMREC\x00\x00\x01"
+RECORDING_EXTENSION = ".lmrec"
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("num_landmarks", "<u4"),
+    ("record_size", "<u4"),
+    ("start_time", "<f8"),
+    ("reserved", "V8"),
+])
+
+RECORD_DTYPE = np.dtype([
+    ("t_ms", "<f8"),
+    ("frame", "<u4"),
+    ("present", "u1"),
+    ("pad", "V3"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+])
+
+# Record di-flush ke disk setiap sekian frame
+FLUSH_EVERY = 30
+
+
+class LandmarkRecorder:
+    """Append 1 record per frame ke file .lmrec (buat header kalau file baru)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        if not is_new:
+            read_header(self.path)  # validasi sebelum append
+            # Buang record terakhir yang terpotong supaya record baru tetap sejajar
+            body = self.path.stat().st_size - HEADER_DTYPE.itemsize
+            if body % RECORD_DTYPE.itemsize:
+                with open(self.path, "r+b") as f:
+                    f.truncate(self.path.stat().st_size - body % RECORD_DTYPE.itemsize)
+        self._f = open(self.path, "ab")
+        if is_new:
+            header = np.zeros(1, dtype=HEADER_DTYPE)
+            header["magic"] = MAGIC
+            header["num_landmarks"] = NUM_LANDMARKS
+            header["record_size"] = RECORD_DTYPE.itemsize
+            header["start_time"] = time.time()
+            self._f.write(header.tobytes())
+
+        self._rec = np.zeros(1, dtype=RECORD_DTYPE)
+        self._t0 = time.perf_counter()
+        self.frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, frame_idx: int, t_ms: Optional[float], lm: Optional[np.ndarray]):
+        """
+        lm: ndarray (33, 4) dari landmarks_to_array(), atau None kalau pose tidak ada.
+        t_ms None = waktu sejak recorder dibuat (untuk kamera live).
+        """
+        rec = self._rec[0]
+        rec["t_ms"] = (time.perf_counter() - self._t0) * 1000.0 if t_ms is None else t_ms
+        rec["frame"] = frame_idx
+        if lm is None:
+            rec["present"] = 0
+            rec["landmarks"] = 0.0
+        else:
+            rec["present"] = 1
+            rec["landmarks"] = lm
+        self._f.write(self._rec.tobytes())
+        self.frames += 1
+        if self.frames % FLUSH_EVERY == 0:
+            self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+def read_header(path: Path) -> np.void:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_DTYPE.itemsize)
+    if len(raw) < HEADER_DTYPE.itemsize:
+        raise ValueError(f"File rekaman terlalu pendek: {path}")
+    header = np.frombuffer(raw, dtype=HEADER_DTYPE)[0]
+    if header["magic"] != MAGIC:
+        raise ValueError(f"Bukan file {RECORDING_EXTENSION}: {path}")
+    if header["record_size"] != RECORD_DTYPE.itemsize or header["num_landmarks"] != NUM_LANDMARKS:
+        raise ValueError(
+            f"Layout record tidak cocok ({header['num_landmarks']} landmark, "
+            f"{header['record_size']} byte/record): {path}"
+        )
+    return header
+
+
+def open_recording(path: Path) -> Tuple[np.void, np.ndarray]:
+    """Return (header, records) dengan records = np.memmap read-only (N,) RECORD_DTYPE."""
+    path = Path(path)
+    header = read_header(path)
+    n = (path.stat().st_size - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+    if n == 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize, shape=(n,))
+    return header, records
+
+
+def iter_frames(records: np.ndarray) -> Iterator[Tuple[int, float, Optional[np.ndarray]]]:
+    """(frame, t_ms, landmarks (33, 4) atau None) per record."""
+    landmarks = records["landmarks"]
+    present = records["present"].astype(bool).tolist()
+    frames = records["frame"].tolist()
+    t_ms = records["t_ms"].tolist()
+    for i in range(len(records)):
+        yield frames[i], t_ms[i], (landmarks[i] if present[i] else None)
+
+
+# -------------------------- REPLAY -------------------------- #
+
+def replay(path: Path, analyzer: ExerciseAnalyzer, mode: str, writer=None, label_mapping=None) -> dict:
+    """Jalankan rekaman lewat ExerciseAnalyzer (classifier + squat counter). Return ringkasan."""
+    _, records = open_recording(path)
+    info = None
+    t_start = time.perf_counter()
+    frames = list(iter_frames(records))
+    # Semua frame rekaman sudah ada: 1x analyze_batch (predict_batch + geometry vectorized)
+    infos = analyzer.analyze_batch([lm for _, _, lm in frames], mode)
+    for (frame_idx, t_ms, _), info in zip(frames, infos):
+        if writer is not None:
+            writer.write(frame_record(path.name, frame_idx, t_ms, info, label_mapping))
+    elapsed = time.perf_counter() - t_start
+
+    return {
+        "recording": str(path),
+        "mode": mode,
+        "frames": len(records),
+        "frames_with_pose": int(records["present"].sum()) if len(records) else 0,
+        "squat_count": info["squat_count"] if info is not None else 0,
+        "seconds": round(elapsed, 3),
+        "fps": round(len(records) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay rekaman landmark (.lmrec) ke classifier + squat counter.")
+    parser.add_argument("recordings", nargs="+", type=Path, help="File .lmrec dan/atau folder berisi .lmrec.")
+    parser.add_argument("--mode", choices=["plank", "squat"], default="squat")
+    parser.add_argument("--out", type=Path, default=None, help="Opsional: output per frame (.jsonl / .csv).")
+    parser.add_argument("--gate-threshold", type=float, default=None, help="Motion gate (lihat realtime script).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths: List[Path] = []
+    for p in args.recordings:
+        paths.extend(sorted(p.glob(f"*{RECORDING_EXTENSION}")) if p.is_dir() else [p])
+    if not paths:
+        raise FileNotFoundError("Tidak ada file rekaman yang ditemukan.")
+
+    plank_cls = classifier_loader(PLANK_TFLITE, PLANK_META, "plank", gate_threshold=args.gate_threshold)
+    squat_cls = classifier_loader(SQUAT_TFLITE, SQUAT_META, "squat_stage", gate_threshold=args.gate_threshold)
+    squat_thresholds = load_squat_thresholds()
+    label_mapping = (plank_cls() if args.mode == "plank" else squat_cls()).label_mapping
+
+    writer = ResultWriter(args.out, list(label_mapping.values())) if args.out else None
+    summaries = []
+    try:
+        for path in paths:
+            # Analyzer baru per rekaman -> squat counter mulai dari 0 lagi
+            analyzer = ExerciseAnalyzer(plank_cls, squat_cls, squat_thresholds)
+            summary = replay(path, analyzer, args.mode, writer, label_mapping)
+            summaries.append(summary)
+            print(
+                f"[replay] {path.name}: {summary['frames']} frames "
+                f"({summary['frames_with_pose']} with pose), squat_count={summary['squat_count']}, "
+                f"{summary['fps']:.0f} frames/sec"
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if args.out:
+        summary_path = args.out.with_name(args.out.name + ".summary.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({"recordings": summaries}, f, indent=2)
+        print(f"[replay] Saved results to: {args.out}")
+        print(f"[replay] Saved summary to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Capture thread "latest frame only" (opsi --latest-frame).
+
+cap.read() mengembalikan frame TERTUA di buffer driver / OpenCV. Kalau
+proses per frame lebih lambat dari kamera, buffer itu selalu penuh dan
+feedback yang dilihat user makin tertinggal. LatestFrameCapture membaca
+kamera terus-menerus di thread sendiri dan hanya menyimpan frame terbaru
+di 1 slot; frame yang tertimpa sebelum sempat diambil dihitung sebagai
+dropped. Latency end-to-end jadi kira-kira 1 periode proses, tidak tumbuh.
+Umur frame saat diambil read() dicatat sebagai stage telemetry "frame_age".
+
+Interface sama dengan cv2.VideoCapture (read / release / isOpened), jadi
+run_sequential dan mode --pipelined tidak perlu diubah.
+"""
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Batas tunggu read() kalau kamera berhenti mengirim frame (detik)
+READ_TIMEOUT = 2.0
+
+
+def set_low_latency(cap: cv2.VideoCapture) -> dict:
+    """
+    Buffer driver sekecil mungkin + fourcc MJPG kalau didukung kamera.
+    Return setting yang benar-benar diterima backend (untuk log).
+    """
+    buffer_ok = cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    mjpg = cv2.VideoWriter_fourcc(*"MJPG")
+    previous = cap.get(cv2.CAP_PROP_FOURCC)
+    mjpg_ok = cap.set(cv2.CAP_PROP_FOURCC, mjpg) and int(cap.get(cv2.CAP_PROP_FOURCC)) == mjpg
+    if not mjpg_ok and previous:
+        cap.set(cv2.CAP_PROP_FOURCC, previous)
+    return {"buffersize_1": bool(buffer_ok), "mjpg": bool(mjpg_ok)}
+
+
+class LatestFrameCapture:
+    """Bungkus cv2.VideoCapture: thread capture + slot 1 frame terbaru."""
+
+    def __init__(self, cap: cv2.VideoCapture, telemetry=None):
+        self.cap = cap
+        self.telemetry = telemetry
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_time = 0.0
+        self._ok = True
+        self._stopped = False
+        self.captured = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._capture_loop, name="latest-frame", daemon=True)
+        self._thread.start()
+
+    def _capture_loop(self):
+        while not self._stopped:
+            ret, frame = self.cap.read()
+            now = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    self._ok = False
+                    self._cond.notify_all()
+                    return
+                if self._frame is not None:
+                    # Belum sempat diambil -> ditimpa frame yang lebih baru
+                    self.dropped += 1
+                    if self.telemetry is not None:
+                        self.telemetry.add_dropped()
+                self._frame = frame
+                self._frame_time = now
+                self.captured += 1
+                self._cond.notify_all()
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Frame terbaru yang belum pernah dikembalikan; tunggu kalau belum ada yang baru."""
+        with self._cond:
+            if self._frame is None and self._ok:
+                self._cond.wait_for(lambda: self._frame is not None or not self._ok, READ_TIMEOUT)
+            if self._frame is None:
+                return False, None
+            frame, self._frame = self._frame, None
+            frame_time = self._frame_time
+        # Umur frame sejak ditangkap = seberapa basi frame yang diproses
+        if self.telemetry is not None:
+            self.telemetry.record("frame_age", time.perf_counter() - frame_time)
+        return True, frame
+
+    def release(self):
+        self._stopped = True
+        self._thread.join(timeout=READ_TIMEOUT)
+        self.cap.release()
+        print(f"[capture] latest-frame: captured={self.captured}, dropped={self.dropped}")
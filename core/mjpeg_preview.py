@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Preview headless lewat HTTP (MJPEG), pengganti cv2.imshow / cv2.waitKey
+untuk edge box tanpa layar (opsi --preview-port).
+
+- Loop utama cukup memanggil submit(frame): frame disimpan di 1 slot, lalu
+  thread encoder yang melakukan cv2.imencode JPEG. Kalau encoder ketinggalan,
+  frame lama di slot ditimpa (dihitung sebagai dropped), loop inference
+  tidak pernah menunggu encoder.
+- Kalau tidak ada viewer yang terhubung, submit() langsung return dan tidak
+  ada encoding sama sekali.
+- Tombol p / s / d / q bisa dikirim lewat HTTP; loop utama mengambilnya
+  dengan poll_key() (pengganti cv2.waitKey), jadi state tetap diubah dari
+  thread loop sendiri.
+
+Endpoint (default http://127.0.0.1:<port>):
+    GET  /             halaman kecil: stream + tombol
+    GET  /stream       multipart/x-mixed-replace (MJPEG)
+    GET  /snapshot.jpg 1 frame JPEG terakhir
+    GET  /status       JSON: mode, skeleton, viewer, frame encoded / dropped
+    POST /key/<k>      k = p (plank), s (squat), d (toggle skeleton), q (quit)
+"""
+
+import json
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import cv2
+import numpy as np
+
+DEFAULT_JPEG_QUALITY = 80
+BOUNDARY = "autorepsframe"
+
+# Tombol yang boleh dikirim lewat POST /key/<k>
+CONTROL_KEYS = "psdq"
+
+# Nilai poll_key() kalau tidak ada tombol (sama dengan cv2.waitKey(1) & 0xFF)
+NO_KEY = 0xFF
+
+_INDEX_HTML = """<!doctype html>
+<html><head><title>autoreps preview</title></head>
+<body style="background:#111;color:#eee;font-family:sans-serif">
+<img src="/stream" style="max-width:100%"><br>
+<button onclick="fetch('/key/p',{method:'POST'})">Plank (p)</button>
+<button onclick="fetch('/key/s',{method:'POST'})">Squat (s)</button>
+<button onclick="fetch('/key/d',{method:'POST'})">Skeleton (d)</button>
+<button onclick="fetch('/key/q',{method:'POST'})">Quit (q)</button>
+</body></html>
+"""
+
+
+class MjpegPreview:
+    """
+    Server MJPEG + thread encoder. state: dict state loop realtime (hanya
+    dibaca untuk /status).
+    """
+
+    def __init__(
+        self,
+        port: int,
+        host: str = "127.0.0.1",
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        state: Optional[dict] = None,
+    ):
+        self.state = state if state is not None else {}
+        self._encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+
+        # Slot frame mentah (belum di-encode), dijaga _cond
+        self._cond = threading.Condition()
+        self._pending: Optional[np.ndarray] = None
+        self._stopped = False
+
+        # JPEG terakhir + nomor urutnya, viewer menunggu nomor berubah
+        self._jpeg_cond = threading.Condition()
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_seq = 0
+
+        self._keys: "queue.Queue[int]" = queue.Queue()
+        self.viewers = 0
+        self.submitted = 0
+        self.encoded = 0
+        self.dropped = 0
+
+        self._encoder = threading.Thread(target=self._encode_loop, name="mjpeg-encoder", daemon=True)
+        self._encoder.start()
+        self._server = self._start_server(host, port)
+        print(f"[preview] MJPEG stream: http://{host}:{port}/ (control: POST /key/p|s|d|q)")
+
+    # ---------- dipanggil dari loop utama ---------- #
+
+    def submit(self, frame: np.ndarray):
+        """Serahkan frame hasil overlay. Frame tidak boleh diubah lagi oleh caller."""
+        self.submitted += 1
+        if self.viewers == 0:
+            return
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = frame
+            self._cond.notify()
+
+    def poll_key(self) -> int:
+        """Tombol berikutnya dari HTTP control (kode ord), NO_KEY kalau tidak ada."""
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return NO_KEY
+
+    def close(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        with self._jpeg_cond:
+            self._jpeg_cond.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        self._encoder.join(timeout=2.0)
+        print(f"[preview] encoded={self.encoded}, dropped={self.dropped}, submitted={self.submitted}")
+
+    # ---------- encoder thread ---------- #
+
+    def _encode_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                frame, self._pending = self._pending, None
+
+            ok, buf = cv2.imencode(".jpg", frame, self._encode_params)
+            if not ok:
+                continue
+            with self._jpeg_cond:
+                self._jpeg = buf.tobytes()
+                self._jpeg_seq += 1
+                self.encoded += 1
+                self._jpeg_cond.notify_all()
+
+    def _wait_jpeg(self, last_seq: int, timeout: float = 1.0):
+        """(seq, jpeg) yang lebih baru dari last_seq, atau (last_seq, None) kalau timeout / stop."""
+        with self._jpeg_cond:
+            if self._jpeg_seq == last_seq and not self._stopped:
+                self._jpeg_cond.wait(timeout)
+            if self._jpeg_seq == last_seq or self._stopped:
+                return last_seq, None
+            return self._jpeg_seq, self._jpeg
+
+    def _add_viewer(self, n: int):
+        with self._jpeg_cond:
+            self.viewers += n
+
+    def status(self) -> dict:
+        return {
+            "mode": self.state.get("mode"),
+            "draw_skeleton": self.state.get("draw_skeleton"),
+            "viewers": self.viewers,
+            "submitted": self.submitted,
+            "encoded": self.encoded,
+            "dropped": self.dropped,
+        }
+
+    # ---------- HTTP ---------- #
+
+    def _start_server(self, host: str, port: int) -> ThreadingHTTPServer:
+        preview = self
+
+        class PreviewHandler(BaseHTTPRequestHandler):
+            def _send(self, code: int, body: bytes, content_type: str):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/":
+                    self._send(200, _INDEX_HTML.encode("utf-8"), "text/html; charset=utf-8")
+                elif path == "/status":
+                    self._send(200, json.dumps(preview.status()).encode("utf-8"), "application/json")
+                elif path == "/snapshot.jpg":
+                    self._snapshot()
+                elif path == "/stream":
+                    self._stream()
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if len(parts) != 2 or parts[0] != "key" or len(parts[1]) != 1 or parts[1] not in CONTROL_KEYS:
+                    self.send_error(404, f"Pakai POST /key/<{'|'.join(CONTROL_KEYS)}>")
+                    return
+                preview._keys.put(ord(parts[1]))
+                self._send(200, json.dumps({"key": parts[1]}).encode("utf-8"), "application/json")
+
+            def _snapshot(self):
+                # Viewer sementara supaya loop mengirim frame untuk di-encode
+                preview._add_viewer(1)
+                try:
+                    _, jpeg = preview._wait_jpeg(preview._jpeg_seq, timeout=2.0)
+                finally:
+                    preview._add_viewer(-1)
+                jpeg = jpeg or preview._jpeg
+                if jpeg is None:
+                    self.send_error(503, "Belum ada frame")
+                    return
+                self._send(200, jpeg, "image/jpeg")
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                preview._add_viewer(1)
+                seq = preview._jpeg_seq
+                try:
+                    while not preview._stopped:
+                        seq, jpeg = preview._wait_jpeg(seq)
+                        if jpeg is None:
+                            continue
+                        self.wfile.write(
+                            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                        )
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # viewer menutup koneksi
+                finally:
+                    preview._add_viewer(-1)
+
+            def log_message(self, format, *args):
+                pass  # jangan spam console tiap request
+
+        server = ThreadingHTTPServer((host, port), PreviewHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="mjpeg-http", daemon=True).start()
+        return server
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-camera supervisor: N stream (webcam index / RTSP URL / file video)
+diproses paralel, 1 worker process per stream.
+
+- Setiap worker punya MediaPipe Pose graph, pasangan TFLitePoseClassifier dan
+  ExerciseAnalyzer sendiri -> squat_count / squat_state terpisah per stream.
+- Thread OpenCV + TFLite per worker dibatasi (--threads-per-worker) supaya N
+  proses tidak saling rebutan core. Thread internal MediaPipe Pose tidak ikut
+  dibatasi, jadi scaling per stream tetap tergantung jumlah core dan beban
+  pose graph; ukur dulu di host target sebelum menambah stream.
+- Source yang gagal dibuka / worker yang error tetap mengirim ringkasan
+  "done" dengan status "failed", jadi supervisor tidak menunggu stream itu.
+- Hasil per frame dari semua worker dikumpulkan supervisor lewat 1 queue
+  dan ditulis ke 1 file output (JSONL / CSV, kolom "video" = nama stream).
+
+Contoh:
+    python multi_camera.py 0 2 rtsp://10.0.0.5/stream1 --mode squat --out gym.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import time
+from pathlib import Path
+from typing import List, Union
+
+# Record per frame dikirim per batch supaya overhead IPC kecil
+RESULT_BATCH_SIZE = 32
+
+# Interval print throughput per stream (detik)
+REPORT_INTERVAL = 5.0
+
+
+def parse_source(source: str) -> Union[int, str]:
+    """'0' / '2' -> index webcam (int), selain itu path file / URL."""
+    return int(source) if source.isdigit() else source
+
+
+def stream_worker(
+    stream_id: str,
+    source: str,
+    mode: str,
+    flip: bool,
+    model_complexity: int,
+    num_threads: int,
+    result_queue,
+    stop_event,
+    roi: bool = False,
+):
+    """Entry point worker process: 1 stream, state sendiri, kirim record ke supervisor."""
+    import cv2
+
+    cv2.setNumThreads(num_threads)
+
+    from offline_video import frame_record
+    from realtime_plank_squat_tflite import (
+        PLANK_META,
+        PLANK_TFLITE,
+        SQUAT_META,
+        SQUAT_TFLITE,
+        ExerciseAnalyzer,
+        bgr_to_rgb,
+        classifier_loader,
+        create_pose,
+        landmarks_to_array,
+        load_squat_thresholds,
+        mirror_landmarks,
+    )
+
+    frames = 0
+    squat_count = 0
+    batch = []
+    image_rgb = None
+    status = "ok"
+    cap = None
+    t_start = time.perf_counter()
+    try:
+        # Model / threshold yang hilang atau rusak juga dilaporkan lewat "done"
+        plank_cls = classifier_loader(PLANK_TFLITE, PLANK_META, "plank", num_threads=num_threads)
+        squat_cls = classifier_loader(SQUAT_TFLITE, SQUAT_META, "squat_stage", num_threads=num_threads)
+        analyzer = ExerciseAnalyzer(plank_cls, squat_cls, load_squat_thresholds())
+        label_mapping = (analyzer.plank_cls if mode == "plank" else analyzer.squat_cls).label_mapping
+
+        cap = cv2.VideoCapture(parse_source(source))
+        if not cap.isOpened():
+            status = "failed"
+            result_queue.put(("error", stream_id, f"Tidak bisa membuka source: {source}"))
+            return
+
+        with create_pose(model_complexity, roi=roi) as pose:
+            while not stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                t_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+
+                image_rgb = bgr_to_rgb(frame, image_rgb)
+                image_rgb.flags.writeable = False
+                results = pose.process(image_rgb)
+
+                # flip: landmark di-mirror, frame tidak perlu di-flip
+                lm = landmarks_to_array(results.pose_landmarks)
+                if flip:
+                    lm = mirror_landmarks(lm)
+                info = analyzer.analyze(lm, mode)
+                squat_count = info["squat_count"]
+                batch.append(frame_record(stream_id, frames, t_ms, info, label_mapping))
+                frames += 1
+
+                if len(batch) >= RESULT_BATCH_SIZE:
+                    result_queue.put(("records", stream_id, batch))
+                    batch = []
+    except Exception as exc:
+        status = "failed"
+        result_queue.put(("error", stream_id, f"{type(exc).__name__}: {exc}"))
+        raise
+    finally:
+        if cap is not None:
+            cap.release()
+        if batch:
+            result_queue.put(("records", stream_id, batch))
+
+        elapsed = time.perf_counter() - t_start
+        result_queue.put((
+            "done",
+            stream_id,
+            {
+                "stream": stream_id,
+                "source": source,
+                "mode": mode,
+                "status": status,
+                "frames": frames,
+                "squat_count": squat_count,
+                "seconds": round(elapsed, 3),
+                "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            },
+        ))
+
+
+def _label_names(mode: str) -> List[str]:
+    from realtime_plank_squat_tflite import PLANK_META, SQUAT_META
+
+    meta_path = PLANK_META if mode == "plank" else SQUAT_META
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return [meta["label_mapping"][k] for k in sorted(meta["label_mapping"], key=int)]
+
+
+def run_supervisor(
+    sources: List[str],
+    mode: str,
+    out_path: Path,
+    flip: bool = True,
+    model_complexity: int = 0,
+    num_threads: int = 1,
+    roi: bool = False,
+) -> List[dict]:
+    """Start 1 worker per source, kumpulkan semua hasil ke out_path. Return ringkasan per stream."""
+    from offline_video import ResultWriter
+
+    # spawn: MediaPipe / TFLite tidak aman di-fork setelah ada thread
+    ctx = mp.get_context("spawn")
+    result_queue = ctx.Queue()
+    stop_event = ctx.Event()
+
+    workers = {}
+    for i, source in enumerate(sources):
+        stream_id = f"stream{i}"
+        proc = ctx.Process(
+            target=stream_worker,
+            args=(stream_id, source, mode, flip, model_complexity, num_threads, result_queue, stop_event, roi),
+            name=stream_id,
+            daemon=True,
+        )
+        proc.start()
+        workers[stream_id] = proc
+        print(f"[supervisor] {stream_id} <- {source} (pid {proc.pid})")
+
+    writer = ResultWriter(out_path, _label_names(mode))
+    frames_seen = {sid: 0 for sid in workers}
+    summaries = {}
+    pending = set(workers)
+
+    def handle(kind: str, stream_id: str, payload):
+        if kind == "records":
+            for record in payload:
+                writer.write(record)
+            frames_seen[stream_id] += len(payload)
+        elif kind == "error":
+            print(f"[supervisor] {stream_id}: {payload}")
+        elif kind == "done":
+            summaries[stream_id] = payload
+            pending.discard(stream_id)
+            print(
+                f"[supervisor] {stream_id} {'done' if payload['status'] == 'ok' else 'FAILED'}: "
+                f"{payload['frames']} frames, "
+                f"squat_count={payload['squat_count']}, {payload['fps']:.1f} frames/sec"
+            )
+
+    t_start = time.perf_counter()
+    last_report = t_start
+    try:
+        while pending:
+            try:
+                kind, stream_id, payload = result_queue.get(timeout=0.5)
+            except queue.Empty:
+                dead = [sid for sid in pending if not workers[sid].is_alive()]
+                if dead:
+                    # Worker sudah exit: ambil dulu record / "done" yang masih
+                    # di pipe, baru yang tetap tanpa "done" dianggap crash
+                    while True:
+                        try:
+                            handle(*result_queue.get(timeout=0.1))
+                        except queue.Empty:
+                            break
+                    for sid in dead:
+                        if sid in pending:
+                            print(f"[supervisor] {sid} exited (code {workers[sid].exitcode})")
+                            pending.discard(sid)
+                continue
+
+            handle(kind, stream_id, payload)
+
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                elapsed = now - t_start
+                rates = ", ".join(f"{sid}={n / elapsed:.1f}" for sid, n in frames_seen.items())
+                print(f"[supervisor] frames/sec: {rates}")
+                last_report = now
+    except KeyboardInterrupt:
+        print("[supervisor] Stop...")
+        stop_event.set()
+        # Tunggu record terakhir + "done" dari worker yang masih jalan
+        deadline = time.perf_counter() + 5.0
+        while pending and time.perf_counter() < deadline:
+            try:
+                handle(*result_queue.get(timeout=0.5))
+            except queue.Empty:
+                continue
+    finally:
+        stop_event.set()
+        writer.close()
+        for proc in workers.values():
+            proc.join(timeout=5.0)
+
+    elapsed = time.perf_counter() - t_start
+    total = sum(frames_seen.values())
+    print(f"[supervisor] Total: {total} frames in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.1f} frames/sec)")
+    return [summaries[sid] for sid in workers if sid in summaries]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Proses banyak kamera / stream paralel (1 process per stream).")
+    parser.add_argument("sources", nargs="+", help="Index webcam, URL RTSP, atau file video.")
+    parser.add_argument("--mode", choices=["plank", "squat"], default="squat")
+    parser.add_argument("--out", type=Path, default=Path("multi_camera_results.jsonl"))
+    parser.add_argument("--no-flip", action="store_true", help="Jangan mirror frame.")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=0)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=1,
+        help="Thread OpenCV + TFLite per worker (default: 1, supaya scaling per core).",
+    )
+    parser.add_argument(
+        "--roi",
+        action="store_true",
+        help="Pose hanya di crop sekitar landmark frame sebelumnya (cocok untuk kamera wide-angle).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summaries = run_supervisor(
+        args.sources,
+        args.mode,
+        args.out,
+        flip=not args.no_flip,
+        model_complexity=args.model_complexity,
+        num_threads=args.threads_per_worker,
+        roi=args.roi,
+    )
+
+    summary_path = args.out.with_name(args.out.name + ".summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({"streams": summaries}, f, indent=2)
+    print(f"[supervisor] Saved results to: {args.out}")
+    print(f"[supervisor] Saved summary to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
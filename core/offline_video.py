@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Headless offline scoring untuk video rekaman (tanpa imshow / waitKey).
+
+- Input : file video dan/atau folder berisi video (.mp4, .avi, .mov, .mkv, .webm).
+- Proses: decode di thread terpisah, MediaPipe Pose per frame di thread
+          utama, lalu classifier + geometry squat per --batch-size frame
+          sekaligus (ExerciseAnalyzer.analyze_batch: 1x predict_batch per
+          batch) dan squat counting berurutan, tanpa overlay.
+- Output: 1 baris per frame (label, probabilitas per kelas, FEET/KNEE status,
+          form, squat_count) ke JSONL atau CSV (dipilih dari ekstensi --out),
+          plus ringkasan per video (final squat count, frames/sec) ke
+          <out>.summary.json.
+
+Contoh:
+    python offline_video.py "Vid Demo/plank.mp4" --mode plank --out plank.jsonl
+    python offline_video.py recordings/ --mode squat --out squat.csv
+"""
+
+import argparse
+import csv
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import cv2
+import numpy as np
+
+from realtime_plank_squat_tflite import (
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TFLITE,
+    GATE_MAX_STALE,
+    INFERENCE_BACKENDS,
+    ExerciseAnalyzer,
+    bgr_to_rgb,
+    classifier_loader,
+    create_pose,
+    landmarks_to_array,
+    load_squat_thresholds,
+    mirror_landmarks,
+)
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+# Jumlah frame hasil decode yang boleh antre sebelum pose
+DECODE_QUEUE_SIZE = 8
+# Frame per analyze_batch (1x predict_batch); squat count tetap urut per frame
+BATCH_SIZE = 256
+
+_EOF = object()
+
+
+def iter_video_paths(inputs: Iterable[str]) -> List[Path]:
+    """Expand argumen (file / folder) -> list file video, urut nama."""
+    paths: List[Path] = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(
+                sorted(c for c in p.iterdir() if c.suffix.lower() in VIDEO_EXTENSIONS)
+            )
+        elif p.is_file():
+            paths.append(p)
+        else:
+            raise FileNotFoundError(f"Video / folder tidak ditemukan: {p}")
+    return paths
+
+
+def _put(q: queue.Queue, item, stop_event: threading.Event) -> bool:
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _decode_frames(cap, q_out: queue.Queue, stop_event: threading.Event, errors: list):
+    """
+    Thread decoder: (frame_idx, t_ms, frame) -> q_out, lalu _EOF. _EOF selalu
+    dikirim (juga kalau decode error) supaya thread utama tidak menunggu
+    selamanya; error disimpan di errors dan di-raise ulang oleh score_video.
+    """
+    try:
+        idx = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            t_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if not _put(q_out, (idx, t_ms, frame), stop_event):
+                return
+            idx += 1
+    except Exception as exc:
+        errors.append(exc)
+    finally:
+        _put(q_out, _EOF, stop_event)
+
+
+class ResultWriter:
+    """Tulis record per frame ke JSONL atau CSV (dipilih dari ekstensi file)."""
+
+    def __init__(self, out_path: Path, label_names: List[str]):
+        self.out_path = out_path
+        self.is_csv = out_path.suffix.lower() == ".csv"
+        self.label_names = label_names
+        self._f = open(out_path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.is_csv:
+            fieldnames = [
+                "video", "frame", "t_ms", "mode", "label", "prob",
+                *[f"prob_{name}" for name in label_names],
+                "feet_status", "knee_status", "form_correct", "squat_count",
+            ]
+            self._csv = csv.DictWriter(self._f, fieldnames=fieldnames)
+            self._csv.writeheader()
+
+    def write(self, record: dict):
+        if self._csv is not None:
+            row = dict(record)
+            probs = row.pop("probs") or {}
+            for name in self.label_names:
+                row[f"prob_{name}"] = probs.get(name, "")
+            self._csv.writerow(row)
+        else:
+            self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._f.close()
+
+
+def frame_record(video: str, frame_idx: int, t_ms: float, info: dict, label_mapping: Dict[int, str]) -> dict:
+    probs = info["probs"]
+    return {
+        "video": video,
+        "frame": frame_idx,
+        "t_ms": round(t_ms, 1),
+        "mode": info["mode"],
+        "label": info["label"],
+        "prob": round(float(info["prob"]), 4),
+        "probs": None if probs is None else {
+            label_mapping.get(i, f"class_{i}"): round(float(p), 4) for i, p in enumerate(probs)
+        },
+        "feet_status": info["feet_status"],
+        "knee_status": info["knee_status"],
+        "form_correct": info["form_correct"],
+        "squat_count": info["squat_count"],
+    }
+
+
+def score_video(
+    video_path: Path,
+    analyzer: ExerciseAnalyzer,
+    mode: str,
+    writer: ResultWriter,
+    flip: bool = True,
+    model_complexity: int = 0,
+    roi: bool = False,
+    record_path: Optional[Path] = None,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Proses 1 video sampai habis. Return ringkasan (frames, squat_count, fps)."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Tidak bisa membuka video: {video_path}")
+
+    label_mapping = (analyzer.plank_cls if mode == "plank" else analyzer.squat_cls).label_mapping
+
+    recorder = None
+    if record_path is not None:
+        from landmark_recording import LandmarkRecorder
+
+        recorder = LandmarkRecorder(record_path)
+
+    q_frames: queue.Queue = queue.Queue(maxsize=DECODE_QUEUE_SIZE)
+    stop_event = threading.Event()
+    decode_errors: list = []
+    decoder = threading.Thread(
+        target=_decode_frames,
+        args=(cap, q_frames, stop_event, decode_errors),
+        name="decode",
+        daemon=True,
+    )
+
+    frames = 0
+    info: Optional[dict] = None
+    image_rgb = None
+    # (frame_idx, t_ms) + landmark per frame yang belum diklasifikasi
+    pending: List[tuple] = []
+    pending_lm: List[Optional[np.ndarray]] = []
+
+    def flush_pending() -> dict:
+        infos = analyzer.analyze_batch(pending_lm, mode)
+        for (frame_idx, t_ms), frame_info in zip(pending, infos):
+            writer.write(frame_record(video_path.name, frame_idx, t_ms, frame_info, label_mapping))
+        pending.clear()
+        pending_lm.clear()
+        return infos[-1]
+
+    t_start = time.perf_counter()
+    decoder.start()
+    try:
+        with create_pose(model_complexity, roi=roi) as pose:
+            while True:
+                item = q_frames.get()
+                if item is _EOF:
+                    break
+                frame_idx, t_ms, frame = item
+
+                image_rgb = bgr_to_rgb(frame, image_rgb)
+                image_rgb.flags.writeable = False
+                results = pose.process(image_rgb)
+
+                # flip: landmark di-mirror (sama seperti pose di frame cv2.flip)
+                lm = landmarks_to_array(results.pose_landmarks)
+                if flip:
+                    lm = mirror_landmarks(lm)
+                if recorder is not None:
+                    recorder.write(frame_idx, t_ms, lm)
+                pending.append((frame_idx, t_ms))
+                pending_lm.append(lm)
+                if len(pending) >= batch_size:
+                    info = flush_pending()
+                frames += 1
+        if pending:
+            info = flush_pending()
+        if decode_errors:
+            raise RuntimeError(f"Decode gagal: {video_path}") from decode_errors[0]
+    finally:
+        stop_event.set()
+        decoder.join()
+        cap.release()
+        if recorder is not None:
+            recorder.close()
+
+    elapsed = time.perf_counter() - t_start
+    return {
+        "video": str(video_path),
+        "mode": mode,
+        "frames": frames,
+        "squat_count": info["squat_count"] if info is not None else 0,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless offline scoring untuk video rekaman.")
+    parser.add_argument("inputs", nargs="+", help="File video dan/atau folder berisi video.")
+    parser.add_argument("--mode", choices=["plank", "squat"], default="squat")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=Path("offline_results.jsonl"),
+        help="File output per frame (.jsonl atau .csv).",
+    )
+    parser.add_argument(
+        "--no-flip",
+        action="store_true",
+        help="Jangan mirror frame (default: mirror seperti webcam realtime).",
+    )
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1, 2], default=0)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Frame per batch klasifikasi (1x predict_batch, default: {BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--gate-threshold",
+        type=float,
+        default=None,
+        help="Motion gate: pakai hasil klasifikasi cache kalau perpindahan badan < nilai ini x torso.",
+    )
+    parser.add_argument("--gate-max-stale", type=int, default=GATE_MAX_STALE)
+    parser.add_argument(
+        "--backend",
+        choices=INFERENCE_BACKENDS,
+        default="tflite",
+        help="Backend MLP: tflite atau numpy (bobot .npz, tanpa runtime TFLite).",
+    )
+    parser.add_argument(
+        "--record-dir",
+        type=Path,
+        default=None,
+        help="Rekam landmark tiap video ke <dir>/<nama video>.lmrec (replay: landmark_recording.py).",
+    )
+    parser.add_argument(
+        "--roi",
+        action="store_true",
+        help="Pose hanya di crop sekitar landmark frame sebelumnya (fallback ke full frame).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    videos = iter_video_paths(args.inputs)
+    if not videos:
+        raise FileNotFoundError("Tidak ada file video yang ditemukan.")
+    if args.record_dir:
+        args.record_dir.mkdir(parents=True, exist_ok=True)
+
+    # Hanya interpreter untuk mode yang dipakai yang akan di-load
+    gate = {"gate_threshold": args.gate_threshold, "gate_max_stale": args.gate_max_stale, "backend": args.backend}
+    plank_cls = classifier_loader(PLANK_TFLITE, PLANK_META, "plank", **gate)
+    squat_cls = classifier_loader(SQUAT_TFLITE, SQUAT_META, "squat_stage", **gate)
+    squat_thresholds = load_squat_thresholds()
+
+    label_cls = plank_cls() if args.mode == "plank" else squat_cls()
+    writer = ResultWriter(args.out, list(label_cls.label_mapping.values()))
+
+    summaries = []
+    total_frames = 0
+    t_start = time.perf_counter()
+    try:
+        for video_path in videos:
+            # Analyzer baru per video -> squat counter mulai dari 0 lagi
+            analyzer = ExerciseAnalyzer(plank_cls, squat_cls, squat_thresholds)
+            summary = score_video(
+                video_path,
+                analyzer,
+                args.mode,
+                writer,
+                flip=not args.no_flip,
+                model_complexity=args.model_complexity,
+                roi=args.roi,
+                batch_size=args.batch_size,
+                record_path=(
+                    args.record_dir / (video_path.stem + ".lmrec") if args.record_dir else None
+                ),
+            )
+            summaries.append(summary)
+            total_frames += summary["frames"]
+            print(
+                f"[offline] {video_path.name}: {summary['frames']} frames, "
+                f"squat_count={summary['squat_count']}, {summary['fps']:.1f} frames/sec"
+            )
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t_start
+    overall_fps = total_frames / elapsed if elapsed > 0 else 0.0
+    print(f"[offline] Total: {total_frames} frames in {elapsed:.1f}s ({overall_fps:.1f} frames/sec)")
+
+    summary = {"videos": summaries, "total_frames": total_frames, "fps": round(overall_fps, 2)}
+    if args.gate_threshold is not None:
+        # Bandingkan squat_count dengan run tanpa gate untuk tuning threshold
+        summary["gate"] = {
+            "threshold": args.gate_threshold,
+            "max_stale": args.gate_max_stale,
+            **label_cls.gate_stats(),
+        }
+        print(f"[offline] Motion gate skip ratio: {summary['gate']['skip_ratio'] * 100:.1f}%")
+
+    summary_path = args.out.with_name(args.out.name + ".summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"[offline] Saved results to: {args.out}")
+    print(f"[offline] Saved summary to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Adaptive quality governor (opsi --target-fps / --latency-budget-ms).
+
+Setting kualitas disusun sebagai tangga level, dari paling ringan ke paling
+berat. Governor melihat latency per frame terakhir dan naik / turun 1 level
+supaya target FPS (atau latency budget) tetap terpenuhi:
+
+    level    input pose   model_complexity   overlay
+    low      320x240      0                  minimal (tanpa skeleton / baris debug)
+    medium   480x360      0                  full
+    default  640x480      0                  full     <- sama dengan tanpa governor
+    high     640x480      1                  full
+    max      640x480      2                  full
+
+Hysteresis supaya tidak bolak-balik:
+- Turun level kalau p90 latency window > budget.
+- Naik level hanya kalau p90 < budget * UPGRADE_HEADROOM selama
+  UPGRADE_PATIENCE window berturut-turut. Setiap kali sebuah level gagal
+  (turun lagi karena over budget), patience untuk naik ke level itu
+  digandakan (maks MAX_UPGRADE_BACKOFF x).
+- Setelah ganti level, tunggu COOLDOWN_FRAMES frame sebelum evaluasi lagi
+  (ganti model_complexity = buat ulang graph Pose, butuh waktu stabil).
+
+Setiap perubahan di-print dengan alasannya dan disimpan di governor.changes.
+"""
+
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class QualityLevel(NamedTuple):
+    name: str
+    pose_size: Tuple[int, int]  # (width, height) input ke pose.process()
+    model_complexity: int
+    overlay: str                # "full" / "minimal"
+
+
+QUALITY_LEVELS = (
+    QualityLevel("low", (320, 240), 0, "minimal"),
+    QualityLevel("medium", (480, 360), 0, "full"),
+    QualityLevel("default", (640, 480), 0, "full"),
+    QualityLevel("high", (640, 480), 1, "full"),
+    QualityLevel("max", (640, 480), 2, "full"),
+)
+DEFAULT_LEVEL = "default"
+
+# Jumlah frame per window evaluasi
+EVAL_WINDOW = 30
+# Frame yang dilewati setelah ganti level
+COOLDOWN_FRAMES = 60
+# Naik level hanya kalau p90 < budget * UPGRADE_HEADROOM ...
+UPGRADE_HEADROOM = 0.6
+# ... selama sekian window berturut-turut
+UPGRADE_PATIENCE = 3
+# Batas kelipatan patience untuk level yang pernah gagal
+MAX_UPGRADE_BACKOFF = 32
+
+
+class QualityGovernor:
+    """
+    Panggil update(latency_detik) sekali per frame dari thread pose. Kalau
+    level berubah, update() return QualityLevel baru (caller yang membuat
+    ulang Pose kalau model_complexity berubah), selain itu None.
+    """
+
+    def __init__(
+        self,
+        target_fps: Optional[float] = None,
+        latency_budget_ms: Optional[float] = None,
+        start_level: str = DEFAULT_LEVEL,
+        levels: Tuple[QualityLevel, ...] = QUALITY_LEVELS,
+    ):
+        if latency_budget_ms is not None:
+            self.budget = latency_budget_ms / 1000.0
+        elif target_fps:
+            self.budget = 1.0 / target_fps
+        else:
+            raise ValueError("Isi target_fps atau latency_budget_ms.")
+
+        self.levels = levels
+        names = [lv.name for lv in levels]
+        if start_level not in names:
+            raise ValueError(f"Level tidak dikenal: {start_level} (pilihan: {names})")
+        self.index = names.index(start_level)
+
+        self._window: List[float] = []
+        self._cooldown = 0
+        self._good_windows = 0
+        # index level -> berapa kali level itu turun karena over budget
+        self._failures: Dict[int, int] = {}
+        self.changes: List[dict] = []
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def resize_for_pose(self, image_rgb: np.ndarray) -> np.ndarray:
+        """Resize frame RGB ke input size level sekarang (tidak copy kalau sudah pas)."""
+        w, h = self.level.pose_size
+        if image_rgb.shape[1] == w and image_rgb.shape[0] == h:
+            return image_rgb
+        return cv2.resize(image_rgb, (w, h), interpolation=cv2.INTER_AREA)
+
+    def update(self, latency: float) -> Optional[QualityLevel]:
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return None
+
+        self._window.append(latency)
+        if len(self._window) < EVAL_WINDOW:
+            return None
+
+        p90 = float(np.percentile(self._window, 90))
+        self._window.clear()
+
+        if p90 > self.budget:
+            self._good_windows = 0
+            if self.index > 0:
+                self._failures[self.index] = self._failures.get(self.index, 0) + 1
+                return self._change(self.index - 1, p90, "over budget")
+        elif p90 < self.budget * UPGRADE_HEADROOM:
+            self._good_windows += 1
+            if self.index < len(self.levels) - 1 and self._good_windows >= self._upgrade_patience():
+                return self._change(self.index + 1, p90, "headroom")
+        else:
+            self._good_windows = 0
+        return None
+
+    def _upgrade_patience(self) -> int:
+        fails = self._failures.get(self.index + 1, 0)
+        return UPGRADE_PATIENCE * min(2 ** fails, MAX_UPGRADE_BACKOFF)
+
+    def _change(self, new_index: int, p90: float, reason: str) -> QualityLevel:
+        old = self.level
+        self.index = new_index
+        self._cooldown = COOLDOWN_FRAMES
+        self._good_windows = 0
+        new = self.level
+        self.changes.append({
+            "ts": round(time.time(), 3),
+            "from": old.name,
+            "to": new.name,
+            "p90_ms": round(p90 * 1000.0, 2),
+            "budget_ms": round(self.budget * 1000.0, 2),
+            "reason": reason,
+        })
+        print(
+            f"[governor] {old.name} -> {new.name} ({reason}: p90 {p90 * 1000.0:.1f} ms, "
+            f"budget {self.budget * 1000.0:.1f} ms) | pose {new.pose_size[0]}x{new.pose_size[1]}, "
+            f"model_complexity {new.model_complexity}, overlay {new.overlay}"
+        )
+        return new
+
+
+class GovernedPose:
+    """
+    Pose yang mengikuti level governor: input di-resize ke pose_size level
+    sekarang, dan graph Pose dibuat ulang kalau model_complexity berubah.
+
+    pose_factory(model_complexity) -> mp_pose.Pose / RoiPose baru.
+    """
+
+    def __init__(self, governor: QualityGovernor, pose_factory: Callable[[int], object]):
+        self.governor = governor
+        self.pose_factory = pose_factory
+        self._model_complexity = governor.level.model_complexity
+        self.pose = pose_factory(self._model_complexity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pose.close()
+
+    def process(self, image_rgb: np.ndarray):
+        return self.pose.process(self.governor.resize_for_pose(image_rgb))
+
+    def report(self, latency: float):
+        """Latency frame ini (detik) -> governor; ganti graph Pose kalau perlu."""
+        new = self.governor.update(latency)
+        if new is not None and new.model_complexity != self._model_complexity:
+            self.pose.close()
+            self._model_complexity = new.model_complexity
+            self.pose = self.pose_factory(self._model_complexity)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mode pipelined untuk realtime_plank_squat_tflite.py (opsi --pipelined).
+
+Loop sequential menjalankan capture -> pose -> classify -> render berurutan,
+jadi FPS dibatasi oleh JUMLAH latency semua stage. Di sini tiap stage jalan
+di thread sendiri dan dihubungkan dengan bounded queue:
+
+    capture --q_capture--> pose --q_pose--> classify --q_classify--> render
+
+- Capture : cap.read() (tanpa flip). Kalau q_capture penuh, frame dibuang (drop)
+            supaya latency tidak menumpuk.
+- Pose    : MediaPipe Pose (graph dibuat di thread ini).
+- Classify: TFLite + form check + squat counting. Hanya 1 thread dan semua
+            queue FIFO, jadi state squat tetap di-update sesuai urutan frame.
+- Render  : overlay + imshow + keyboard (di main thread, syarat OpenCV GUI),
+            atau preview MJPEG + kontrol HTTP kalau --preview-port.
+
+Kedalaman tiap queue ditampilkan di overlay supaya kelihatan stage mana
+yang jadi bottleneck (queue sebelum stage yang lambat akan selalu penuh).
+"""
+
+import queue
+import threading
+import time
+import traceback
+
+from realtime_plank_squat_tflite import (
+    ExerciseAnalyzer,
+    bgr_to_rgb,
+    create_state_pose,
+    draw_overlay,
+    draw_skeleton,
+    flip_for_display,
+    handle_key,
+    landmarks_to_array,
+    mirror_landmarks,
+    overlay_detail,
+    report_startup,
+    show_frame,
+    telemetry_lines,
+)
+from telemetry import FrameTelemetry
+
+# Sentinel untuk menghentikan stage berikutnya
+_STOP = object()
+
+# Interval print queue depth ke console (detik)
+QUEUE_REPORT_INTERVAL = 5.0
+
+
+def _put(q: queue.Queue, item, stop_event: threading.Event) -> bool:
+    """Blocking put yang tetap bisa dibatalkan lewat stop_event."""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop_event: threading.Event):
+    """Blocking get yang tetap bisa dibatalkan lewat stop_event."""
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _STOP
+
+
+def _run_stage(target, stop_event: threading.Event, args: tuple):
+    """Jalankan 1 stage; kalau error, hentikan semua stage (jangan hang di _get)."""
+    try:
+        target(*args)
+    except Exception:
+        traceback.print_exc()
+        stop_event.set()
+
+
+class PipelineStats:
+    """Counter sederhana yang di-update dari thread capture."""
+
+    def __init__(self):
+        self.captured = 0
+        self.dropped = 0
+
+
+def _capture_stage(
+    cap,
+    q_out: queue.Queue,
+    stop_event: threading.Event,
+    stats: PipelineStats,
+    telemetry: FrameTelemetry,
+):
+    seq = 0
+    while not stop_event.is_set():
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            print("Frame tidak terbaca, stop.")
+            break
+        t1 = time.perf_counter()
+        telemetry.record("capture", t1 - t0)
+
+        stats.captured += 1
+        try:
+            q_out.put_nowait((seq, frame))
+        except queue.Full:
+            # Pose stage ketinggalan: buang frame baru, jangan tumpuk latency
+            stats.dropped += 1
+            telemetry.add_dropped()
+            continue
+        seq += 1
+
+    _put(q_out, _STOP, stop_event)
+
+
+def _pose_stage(
+    q_in: queue.Queue,
+    q_out: queue.Queue,
+    stop_event: threading.Event,
+    telemetry: FrameTelemetry,
+    state: dict,
+):
+    governor = state.get("governor")
+    image_rgb = None
+    with create_state_pose(state) as pose:
+        while True:
+            item = _get(q_in, stop_event)
+            if item is _STOP:
+                break
+            seq, frame = item
+
+            # Frame tidak di-flip: pose di frame asli, landmark di-mirror di classify
+            t0 = time.perf_counter()
+            image_rgb = bgr_to_rgb(frame, image_rgb)
+            image_rgb.flags.writeable = False
+            t1 = time.perf_counter()
+            telemetry.record("convert", t1 - t0)
+
+            results = pose.process(image_rgb)
+            t2 = time.perf_counter()
+            telemetry.record("pose", t2 - t1)
+            if governor is not None:
+                # Stage pose yang paling berat, governor menjaga stage ini
+                pose.report(t2 - t0)
+
+            if not _put(q_out, (seq, frame, results.pose_landmarks), stop_event):
+                return
+
+    _put(q_out, _STOP, stop_event)
+
+
+def _classify_stage(
+    q_in: queue.Queue,
+    q_out: queue.Queue,
+    stop_event: threading.Event,
+    analyzer: ExerciseAnalyzer,
+    state: dict,
+):
+    recorder = state.get("recorder")
+    last_seq = -1
+    while True:
+        item = _get(q_in, stop_event)
+        if item is _STOP:
+            break
+        seq, frame, pose_landmarks = item
+
+        # Stage sebelumnya single-thread + FIFO, jadi urutan harus selalu naik.
+        # Bukan assert (hilang di python -O); _run_stage menghentikan pipeline.
+        if seq <= last_seq:
+            raise RuntimeError(f"frame out of order: {seq} after {last_seq}")
+        last_seq = seq
+
+        lm = mirror_landmarks(landmarks_to_array(pose_landmarks))
+        if recorder is not None:
+            recorder.write(seq, None, lm)
+        info = analyzer.analyze(lm, state["mode"])
+
+        if not _put(q_out, (seq, frame, pose_landmarks, info), stop_event):
+            return
+
+    _put(q_out, _STOP, stop_event)
+
+
+def run_pipelined(cap, analyzer: ExerciseAnalyzer, state: dict, queue_size: int = 2):
+    """Jalankan realtime loop dengan stage paralel. Render + keyboard di thread pemanggil."""
+    stop_event = threading.Event()
+    stats = PipelineStats()
+    telemetry = state.setdefault("telemetry", FrameTelemetry())
+
+    q_capture = queue.Queue(maxsize=queue_size)
+    q_pose = queue.Queue(maxsize=queue_size)
+    q_classify = queue.Queue(maxsize=queue_size)
+
+    threads = [
+        threading.Thread(
+            target=_run_stage,
+            args=(_capture_stage, stop_event, (cap, q_capture, stop_event, stats, telemetry)),
+            name="capture",
+            daemon=True,
+        ),
+        threading.Thread(
+            target=_run_stage,
+            args=(_pose_stage, stop_event, (q_capture, q_pose, stop_event, telemetry, state)),
+            name="pose",
+            daemon=True,
+        ),
+        threading.Thread(
+            target=_run_stage,
+            args=(_classify_stage, stop_event, (q_pose, q_classify, stop_event, analyzer, state)),
+            name="classify",
+            daemon=True,
+        ),
+    ]
+    for t in threads:
+        t.start()
+
+    print(f"=== Pipelined mode (queue size {queue_size}) ===")
+
+    last_report = time.time()
+    first_frame = True
+
+    try:
+        while True:
+            item = _get(q_classify, stop_event)
+            if item is _STOP:
+                break
+            seq, frame, pose_landmarks, info = item
+
+            now = time.time()
+            depth_line = (
+                f"Q cap:{q_capture.qsize()}/{queue_size} "
+                f"pose:{q_pose.qsize()}/{queue_size} "
+                f"cls:{q_classify.qsize()}/{queue_size} "
+                f"drop:{stats.dropped}"
+            )
+            if now - last_report >= QUEUE_REPORT_INTERVAL:
+                print(f"[pipeline] frame {seq} | {depth_line}")
+                last_report = now
+
+            t0 = time.perf_counter()
+            full_overlay = overlay_detail(state) == "full"
+            if state["draw_skeleton"] and pose_landmarks and full_overlay:
+                draw_skeleton(frame, pose_landmarks)
+            flip_for_display(frame)
+            extra_lines = (depth_line, *telemetry_lines(state))
+            if not full_overlay:
+                extra_lines = ()
+            draw_overlay(frame, info, telemetry.fps(), extra_lines=extra_lines)
+            t1 = time.perf_counter()
+            telemetry.record("overlay", t1 - t0)
+
+            key = show_frame(state, frame)
+            if first_frame:
+                report_startup()
+                first_frame = False
+            telemetry.record("display", time.perf_counter() - t1)
+            telemetry.frame_done()
+            if not handle_key(key, state):
+                break
+    finally:
+        stop_event.set()
+        for t in threads:
+            t.join(timeout=2.0)
+
+    print(f"[pipeline] captured={stats.captured}, dropped={stats.dropped}")
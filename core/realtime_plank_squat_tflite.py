@@ -21,18 +21,69 @@ Realtime demo (480p, NO FRAME SKIP) dengan TFLite:
     - Skeleton (bisa toggle),
     - FPS,
     - Mode, label, count, FEET/KNEE status, form status.
+- Mode --pipelined:
+    - capture / pose / classify / render jalan di thread terpisah (lihat realtime_pipeline.py).
+- Mode --roi:
+    - pose.process() hanya di crop sekitar badan (lihat roi_pose.py).
+- Opsi --gate-threshold:
+    - predict() memakai hasil cache selama badan hampir diam (lihat MOTION GATE),
+      skip ratio di-print saat keluar.
+- Opsi --model-variant:
+    - varian TFLite dynamic / float / int8 / fp16 dari training, atau auto
+      (varian tercepat tanpa turun accuracy, dari quantization_report.json).
+- Profil interpreter per host:
+    - num_threads / XNNPACK / ukuran batch hasil tune_interpreter.py dibaca
+      otomatis saat startup (interpreter_profiles/<host>.json).
+- Opsi --backend numpy:
+    - MLP plank / squat stage dijalankan sebagai matmul NumPy dari bobot .npz,
+      tanpa runtime TFLite (lihat NUMPY MLP BACKEND).
+- Opsi --fused:
+    - plank + squat stage dari 1 model multi-head (lihat FUSED CLASSIFIER).
+- Opsi --squat-model temporal:
+    - stage squat dari window frame terakhir (ring buffer landmark), invoke
+      hanya tiap --temporal-stride frame (lihat TEMPORAL STAGE CLASSIFIER).
+- Opsi --latest-frame:
+    - kamera dibaca di thread sendiri, hanya frame terbaru yang diproses
+      (lihat latest_frame_capture.py).
+- Opsi --target-fps / --latency-budget-ms:
+    - resolusi pose, model_complexity dan detail overlay diatur otomatis
+      (lihat quality_governor.py).
+- Opsi --record:
+    - landmark per frame direkam ke .lmrec untuk replay (lihat landmark_recording.py).
+- Telemetry (lihat telemetry.py):
+    - latency per stage (p50/p95/p99 rolling), FPS rata-rata window, frame drop,
+    - --telemetry-overlay, --telemetry-jsonl, --metrics-port (format Prometheus).
+- Opsi --preview-port (headless, tanpa cv2.imshow):
+    - frame hasil overlay di-stream sebagai MJPEG lewat HTTP, tombol p / s / d / q
+      lewat POST /key/<k> (lihat mjpeg_preview.py).
 """
 
+import argparse
+import functools
 import json
 import math
+import platform
+import re
+import sys
 import time
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, NamedTuple, Sequence, Tuple, Optional, Union
+
+# Titik awal untuk laporan time-to-first-frame (sebelum import library berat)
+_T_PROCESS_START = time.perf_counter()
 
 import cv2
 import numpy as np
 import mediapipe as mp
-import tensorflow as tf
+from mediapipe.framework.formats import landmark_pb2
+
+try:
+    import resource  # Unix only, untuk laporan peak RSS
+except ImportError:
+    resource = None
+
+from telemetry import FrameTelemetry, JsonlExporter, start_metrics_server
+from text_sprites import TextSpriteCache
 
 THIS_DIR = Path(__file__).resolve().parent
 
@@ -45,6 +96,12 @@ PLANK_META   = THIS_DIR / "plank_model" / "model" / "meta.json"
 SQUAT_TFLITE = THIS_DIR / "squat_model" / "model" / "squat_stage_mlp.tflite"
 SQUAT_META   = THIS_DIR / "squat_model" / "model" / "meta.json"
 SQUAT_THRESHOLDS = THIS_DIR / "squat_model" / "model" / "squat_thresholds.json"
+# Model stage temporal (opsi --squat-model temporal), hasil train_temporal_stage_classifier()
+SQUAT_TEMPORAL_TFLITE = THIS_DIR / "squat_model" / "model" / "squat_stage_temporal.tflite"
+SQUAT_TEMPORAL_META   = THIS_DIR / "squat_model" / "model" / "meta_temporal.json"
+# Model fused plank + squat_stage (opsi --fused), hasil train_fused_classifier()
+FUSED_TFLITE = THIS_DIR / "fused_model" / "model" / "plank_squat_fused.tflite"
+FUSED_META   = THIS_DIR / "fused_model" / "model" / "meta.json"
 
 # Label stage squat (untuk counting)
 SQUAT_STAGE_DOWN_LABELS = {"down", "bottom"}
@@ -66,6 +123,442 @@ JOINT_NAME_TO_MP = {
 }
 
 
+# -------------------------- LANDMARK ARRAY -------------------------- #
+#
+# Landmark MediaPipe diubah SEKALI per frame jadi ndarray float32 (33, 4):
+# kolom [x, y, z, visibility]. Semua fitur & geometry di bawah membaca array
+# ini, dan punya varian batch (N, 33, 4) yang full vectorized untuk offline.
+
+NUM_LANDMARKS = 33
+LM_X, LM_Y, LM_Z, LM_VIS = 0, 1, 2, 3
+
+_LM = mp_pose.PoseLandmark
+LEFT_SHOULDER, RIGHT_SHOULDER = _LM.LEFT_SHOULDER.value, _LM.RIGHT_SHOULDER.value
+LEFT_HIP, RIGHT_HIP = _LM.LEFT_HIP.value, _LM.RIGHT_HIP.value
+LEFT_KNEE, RIGHT_KNEE = _LM.LEFT_KNEE.value, _LM.RIGHT_KNEE.value
+LEFT_ANKLE, RIGHT_ANKLE = _LM.LEFT_ANKLE.value, _LM.RIGHT_ANKLE.value
+
+# Landmark badan (bahu s/d kaki, tanpa wajah)
+BODY_IDX = np.arange(LEFT_SHOULDER, NUM_LANDMARKS)
+LOWER_BODY_IDX = np.array(
+    [LEFT_HIP, RIGHT_HIP, LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE], dtype=np.intp
+)
+# Titik yang dipakai geometry squat, urut: ls, rs, lh, rh, lk, rk, la, ra
+SQUAT_POINT_IDX = np.array(
+    [
+        LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP,
+        LEFT_KNEE, RIGHT_KNEE, LEFT_ANKLE, RIGHT_ANKLE,
+    ],
+    dtype=np.intp,
+)
+
+# Layout wire protobuf NormalizedLandmark kalau semua field diset:
+#   0x0a <len> | 0x0d x | 0x15 y | 0x1d z | 0x25 visibility | [0x2d presence]
+# Output MediaPipe Pose selalu mengisi field ini, jadi 1x SerializeToString()
+# + view NumPy jauh lebih murah daripada 132x akses atribut protobuf.
+_WIRE_FIELD_TAGS = (0x0D, 0x15, 0x1D, 0x25, 0x2D)
+
+
+def _wire_layout(n_fields: int):
+    rec_size = 2 + 5 * n_fields
+    tag_pos = [0, 1] + [2 + 5 * i for i in range(n_fields)]
+    tag_val = [0x0A, rec_size - 2] + list(_WIRE_FIELD_TAGS[:n_fields])
+    return rec_size, (np.array(tag_pos, dtype=np.intp), np.array(tag_val, dtype=np.uint8))
+
+
+# rec_size -> (posisi tag, nilai tag); 4 field (tanpa presence) atau 5 field
+_WIRE_LAYOUTS = dict(_wire_layout(n) for n in (4, 5))
+
+
+def _landmarks_from_wire(pose_landmarks) -> Optional[np.ndarray]:
+    """Fast path: decode bytes protobuf langsung. None kalau layout tidak dikenali."""
+    n = len(pose_landmarks.landmark)
+    buf = pose_landmarks.SerializeToString()
+    if n == 0 or len(buf) % n:
+        return None
+    rec_size = len(buf) // n
+    layout = _WIRE_LAYOUTS.get(rec_size)
+    if layout is None:
+        return None
+
+    tag_pos, tag_val = layout
+    raw = np.frombuffer(buf, dtype=np.uint8).reshape(n, rec_size)
+    if not (raw[:, tag_pos] == tag_val).all():
+        return None
+
+    # x, y, z, visibility: float32 little-endian mulai byte 3, selang 5 byte
+    vals = np.ndarray((n, 4), dtype="<f4", buffer=buf, offset=3, strides=(rec_size, 5))
+    return vals.astype(np.float32)
+
+
+def landmarks_to_array(pose_landmarks) -> Optional[np.ndarray]:
+    """NormalizedLandmarkList -> ndarray float32 (33, 4), atau None kalau pose tidak ada."""
+    if pose_landmarks is None:
+        return None
+    arr = _landmarks_from_wire(pose_landmarks)
+    if arr is not None:
+        return arr
+    return np.array(
+        [(lm.x, lm.y, lm.z, lm.visibility) for lm in pose_landmarks.landmark],
+        dtype=np.float32,
+    ).reshape(-1, 4)
+
+
+# Record wire 4 field (x, y, z, visibility) sebagai structured dtype, untuk
+# arah sebaliknya: ndarray -> bytes -> ParseFromString().
+_WIRE_RECORD_DTYPE = np.dtype([
+    ("tag", "u1"), ("len", "u1"),
+    ("tx", "u1"), ("x", "<f4"),
+    ("ty", "u1"), ("y", "<f4"),
+    ("tz", "u1"), ("z", "<f4"),
+    ("tv", "u1"), ("v", "<f4"),
+])
+
+
+def array_to_landmarks(lm: np.ndarray) -> landmark_pb2.NormalizedLandmarkList:
+    """ndarray (N, 4) [x, y, z, visibility] -> NormalizedLandmarkList (kebalikan landmarks_to_array)."""
+    rec = np.empty(len(lm), dtype=_WIRE_RECORD_DTYPE)
+    rec["tag"] = 0x0A
+    rec["len"] = _WIRE_RECORD_DTYPE.itemsize - 2
+    for tag_name, value_name, tag in zip(("tx", "ty", "tz", "tv"), "xyzv", _WIRE_FIELD_TAGS):
+        rec[tag_name] = tag
+    rec["x"], rec["y"], rec["z"], rec["v"] = lm[:, LM_X], lm[:, LM_Y], lm[:, LM_Z], lm[:, LM_VIS]
+
+    out = landmark_pb2.NormalizedLandmarkList()
+    out.ParseFromString(rec.tobytes())
+    return out
+
+
+def as_landmark_array(pose_landmarks) -> Optional[np.ndarray]:
+    """Terima ndarray (dipakai apa adanya) atau protobuf landmark (dikonversi)."""
+    if pose_landmarks is None or isinstance(pose_landmarks, np.ndarray):
+        return pose_landmarks
+    return landmarks_to_array(pose_landmarks)
+
+
+# ---- Mirror (pengganti cv2.flip sebelum pose) ---- #
+#
+# Pose dijalankan di frame kamera apa adanya (tanpa flip). Supaya classifier
+# dan geometry squat tetap melihat data yang sama seperti dari frame yang
+# di-mirror, landmark-nya yang di-mirror: x -> 1 - x dan index kiri / kanan
+# ditukar (LEFT_SHOULDER di frame mirror = RIGHT_SHOULDER di frame asli).
+
+def _mirror_index() -> np.ndarray:
+    idx = np.arange(NUM_LANDMARKS)
+    for lm in _LM:
+        if "LEFT" in lm.name:  # LEFT_SHOULDER, MOUTH_LEFT, ...
+            right = _LM[lm.name.replace("LEFT", "RIGHT")].value
+            idx[lm.value], idx[right] = right, lm.value
+    return idx
+
+
+MIRROR_INDEX = _mirror_index()
+
+
+def mirror_landmarks(lm: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """ndarray (..., 33, 4) dari frame asli -> landmark seperti dari cv2.flip(frame, 1)."""
+    if lm is None:
+        return None
+    out = lm[..., MIRROR_INDEX, :]  # fancy index -> copy
+    out[..., LM_X] = 1.0 - out[..., LM_X]
+    return out
+
+
+def bgr_to_rgb(frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """cvtColor BGR -> RGB ke buffer `out` (dipakai ulang tiap frame, dibuat kalau belum cocok)."""
+    if out is None or out.shape != frame.shape:
+        out = np.empty_like(frame)
+    out.flags.writeable = True
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+    return out
+
+
+def angle_deg(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """
+    Sudut (derajat) di titik B dari A-B-C, vectorized.
+    a, b, c: array (..., 2) berisi (x, y). Sama seperti _compute_angle di training.
+    """
+    v1 = a - b
+    v2 = c - b
+    dot = (v1 * v2).sum(-1)
+    n1 = np.sqrt((v1 * v1).sum(-1)) + 1e-6
+    n2 = np.sqrt((v2 * v2).sum(-1)) + 1e-6
+    cosang = np.clip(dot / (n1 * n2), -1.0, 1.0)
+    return np.degrees(np.arccos(cosang))
+
+
+# -------------------------- MOTION GATE -------------------------- #
+#
+# Kalau badan hampir tidak bergerak sejak frame terakhir yang diklasifikasi
+# (mis. tahan plank), predict() memakai hasil cache, tanpa feature build +
+# invoke. Perpindahan dinormalisasi dengan panjang torso (tengah bahu ->
+# tengah hip) supaya tidak tergantung jarak orang ke kamera.
+
+# Default max perpindahan landmark badan, relatif ke panjang torso
+GATE_THRESHOLD = 0.03
+# Perubahan visibility di atas ini selalu memicu klasifikasi ulang
+GATE_VISIBILITY_DELTA = 0.1
+# Default maksimal frame berturut-turut yang boleh memakai hasil cache
+GATE_MAX_STALE = 10
+
+# BODY_IDX sebagai slice (view, tanpa copy) untuk cek gate per frame
+_BODY_SLICE = slice(LEFT_SHOULDER, NUM_LANDMARKS)
+
+
+def torso_length(lm: np.ndarray) -> float:
+    """Jarak tengah bahu -> tengah hip (koordinat normalized)."""
+    ls, rs, lh, rh = lm[[LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_HIP, RIGHT_HIP], :2].tolist()
+    return math.hypot(
+        (ls[0] + rs[0] - lh[0] - rh[0]) * 0.5,
+        (ls[1] + rs[1] - lh[1] - rh[1]) * 0.5,
+    )
+
+
+# -------------------------- TFLITE RUNTIME -------------------------- #
+
+@functools.lru_cache(maxsize=None)
+def get_interpreter_class():
+    """
+    Pilih runtime TFLite paling ringan yang terinstall:
+    tflite_runtime -> ai_edge_litert (LiteRT) -> tf.lite (fallback).
+
+    Import tensorflow penuh makan beberapa detik dan ratusan MB RSS hanya
+    untuk menjalankan 2 MLP kecil, jadi baru dipakai kalau tidak ada pilihan lain.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+def create_interpreter(model_path: Path, num_threads: Optional[int] = None, xnnpack: bool = True):
+    interpreter_cls = get_interpreter_class()
+    kwargs = {}
+    if not xnnpack:
+        # Tanpa delegate default (XNNPACK), hanya kernel builtin TFLite
+        op_resolver = sys.modules[interpreter_cls.__module__].OpResolverType
+        kwargs["experimental_op_resolver_type"] = op_resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+    return interpreter_cls(model_path=str(model_path), num_threads=num_threads, **kwargs)
+
+
+# Profil hasil tune_interpreter.py, 1 file per host. Isinya per nama file
+# model: "single" (interpreter realtime, batch 1) dan "batch" (predict_batch)
+# masing-masing {num_threads, xnnpack[, batch_size]}.
+INTERPRETER_PROFILE_DIR = THIS_DIR / "interpreter_profiles"
+
+
+def host_id() -> str:
+    """Nama profil host ini: hostname + arsitektur CPU."""
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", platform.node() or "unknown")
+    return f"{name}-{platform.machine()}"
+
+
+def host_profile_path() -> Path:
+    return INTERPRETER_PROFILE_DIR / f"{host_id()}.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_interpreter_profile() -> dict:
+    """Profil host ini ({} kalau belum pernah di-tune)."""
+    path = host_profile_path()
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def interpreter_settings(tflite_path: Path, kind: str = "single") -> dict:
+    """Setting terbaik model ini ("single" / "batch") di profil host, {} kalau belum ada."""
+    return load_interpreter_profile().get("models", {}).get(Path(tflite_path).name, {}).get(kind, {})
+
+
+# Varian export dari training: "dynamic" = file .tflite utama, varian lain
+# <nama>_<varian>.tflite; "auto" = rekomendasi di quantization_report.json.
+MODEL_VARIANTS = ("dynamic", "float", "int8", "fp16", "auto")
+QUANT_REPORT_NAME = "quantization_report.json"
+
+
+def tflite_variant_path(tflite_path: Path, variant: str = "dynamic") -> Path:
+    if variant == "auto":
+        variant = "dynamic"
+        report_path = tflite_path.parent / QUANT_REPORT_NAME
+        if report_path.exists():
+            with open(report_path, "r", encoding="utf-8") as f:
+                variant = json.load(f).get(tflite_path.stem, {}).get("recommended", "dynamic")
+    if variant == "dynamic":
+        return tflite_path
+    path = tflite_path.with_name(f"{tflite_path.stem}_{variant}.tflite")
+    if not path.exists():
+        print(f"[WARNING] Varian {variant} tidak ada ({path.name}), pakai {tflite_path.name}.")
+        return tflite_path
+    return path
+
+
+class QuantParams(NamedTuple):
+    scale: float
+    zero_point: int
+    qmin: int
+    qmax: int
+
+
+def quant_params(detail: dict) -> Optional[QuantParams]:
+    """Parameter kuantisasi tensor (varian int8), None kalau tensor float."""
+    if detail["dtype"] == np.float32:
+        return None
+    scale, zero_point = detail["quantization"]
+    info = np.iinfo(detail["dtype"])
+    return QuantParams(float(scale), int(zero_point), int(info.min), int(info.max))
+
+
+def quantize_into(out: np.ndarray, x: np.ndarray, params: QuantParams):
+    """
+    out = clip(round(x / scale + zero_point)) ke buffer integer out.
+    x (float32) dipakai sebagai scratch dan ikut ditimpa.
+    """
+    np.multiply(x, 1.0 / params.scale, out=x)
+    np.add(x, params.zero_point, out=x)
+    np.rint(x, out=x)
+    np.maximum(x, params.qmin, out=x)
+    np.minimum(x, params.qmax, out=x)
+    out[...] = x
+
+
+def dequantize(q: np.ndarray, params: Optional[QuantParams]) -> np.ndarray:
+    if params is None:
+        return q
+    x = q.astype(np.float32)
+    x -= params.zero_point
+    x *= params.scale
+    return x
+
+
+# -------------------------- NUMPY MLP BACKEND -------------------------- #
+#
+# Backend alternatif (opsi --backend numpy) untuk MLP Dense hasil
+# build_mlp_classifier: bobot float dari <model>.npz yang diexport training,
+# tiap Dense = 1 matmul NumPy. Tidak butuh tflite_runtime / LiteRT / TensorFlow.
+# NumpyMLPInterpreter meniru subset API tf.lite.Interpreter yang dipakai
+# TFLitePoseClassifier, jadi predict() dan predict_batch() tidak berubah.
+#
+# Catatan: file .tflite utama memakai weight int8 (dynamic range), bobot .npz
+# float, jadi probs identik dengan varian *_float.tflite, bukan file utama.
+
+INFERENCE_BACKENDS = ("tflite", "numpy")
+
+
+def mlp_weights_path(tflite_path: Path) -> Path:
+    """<model>.tflite -> <model>.npz (bobot Dense untuk backend numpy)."""
+    return Path(tflite_path).with_suffix(".npz")
+
+
+class NumpyMLPInterpreter:
+    """
+    Pengganti interpreter TFLite untuk MLP Dense. Format .npz:
+    num_layers, kernel_<i> (in, out), bias_<i> (out,), activation_<i>
+    (relu / linear untuk hidden, softmax / linear untuk layer terakhir).
+    """
+
+    INPUT_INDEX = 0
+    OUTPUT_INDEX = 1
+
+    def __init__(self, weights_path: Path):
+        if not weights_path.exists():
+            raise FileNotFoundError(
+                f"Bobot NumPy tidak ada: {weights_path} (export dari train_plank_squat_models.py)"
+            )
+        kernels, self.activations = [], []
+        with np.load(weights_path) as data:
+            num_layers = int(data["num_layers"])
+            for i in range(num_layers):
+                kernel = data[f"kernel_{i}"].astype(np.float32)
+                bias = data[f"bias_{i}"].astype(np.float32)
+                # Bias dilipat ke kernel: input tiap layer punya kolom konstan 1
+                # di akhir, jadi 1 Dense = 1 matmul tanpa add terpisah.
+                kernels.append(np.vstack([kernel, bias[None]]))
+                self.activations.append(str(data[f"activation_{i}"]))
+
+        hidden_ok = all(a in ("relu", "linear") for a in self.activations[:-1])
+        if not hidden_ok or self.activations[-1] not in ("softmax", "linear"):
+            raise ValueError(f"Aktivasi tidak didukung backend numpy: {self.activations}")
+        self.kernels = kernels
+        self.num_features = kernels[0].shape[0] - 1
+        self.num_classes = kernels[-1].shape[1]
+        self._batch_size = 1
+        self._buffers: List[np.ndarray] = []
+
+    def _detail(self, index: int, width: int) -> dict:
+        return {
+            "name": "input" if index == self.INPUT_INDEX else "output",
+            "index": index,
+            "shape": np.array([self._batch_size, width], dtype=np.int32),
+            "dtype": np.float32,
+            "quantization": (0.0, 0),
+        }
+
+    def get_input_details(self) -> List[dict]:
+        return [self._detail(self.INPUT_INDEX, self.num_features)]
+
+    def get_output_details(self) -> List[dict]:
+        return [self._detail(self.OUTPUT_INDEX, self.num_classes)]
+
+    def resize_tensor_input(self, index: int, shape):
+        if index != self.INPUT_INDEX or int(shape[-1]) != self.num_features:
+            raise ValueError(f"Shape input harus (N, {self.num_features}), bukan {list(shape)}")
+        self._batch_size = int(shape[0])
+
+    def allocate_tensors(self):
+        # Buffer input tiap layer (N, in + 1), kolom terakhir = 1 untuk bias
+        n = self._batch_size
+        self._buffers = [np.ones((n, k.shape[0]), dtype=np.float32) for k in self.kernels]
+        self._views = [buf[:, :-1] for buf in self._buffers]
+        self._output = np.zeros((n, self.num_classes), dtype=np.float32)
+
+    def tensor(self, index: int) -> Callable[[], np.ndarray]:
+        if index != self.INPUT_INDEX:
+            raise ValueError("tensor() hanya untuk input")
+        return lambda: self._views[0]
+
+    def set_tensor(self, index: int, value: np.ndarray):
+        if index != self.INPUT_INDEX:
+            raise ValueError("set_tensor() hanya untuk input")
+        self._views[0][...] = value
+
+    def get_tensor(self, index: int) -> np.ndarray:
+        """Copy, sama seperti TFLite (hasil tidak ikut berubah di invoke berikutnya)."""
+        return (self._output if index == self.OUTPUT_INDEX else self._views[0]).copy()
+
+    def invoke(self):
+        last = len(self.kernels) - 1
+        for i, kernel in enumerate(self.kernels):
+            out = self._output if i == last else self._views[i + 1]
+            np.matmul(self._buffers[i], kernel, out=out)
+            if self.activations[i] == "relu":
+                np.maximum(out, 0.0, out=out)
+
+        if self.activations[-1] != "softmax":
+            return
+        out = self._output
+        if self._batch_size == 1:
+            # 1 frame, sedikit kelas: softmax di Python lebih murah dari 4 ufunc
+            z = out[0].tolist()
+            m = max(z)
+            e = [math.exp(v - m) for v in z]
+            total = sum(e)
+            out[0] = [v / total for v in e]
+        else:
+            out -= out.max(axis=1, keepdims=True)
+            np.exp(out, out=out)
+            out /= out.sum(axis=1, keepdims=True)
+
+
 # -------------------------- DRAW HELPERS -------------------------- #
 
 def draw_text_with_outline(
@@ -99,44 +592,123 @@ def draw_text_with_outline(
     )
 
 
+# Sprite teks overlay (rasterize sekali per teks, lalu blit tiap frame).
+# Dipakai hanya dari thread yang menggambar overlay.
+TEXT_SPRITES = TextSpriteCache()
+
+
 # -------------------------- TFLITE CLASSIFIER -------------------------- #
 
-class TFLitePoseClassifier:
+class TFLitePoseModel:
     """
-    Classifier pose menggunakan TFLite model (.tflite) + meta.json.
+    Bagian bersama semua model pose: interpreter (TFLite / NumPy) realtime +
+    batch, meta.json, fitur landmark, dan state motion gate. Tanpa API
+    predict: TFLitePoseClassifier (1 output) dan FusedPoseClassifier
+    (beberapa head) masing-masing menambahkan predict-nya sendiri.
 
     - Untuk squat_stage: pakai fitur generik (raw x,y,z,visibility) dari landmark.
     - Untuk plank      : pakai fitur engineered seperti di training:
                          *_x_rel, *_y_rel, *_angle_norm.
     """
 
-    def __init__(self, tflite_path: Path, meta_path: Path, exercise_name: str):
-        if not tflite_path.exists():
+    def __init__(
+        self,
+        tflite_path: Path,
+        meta_path: Path,
+        exercise_name: str,
+        num_threads: Optional[int] = None,
+        gate_threshold: Optional[float] = None,
+        gate_max_stale: int = GATE_MAX_STALE,
+        use_profile: bool = True,
+        backend: str = "tflite",
+    ):
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend} (pilihan: {', '.join(INFERENCE_BACKENDS)})")
+        if backend == "tflite" and not tflite_path.exists():
             raise FileNotFoundError(f"TFLite model not found: {tflite_path}")
         if not meta_path.exists():
             raise FileNotFoundError(f"Meta file not found: {meta_path}")
 
         self.exercise_name = exercise_name
-        print(f"[{exercise_name}] Loading TFLite model: {tflite_path}")
-
-        self.interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
+        self.backend = backend
+        self.tflite_path = tflite_path
+        if backend == "numpy":
+            print(f"[{exercise_name}] Loading NumPy MLP weights: {mlp_weights_path(tflite_path)}")
+        else:
+            print(
+                f"[{exercise_name}] Loading TFLite model: {tflite_path} "
+                f"({get_interpreter_class().__module__})"
+            )
+
+        # Profil host (tune_interpreter.py): threads + XNNPACK untuk interpreter
+        # realtime dan batch, plus ukuran chunk batch. num_threads eksplisit menang.
+        use_profile = use_profile and backend == "tflite"
+        single = interpreter_settings(tflite_path, "single") if use_profile else {}
+        batch = interpreter_settings(tflite_path, "batch") if use_profile else {}
+        if single or batch:
+            print(f"[{exercise_name}] Interpreter profile ({host_id()}): single={single}, batch={batch}")
+        self.batch_num_threads = num_threads if num_threads is not None else batch.get("num_threads")
+        self.batch_xnnpack = batch.get("xnnpack", True)
+        self.max_batch_size = int(batch.get("batch_size", self.MAX_BATCH_SIZE))
+        if num_threads is None:
+            num_threads = single.get("num_threads")
+        self.xnnpack = single.get("xnnpack", True)
+
+        self.interpreter = self._create_interpreter(num_threads, self.xnnpack)
         self.interpreter.allocate_tensors()
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
 
         with open(meta_path, "r", encoding="utf-8") as f:
             meta = json.load(f)
-
+        self._init_meta(meta)
+
+        # Accessor view ke buffer input (1, F) interpreter, dipakai predict()
+        self._input_tensor = self.interpreter.tensor(self.input_details[0]["index"])
+
+        # Varian full-integer (int8): fitur ditulis ke buffer float dulu lalu
+        # di-quantize ke input, output di-dequantize. None = float32 biasa.
+        self._input_quant = quant_params(self.input_details[0])
+        self._output_quant = quant_params(self.output_details[0])
+        self._feature_buf = None
+        if self._input_quant is not None:
+            self._feature_buf = np.zeros(self.input_details[0]["shape"][1:], dtype=np.float32)
+
+        # Interpreter batch dibuat lazy saat predict_batch() pertama kali
+        self.num_threads = num_threads
+        self._batch_interpreter = None
+        self._batch_capacity = 0
+
+        # Opsional: FrameTelemetry (telemetry.py), diisi ExerciseAnalyzer
+        self.telemetry = None
+
+        # Motion gate (None = nonaktif, setiap frame di-invoke)
+        self.gate_threshold = gate_threshold
+        self.gate_max_stale = gate_max_stale
+        self.gate_calls = 0
+        self.gate_skipped = 0
+        self._gate_lm: Optional[np.ndarray] = None
+        self._gate_limit2 = 0.0  # (threshold * torso)^2 dari frame cache
+        self._gate_result = None
+        self._gate_age = 0
+
+    def _create_interpreter(self, num_threads: Optional[int], xnnpack: bool):
+        """Interpreter TFLite, atau NumpyMLPInterpreter untuk backend numpy."""
+        if self.backend == "numpy":
+            return NumpyMLPInterpreter(mlp_weights_path(self.tflite_path))
+        return create_interpreter(self.tflite_path, num_threads=num_threads, xnnpack=xnnpack)
+
+    def _init_meta(self, meta: dict):
+        """feature_columns + label_mapping dari meta.json, lalu susun feature mapping."""
         self.feature_columns: List[str] = meta["feature_columns"]
         self.label_mapping: Dict[int, str] = {
             int(k): v for k, v in meta["label_mapping"].items()
         }
 
-        print(f"[{exercise_name}] Feature columns: {len(self.feature_columns)}")
-        print(f"[{exercise_name}] Labels: {list(self.label_mapping.values())}")
+        print(f"[{self.exercise_name}] Feature columns: {len(self.feature_columns)}")
+        print(f"[{self.exercise_name}] Labels: {list(self.label_mapping.values())}")
 
         self.is_plank = (self.exercise_name == "plank")
-
         if self.is_plank:
             self._init_plank_feature_mapping()
         else:
@@ -144,13 +716,16 @@ class TFLitePoseClassifier:
 
     # ---------- GENERIC (untuk squat_stage) ---------- #
 
-    def _init_generic_feature_mapping(self):
+    def _init_generic_feature_mapping(self, columns: Optional[List[str]] = None):
         """
         Buat mapping dari nama kolom -> (index landmark, kode koordinat)
         coord_code: 0=x, 1=y, 2=z, 3=visibility
+
+        Lalu dikompilasi jadi index array supaya per frame cukup 1 gather NumPy.
+        columns: default self.feature_columns.
         """
         self.feature_specs: List[Tuple[Optional[int], int]] = []
-        for col in self.feature_columns:
+        for col in (self.feature_columns if columns is None else columns):
             try:
                 joint_name, coord = col.rsplit("_", 1)
             except ValueError:
@@ -166,43 +741,63 @@ class TFLitePoseClassifier:
             coord_code = coord_map.get(coord, -1)
             self.feature_specs.append((lm_enum.value, coord_code))
 
-    def _build_generic_feature_vector(self, pose_landmarks):
-        if pose_landmarks is None:
-            return None
+        valid = [lm_idx is not None and code >= 0 for lm_idx, code in self.feature_specs]
+        self._generic_valid = np.array(valid, dtype=bool)
+        self._generic_lm_idx = np.array(
+            [lm_idx if ok else 0 for (lm_idx, _), ok in zip(self.feature_specs, valid)],
+            dtype=np.intp,
+        )
+        self._generic_coord_idx = np.array(
+            [code if ok else 0 for (_, code), ok in zip(self.feature_specs, valid)],
+            dtype=np.intp,
+        )
 
-        features = []
-        for lm_idx, coord_code in self.feature_specs:
-            if lm_idx is None or coord_code < 0:
-                features.append(0.0)
-                continue
+        # Gather plan per frame: index flat ke lm.reshape(-1) (33 * 4),
+        # kolom yang tidak dikenal di-nol-kan lewat mask.
+        self._generic_flat_idx = self._generic_lm_idx * 4 + self._generic_coord_idx
+        self._generic_mask = None if all(valid) else self._generic_valid.astype(np.float32)
 
-            lm = pose_landmarks.landmark[lm_idx]
-            if coord_code == 0:
-                val = lm.x
-            elif coord_code == 1:
-                val = lm.y
-            elif coord_code == 2:
-                val = lm.z
-            else:
-                val = lm.visibility
+    def _write_generic_features(self, lm: np.ndarray, out: np.ndarray):
+        """Tulis fitur 1 frame langsung ke out (F,) tanpa alokasi buffer baru."""
+        np.take(lm.reshape(-1), self._generic_flat_idx, out=out, mode="clip")
+        if self._generic_mask is not None:
+            np.multiply(out, self._generic_mask, out=out)
 
-            features.append(float(val))
+    def _build_generic_feature_vector(self, lm: Optional[np.ndarray]):
+        """lm: (33, 4) -> (1, F), atau batch (N, 33, 4) -> (N, F)."""
+        if lm is None:
+            return None
 
-        x = np.array(features, dtype="float32").reshape(1, -1)
-        return x
+        x = lm[..., self._generic_lm_idx, self._generic_coord_idx]
+        if not self._generic_valid.all():
+            x = np.where(self._generic_valid, x, 0.0)
+        return x.astype(np.float32, copy=False).reshape(-1, self._generic_flat_idx.size)
 
     # ---------- PLANK (fitur engineered) ---------- #
 
-    def _init_plank_feature_mapping(self):
+    # Urutan joint untuk relative coords (sama dengan key_joints di training)
+    PLANK_JOINTS = [
+        "left_shoulder", "right_shoulder",
+        "left_hip", "right_hip",
+        "left_knee", "right_knee",
+        "left_ankle", "right_ankle",
+    ]
+    PLANK_ANGLES = ["left_hip", "right_hip", "body"]
+
+    def _init_plank_feature_mapping(self, columns: Optional[List[str]] = None):
         """
-        Mapping urutan feature plank berdasarkan meta["feature_columns"].
+        Mapping urutan feature plank berdasarkan meta["feature_columns"]
+        (atau columns kalau diberikan).
         Kita bedakan:
         - *_x_rel, *_y_rel  -> rel coord feature
         - left_hip_angle_norm, right_hip_angle_norm, body_angle_norm -> angle feature
+
+        Setiap feature dikompilasi jadi index ke vektor kandidat
+        [rel (8 joint x 2 axis), angle (3), nol (1)].
         """
         self.plank_feature_layout = []  # list of (kind, joint, axis/None)
 
-        for col in self.feature_columns:
+        for col in (self.feature_columns if columns is None else columns):
             if col.endswith("_x_rel"):
                 joint = col[: -len("_x_rel")]
                 self.plank_feature_layout.append(("rel", joint, "x"))
@@ -219,6 +814,23 @@ class TFLitePoseClassifier:
                 # fitur lain yang mungkin ada, tapi tidak kita pakai -> isi 0 saja
                 self.plank_feature_layout.append(("zero", None, None))
 
+        n_rel = 2 * len(self.PLANK_JOINTS)
+        zero_idx = n_rel + len(self.PLANK_ANGLES)
+        gather = []
+        for kind, joint, axis in self.plank_feature_layout:
+            if kind == "rel" and joint in self.PLANK_JOINTS:
+                gather.append(2 * self.PLANK_JOINTS.index(joint) + (0 if axis == "x" else 1))
+            elif kind == "angle":
+                gather.append(n_rel + self.PLANK_ANGLES.index(joint))
+            else:
+                gather.append(zero_idx)
+
+        self._plank_joint_idx = np.array(
+            [JOINT_NAME_TO_MP[name].value for name in self.PLANK_JOINTS], dtype=np.intp
+        )
+        self._plank_gather = np.array(gather, dtype=np.intp)
+        self._plank_gather_list = gather
+
     @staticmethod
     def _angle_deg(ax, ay, bx, by, cx, cy) -> float:
         """Sudut (derajat) di titik B dari A-B-C."""
@@ -230,29 +842,16 @@ class TFLitePoseClassifier:
         cosang = max(-1.0, min(1.0, dot / (n1 * n2)))
         return math.degrees(math.acos(cosang))
 
-    def _build_plank_feature_vector(self, pose_landmarks):
-        """
-        Replikasi logika add_plank_pose_features() tapi untuk 1 frame.
+    def _plank_candidates(self, lm: np.ndarray) -> List[float]:
         """
-        if pose_landmarks is None:
-            return None
-
-        lms = pose_landmarks.landmark
-
-        def get_xy(name: str):
-            idx = JOINT_NAME_TO_MP[name].value
-            p = lms[idx]
-            return p.x, p.y
+        Replikasi logika add_plank_pose_features() untuk 1 frame (33, 4).
+        Return [rel (8 joint x 2 axis), angle_norm (3), 0.0].
 
-        # Joint utama
-        lsx, lsy = get_xy("left_shoulder")
-        rsx, rsy = get_xy("right_shoulder")
-        lhx, lhy = get_xy("left_hip")
-        rhx, rhy = get_xy("right_hip")
-        lkx, lky = get_xy("left_knee")
-        rkx, rky = get_xy("right_knee")
-        lax, lay = get_xy("left_ankle")
-        rax, ray = get_xy("right_ankle")
+        Untuk 1 frame, math skalar di atas 1x tolist() lebih cepat daripada
+        belasan ufunc NumPy pada array sekecil ini.
+        """
+        (lsx, lsy), (rsx, rsy), (lhx, lhy), (rhx, rhy), \
+            (lkx, lky), (rkx, rky), (lax, lay), (rax, ray) = lm[self._plank_joint_idx, :2].tolist()
 
         # 1) shoulder_mid, hip_mid, ankle_mid
         shoulder_mid_x = (lsx + rsx) / 2.0
@@ -270,108 +869,630 @@ class TFLitePoseClassifier:
         dy = shoulder_mid_y - ankle_mid_y
         body_scale = math.sqrt(dx * dx + dy * dy) + 1e-6
 
-        # 2) Relative coords (x_rel, y_rel) untuk joint-joint kunci
-        joints = {
-            "left_shoulder": (lsx, lsy),
-            "right_shoulder": (rsx, rsy),
-            "left_hip": (lhx, lhy),
-            "right_hip": (rhx, rhy),
-            "left_knee": (lkx, lky),
-            "right_knee": (rkx, rky),
-            "left_ankle": (lax, lay),
-            "right_ankle": (rax, ray),
-        }
-
-        rel = {}
-        for name, (jx, jy) in joints.items():
-            rel_x = (jx - center_x) / body_scale
-            rel_y = (jy - center_y) / body_scale
-            rel[name] = {"x": rel_x, "y": rel_y}
-
-        # 3) Angle-based features
-        left_hip_angle_deg = self._angle_deg(lsx, lsy, lhx, lhy, lax, lay)
-        right_hip_angle_deg = self._angle_deg(rsx, rsy, rhx, rhy, rax, ray)
-        body_angle_deg = self._angle_deg(
-            shoulder_mid_x, shoulder_mid_y,
-            hip_mid_x, hip_mid_y,
-            ankle_mid_x, ankle_mid_y,
+        # 2) Relative coords (x_rel, y_rel), urutan PLANK_JOINTS
+        candidates = []
+        for jx, jy in (
+            (lsx, lsy), (rsx, rsy), (lhx, lhy), (rhx, rhy),
+            (lkx, lky), (rkx, rky), (lax, lay), (rax, ray),
+        ):
+            candidates.append((jx - center_x) / body_scale)
+            candidates.append((jy - center_y) / body_scale)
+
+        # 3) Angle-based features, dinormalisasi / 180
+        candidates.append(self._angle_deg(lsx, lsy, lhx, lhy, lax, lay) / 180.0)
+        candidates.append(self._angle_deg(rsx, rsy, rhx, rhy, rax, ray) / 180.0)
+        candidates.append(
+            self._angle_deg(
+                shoulder_mid_x, shoulder_mid_y,
+                hip_mid_x, hip_mid_y,
+                ankle_mid_x, ankle_mid_y,
+            ) / 180.0
         )
+        candidates.append(0.0)
+        return candidates
+
+    # Baris 0..7 = 8 joint, 8 = shoulder_mid, 9 = hip_mid, 10 = ankle_mid, 11 = center.
+    # Semua titik turunan didapat dari 1 matmul (12, 8) @ (N, 8, 2).
+    _PLANK_POINTS = np.vstack(
+        [
+            np.eye(8),
+            [0.5, 0.5, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0.5, 0.5, 0, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0.5, 0.5],
+            [0.25, 0.25, 0.25, 0.25, 0, 0, 0, 0],
+        ]
+    )
+    # Titik (A, B, C) untuk sudut di B: left_hip, right_hip, body
+    _PLANK_ANGLE_TRIPLES = np.array([[0, 2, 6], [1, 3, 7], [8, 9, 10]], dtype=np.intp)
+
+    def _plank_candidates_batch(self, lm: np.ndarray) -> np.ndarray:
+        """Versi vectorized _plank_candidates untuk (N, 33, 4) -> (N, 20)."""
+        # (N, 8, 2): ls, rs, lh, rh, lk, rk, la, ra
+        xy = lm[:, self._plank_joint_idx, :2]
+        # Matmul dengan matrix float64 -> sisa perhitungan di float64 seperti
+        # training (pandas), jadi body_scale kecil tidak memperbesar error.
+        pts = np.matmul(self._PLANK_POINTS, xy)
+
+        d = pts[:, 8, :] - pts[:, 10, :]
+        body_scale = np.sqrt((d * d).sum(-1)) + 1e-6
+        rel = (pts[:, :8, :] - pts[:, 11:, :]) / body_scale[:, None, None]
+
+        tri = pts[:, self._PLANK_ANGLE_TRIPLES, :]
+        angles = angle_deg(tri[:, :, 0, :], tri[:, :, 1, :], tri[:, :, 2, :]) / 180.0
+
+        n = xy.shape[0]
+        return np.concatenate([rel.reshape(n, -1), angles, np.zeros((n, 1))], axis=1)
+
+    def _write_plank_features(self, lm: np.ndarray, out: np.ndarray):
+        """Tulis fitur plank 1 frame langsung ke out (F,) sesuai gather plan."""
+        candidates = self._plank_candidates(lm)
+        for j, i in enumerate(self._plank_gather_list):
+            out[j] = candidates[i]
+
+    def _build_plank_feature_vector(self, lm: Optional[np.ndarray]):
+        """lm: (33, 4) -> (1, F), atau batch (N, 33, 4) -> (N, F)."""
+        if lm is None:
+            return None
 
-        left_hip_angle_norm = left_hip_angle_deg / 180.0
-        right_hip_angle_norm = right_hip_angle_deg / 180.0
-        body_angle_norm = body_angle_deg / 180.0
+        # Susun fitur sesuai meta["feature_columns"]
+        if lm.ndim == 2:
+            candidates = self._plank_candidates(lm)
+            x = np.array([candidates[i] for i in self._plank_gather_list], dtype=np.float32)
+            return x.reshape(1, -1)
+        return self._plank_candidates_batch(lm)[:, self._plank_gather].astype(np.float32)
 
-        # 4) Susun fitur sesuai meta["feature_columns"]
-        features = []
-        for kind, joint, axis in self.plank_feature_layout:
-            if kind == "rel":
-                val = rel.get(joint, {"x": 0.0, "y": 0.0})[axis]
-                features.append(float(val))
-            elif kind == "angle":
-                if joint == "left_hip":
-                    features.append(float(left_hip_angle_norm))
-                elif joint == "right_hip":
-                    features.append(float(right_hip_angle_norm))
-                elif joint == "body":
-                    features.append(float(body_angle_norm))
-                else:
-                    features.append(0.0)
-            else:
-                features.append(0.0)
+    # ---------- COMMON (fitur, input, motion gate) ---------- #
 
-        x = np.array(features, dtype="float32").reshape(1, -1)
-        return x
-
-    # ---------- COMMON PREDICT ---------- #
+    def _write_features(self, lm: np.ndarray, out: np.ndarray):
+        if self.is_plank:
+            self._write_plank_features(lm, out)
+        else:
+            self._write_generic_features(lm, out)
 
     def _build_feature_vector(self, pose_landmarks):
+        lm = as_landmark_array(pose_landmarks)
         if self.is_plank:
-            return self._build_plank_feature_vector(pose_landmarks)
+            return self._build_plank_feature_vector(lm)
+        else:
+            return self._build_generic_feature_vector(lm)
+
+    def _write_input(self, lm: np.ndarray):
+        """
+        Fitur ditulis langsung ke buffer input interpreter (tanpa set_tensor).
+        View harus dilepas sebelum invoke(), TFLite menolak invoke kalau
+        masih ada numpy array yang menunjuk ke buffer internalnya.
+        """
+        x = self._input_tensor()[0]
+        if self._input_quant is None:
+            self._write_features(lm, x)
+        else:
+            self._write_features(lm, self._feature_buf)
+            quantize_into(x, self._feature_buf, self._input_quant)
+        del x
+
+    def reset(self):
+        """Lupakan state antar frame (cache motion gate), mis. saat mode berganti."""
+        self._gate_lm = None
+
+    def _gate_allows_cache(self, lm: np.ndarray) -> bool:
+        """True kalau hasil frame terakhir yang diklasifikasi masih boleh dipakai."""
+        if self._gate_lm is None or self._gate_age >= self.gate_max_stale:
+            return False
+        # Dibandingkan dalam bentuk kuadrat: tanpa sqrt / abs per landmark
+        d = lm[_BODY_SLICE] - self._gate_lm[_BODY_SLICE]
+        d *= d
+        if (d[:, LM_X] + d[:, LM_Y]).max() >= self._gate_limit2:
+            return False
+        if d[:, LM_VIS].max() >= GATE_VISIBILITY_DELTA ** 2:
+            return False
+        self._gate_age += 1
+        return True
+
+    def gate_stats(self) -> dict:
+        """Jumlah predict() saat gate aktif, berapa yang pakai cache, dan rasionya."""
+        return {
+            "calls": self.gate_calls,
+            "skipped": self.gate_skipped,
+            "skip_ratio": round(self.gate_skipped / self.gate_calls, 4) if self.gate_calls else 0.0,
+        }
+
+    # ---------- BATCH INTERPRETER ---------- #
+
+    # Input batch interpreter dibulatkan ke kapasitas pangkat 2 (maks
+    # max_batch_size, sisanya di-chunk), jadi resize + allocate_tensors hanya
+    # terjadi saat kapasitas naik, bukan setiap ukuran batch berbeda.
+    # max_batch_size = MAX_BATCH_SIZE kecuali ada batch_size di profil host.
+    MAX_BATCH_SIZE = 1024
+
+    def _run_batch(self, x: np.ndarray):
+        """Isi input interpreter batch dengan x (N, F) lalu invoke; return interpreter-nya."""
+        n = x.shape[0]
+        if n > self._batch_capacity:
+            self._resize_batch_interpreter(n)
+
+        # Baris padding tetap di buffer, hasilnya dibuang
+        if self._input_quant is None:
+            self._batch_input[:n] = x
         else:
-            return self._build_generic_feature_vector(pose_landmarks)
+            quantize_into(self._batch_input[:n], x, self._input_quant)
+        interp = self._batch_interpreter
+        interp.set_tensor(self._batch_input_index, self._batch_input)
+        interp.invoke()
+        return interp
+
+    def _resize_batch_interpreter(self, n: int):
+        capacity = min(self.max_batch_size, 1 << (n - 1).bit_length())
+        if self._batch_interpreter is None:
+            # Interpreter terpisah supaya interpreter realtime tetap (1, F)
+            self._batch_interpreter = self._create_interpreter(self.batch_num_threads, self.batch_xnnpack)
+            self._batch_input_index = self._batch_interpreter.get_input_details()[0]["index"]
+            self._batch_output_index = self._batch_interpreter.get_output_details()[0]["index"]
+
+        row_shape = self._batch_row_shape()
+        self._batch_interpreter.resize_tensor_input(
+            self._batch_input_index, [capacity, *row_shape]
+        )
+        self._batch_interpreter.allocate_tensors()
+        self._batch_input = np.zeros((capacity, *row_shape), dtype=self.input_details[0]["dtype"])
+        self._batch_capacity = capacity
+
+    def _batch_row_shape(self) -> Tuple[int, ...]:
+        """Shape 1 baris input batch (tanpa dimensi batch)."""
+        return (len(self.feature_columns),)
+
+
+class TFLitePoseClassifier(TFLitePoseModel):
+    """
+    Classifier pose menggunakan TFLite model (.tflite) + meta.json.
+
+    - predict(lm)       -> (label, prob, probs) untuk 1 frame (dengan motion gate).
+    - predict_batch(lm) -> (labels, probs) untuk (N, 33, 4).
+    """
+
+    # ---------- PREDICT ---------- #
 
     def predict(self, pose_landmarks):
-        """Return: (label_string or None, prob_max, probs or None)."""
-        x = self._build_feature_vector(pose_landmarks)
-        if x is None:
+        """
+        pose_landmarks: ndarray (33, 4) dari landmarks_to_array() atau protobuf landmark.
+        Return: (label_string or None, prob_max, probs or None).
+        """
+        lm = as_landmark_array(pose_landmarks)
+        if lm is None:
+            self._gate_lm = None
             return None, 0.0, None
+        if lm.dtype != np.float32:
+            lm = lm.astype(np.float32)
+
+        if self.gate_threshold is not None:
+            self.gate_calls += 1
+            if self._gate_allows_cache(lm):
+                self.gate_skipped += 1
+                return self._gate_result
+
+        telemetry = self.telemetry
+        if telemetry is not None:
+            t0 = time.perf_counter()
+
+        self._write_input(lm)
+
+        if telemetry is not None:
+            t1 = time.perf_counter()
+            telemetry.record("features", t1 - t0)
 
-        input_index = self.input_details[0]["index"]
-        self.interpreter.set_tensor(input_index, x)
         self.interpreter.invoke()
         output_index = self.output_details[0]["index"]
-        probs = self.interpreter.get_tensor(output_index)[0]
+        probs = dequantize(self.interpreter.get_tensor(output_index)[0], self._output_quant)
+
+        if telemetry is not None:
+            telemetry.record("invoke", time.perf_counter() - t1)
 
         idx = int(np.argmax(probs))
         label = self.label_mapping.get(idx, f"class_{idx}")
         prob = float(probs[idx])
+
+        if self.gate_threshold is not None:
+            self._gate_lm = lm.copy()
+            self._gate_limit2 = (self.gate_threshold * max(torso_length(lm), 1e-3)) ** 2
+            self._gate_result = (label, prob, probs)
+            self._gate_age = 0
         return label, prob, probs
 
+    # ---------- BATCH PREDICT ---------- #
+
+    def predict_batch(self, landmarks_array):
+        """
+        Klasifikasi banyak frame sekaligus (offline / re-scoring / service).
+
+        landmarks_array: ndarray (N, 33, 4), semua baris dianggap pose valid.
+        Return: (labels: ndarray object (N,), probs: ndarray float32 (N, C)).
+        """
+        lm = np.asarray(landmarks_array, dtype=np.float32)
+        if lm.ndim == 2:
+            lm = lm[None]
+        n = lm.shape[0]
+        num_classes = int(self.output_details[0]["shape"][-1])
+        if n == 0:
+            return np.empty(0, dtype=object), np.empty((0, num_classes), dtype=np.float32)
+
+        x = self._build_feature_vector(lm)
+        probs = np.empty((n, num_classes), dtype=np.float32)
+        for start in range(0, n, self.max_batch_size):
+            chunk = x[start:start + self.max_batch_size]
+            probs[start:start + len(chunk)] = self._invoke_batch(chunk)
+
+        labels = self._label_array(num_classes)[probs.argmax(axis=1)]
+        return labels, probs
+
+    def _invoke_batch(self, x: np.ndarray) -> np.ndarray:
+        interp = self._run_batch(x)
+        return dequantize(interp.get_tensor(self._batch_output_index)[:x.shape[0]], self._output_quant)
+
+    def _label_array(self, num_classes: int) -> np.ndarray:
+        return np.array(
+            [self.label_mapping.get(i, f"class_{i}") for i in range(num_classes)], dtype=object
+        )
+
+
+# -------------------------- TEMPORAL STAGE CLASSIFIER -------------------------- #
+#
+# Alternatif squat_stage MLP (opsi --squat-model temporal): Conv1D di atas
+# window W frame berturut-turut. Fitur tiap frame tetap ditulis ke ring buffer
+# (W, F) (1 gather NumPy per frame), tapi invoke() hanya tiap `stride` frame;
+# frame di antaranya memakai hasil invoke terakhir. Motion gate (kalau aktif)
+# dicek di frame yang jatuh tempo invoke. predict_batch() untuk offline:
+# window semua frame ditumpuk jadi (M, W, F), hasil sama dengan predict().
+
+class TemporalStageClassifier(TFLitePoseClassifier):
+    """
+    squat_stage_temporal.tflite + meta_temporal.json (feature_columns sama
+    dengan squat_stage MLP, plus window & stride default dari training).
+    """
+
+    def __init__(
+        self,
+        tflite_path: Path,
+        meta_path: Path,
+        exercise_name: str = "squat_stage",
+        num_threads: Optional[int] = None,
+        stride: Optional[int] = None,
+        **kwargs,
+    ):
+        # Conv1D tidak punya bobot .npz, hanya backend tflite
+        if kwargs.get("backend", "tflite") != "tflite":
+            raise ValueError("TemporalStageClassifier hanya mendukung backend tflite")
+        super().__init__(tflite_path, meta_path, exercise_name, num_threads=num_threads, **kwargs)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.window = int(meta["window"])
+        self.stride = max(1, int(stride or meta.get("stride", 1)))
+        print(f"[{exercise_name}] Temporal window: {self.window} frame, invoke tiap {self.stride} frame")
+
+        # Ring buffer fitur; _ring_pos = slot yang ditulis berikutnya (= frame tertua)
+        self._ring = np.zeros((self.window, len(self.feature_columns)), dtype=np.float32)
+        self._ring_pos = 0
+        self._filled = False
+        self._since_invoke = 0
+        self._result = (None, 0.0, None)
+        self.calls = 0
+        self.invokes = 0
+
+    def reset(self):
+        """Urutan frame terputus (pose hilang / mode berganti): window diisi ulang."""
+        super().reset()
+        self._filled = False
+        self._result = (None, 0.0, None)
+
+    def predict(self, pose_landmarks):
+        """
+        Sama seperti TFLitePoseClassifier.predict(), tapi label = stage dari
+        W frame terakhir. Harus dipanggil berurutan, 1x per frame.
+        """
+        lm = as_landmark_array(pose_landmarks)
+        if lm is None:
+            self.reset()
+            return None, 0.0, None
+        if lm.dtype != np.float32:
+            lm = lm.astype(np.float32)
+        self.calls += 1
+
+        telemetry = self.telemetry
+        if telemetry is not None:
+            t0 = time.perf_counter()
+
+        if self._filled:
+            self._write_generic_features(lm, self._ring[self._ring_pos])
+            self._ring_pos = (self._ring_pos + 1) % self.window
+        else:
+            # Frame pertama: seluruh window diisi frame ini, langsung di-invoke
+            self._write_generic_features(lm, self._ring[0])
+            self._ring[1:] = self._ring[0]
+            self._ring_pos = 0
+            self._filled = True
+            self._since_invoke = self.stride - 1
+
+        self._since_invoke += 1
+        if self._since_invoke < self.stride:
+            if telemetry is not None:
+                telemetry.record("features", time.perf_counter() - t0)
+            return self._result
+        self._since_invoke = 0
+
+        # Motion gate: badan belum bergerak sejak invoke terakhir -> window
+        # praktis sama, hasil terakhir dipakai lagi
+        if self.gate_threshold is not None:
+            self.gate_calls += 1
+            if self._gate_allows_cache(lm):
+                self.gate_skipped += 1
+                if telemetry is not None:
+                    telemetry.record("features", time.perf_counter() - t0)
+                return self._result
+
+        # Window urut waktu (tertua -> terbaru) langsung ke buffer input (1, W, F)
+        x = self._input_tensor()[0]
+        window = x if self._input_quant is None else self._feature_buf
+        split = self.window - self._ring_pos
+        window[:split] = self._ring[self._ring_pos:]
+        window[split:] = self._ring[:self._ring_pos]
+        if self._input_quant is not None:
+            quantize_into(x, window, self._input_quant)
+        del x, window
+
+        if telemetry is not None:
+            t1 = time.perf_counter()
+            telemetry.record("features", t1 - t0)
+
+        self.interpreter.invoke()
+        probs = dequantize(self.interpreter.get_tensor(self.output_details[0]["index"])[0], self._output_quant)
+        self.invokes += 1
+
+        if telemetry is not None:
+            telemetry.record("invoke", time.perf_counter() - t1)
+
+        idx = int(np.argmax(probs))
+        self._result = (self.label_mapping.get(idx, f"class_{idx}"), float(probs[idx]), probs)
+        if self.gate_threshold is not None:
+            self._gate_lm = lm.copy()
+            self._gate_limit2 = (self.gate_threshold * max(torso_length(lm), 1e-3)) ** 2
+            self._gate_age = 0
+        return self._result
+
+    def predict_batch(self, landmarks_array):
+        """
+        landmarks_array: ndarray (N, 33, 4), N frame berurutan dari 1 stream
+        (semua baris dianggap pose valid).
+        Return (labels (N,), probs (N, C)): sama dengan reset() lalu predict()
+        per frame tanpa motion gate: window awal diisi frame pertama, invoke
+        tiap `stride` frame, frame di antaranya memakai hasil invoke terakhir.
+        Window (M, W, F) ditumpuk lalu di-invoke per chunk; state predict()
+        tidak berubah.
+        """
+        lm = np.asarray(landmarks_array, dtype=np.float32)
+        if lm.ndim == 2:
+            lm = lm[None]
+        n = lm.shape[0]
+        num_classes = int(self.output_details[0]["shape"][-1])
+        if n == 0:
+            return np.empty(0, dtype=object), np.empty((0, num_classes), dtype=np.float32)
+
+        x = self._build_generic_feature_vector(lm)
+        # Frame yang di-invoke + index W frame window-nya (sebelum frame 0 = frame 0)
+        invoked = np.arange(0, n, self.stride)
+        window_idx = np.maximum(invoked[:, None] + np.arange(1 - self.window, 1), 0)
+        invoked_probs = np.empty((len(invoked), num_classes), dtype=np.float32)
+        for start in range(0, len(invoked), self.max_batch_size):
+            chunk = x[window_idx[start:start + self.max_batch_size]]
+            invoked_probs[start:start + len(chunk)] = self._invoke_batch(chunk)
+
+        probs = invoked_probs[np.arange(n) // self.stride]
+        labels = self._label_array(num_classes)[probs.argmax(axis=1)]
+        return labels, probs
+
+    def _batch_row_shape(self) -> Tuple[int, ...]:
+        return (self.window, len(self.feature_columns))
+
+    def temporal_stats(self) -> dict:
+        """Jumlah frame vs invoke yang benar-benar dijalankan."""
+        return {
+            "calls": self.calls,
+            "invokes": self.invokes,
+            "invoke_ratio": round(self.invokes / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+# -------------------------- FUSED CLASSIFIER -------------------------- #
+#
+# 1 model TFLite: trunk bersama + head plank + head squat_stage (hasil
+# train_fused_classifier()). Input = fitur plank lalu fitur squat_stage di 1
+# buffer, jadi 1 interpreter + 1 invoke() memberi hasil kedua exercise.
+
+class FusedPoseClassifier(TFLitePoseModel):
+    """
+    plank_squat_fused.tflite + meta.json gabungan ("heads": feature_columns,
+    label_mapping, output_index per head).
+
+    - predict_all(lm)       -> {head: (label, prob, probs)} dari 1 invoke
+                               (motion gate berlaku untuk semua head sekaligus).
+    - predict_batch_all(lm) -> {head: (labels, probs)}.
+    - head(name)            -> FusedHead, dipakai ExerciseAnalyzer seperti classifier biasa.
+    """
+
+    def __init__(
+        self,
+        tflite_path: Path,
+        meta_path: Path,
+        exercise_name: str = "fused",
+        num_threads: Optional[int] = None,
+        **kwargs,
+    ):
+        # Beberapa output head: NumpyMLPInterpreter hanya untuk MLP 1 output
+        if kwargs.get("backend", "tflite") != "tflite":
+            raise ValueError("FusedPoseClassifier hanya mendukung backend tflite")
+        super().__init__(tflite_path, meta_path, exercise_name, num_threads=num_threads, **kwargs)
+        self._head_views: Dict[str, "FusedHead"] = {}
+
+    def _init_meta(self, meta: dict):
+        self.feature_columns = meta["feature_columns"]
+        self.label_mapping = {}  # per head, lihat self.heads
+        self.is_plank = False
+
+        heads = meta["heads"]
+        plank_cols = heads["plank"]["feature_columns"]
+        squat_cols = heads["squat_stage"]["feature_columns"]
+        self._n_plank = len(plank_cols)
+        self._init_plank_feature_mapping(plank_cols)
+        self._init_generic_feature_mapping(squat_cols)
+
+        # (nama, label per index, index tensor output, quant params output)
+        self.heads: List[Tuple[str, np.ndarray, int, Optional[QuantParams]]] = []
+        for name, head in heads.items():
+            mapping = {int(k): v for k, v in head["label_mapping"].items()}
+            labels = np.array(
+                [mapping.get(i, f"class_{i}") for i in range(max(mapping) + 1)], dtype=object
+            )
+            output = self.output_details[head["output_index"]]
+            self.heads.append((name, labels, output["index"], quant_params(output)))
+            print(f"[{self.exercise_name}] {name} labels: {list(labels)}")
+
+        print(
+            f"[{self.exercise_name}] Feature columns: {len(self.feature_columns)} "
+            f"(plank {len(plank_cols)} + squat_stage {len(squat_cols)})"
+        )
+
+    def _write_features(self, lm: np.ndarray, out: np.ndarray):
+        self._write_plank_features(lm, out[:self._n_plank])
+        self._write_generic_features(lm, out[self._n_plank:])
+
+    def _build_feature_vector(self, pose_landmarks):
+        lm = as_landmark_array(pose_landmarks)
+        if lm is None:
+            return None
+        return np.hstack(
+            [self._build_plank_feature_vector(lm), self._build_generic_feature_vector(lm)]
+        )
+
+    def head(self, name: str) -> "FusedHead":
+        view = self._head_views.get(name)
+        if view is None:
+            if name not in {h[0] for h in self.heads}:
+                raise KeyError(f"Head '{name}' tidak ada di model fused")
+            view = self._head_views[name] = FusedHead(self, name)
+        return view
+
+    def predict_all(self, pose_landmarks) -> Dict[str, tuple]:
+        """Semua head dari 1 invoke: {head: (label or None, prob_max, probs or None)}."""
+        lm = as_landmark_array(pose_landmarks)
+        if lm is None:
+            self._gate_lm = None
+            return {name: (None, 0.0, None) for name, *_ in self.heads}
+        if lm.dtype != np.float32:
+            lm = lm.astype(np.float32)
+
+        if self.gate_threshold is not None:
+            self.gate_calls += 1
+            if self._gate_allows_cache(lm):
+                self.gate_skipped += 1
+                return self._gate_result
+
+        telemetry = self.telemetry
+        if telemetry is not None:
+            t0 = time.perf_counter()
+
+        self._write_input(lm)
+
+        if telemetry is not None:
+            t1 = time.perf_counter()
+            telemetry.record("features", t1 - t0)
+
+        self.interpreter.invoke()
+        results = {}
+        for name, labels, index, quant in self.heads:
+            probs = dequantize(self.interpreter.get_tensor(index)[0], quant)
+            idx = int(np.argmax(probs))
+            results[name] = (labels[idx], float(probs[idx]), probs)
+
+        if telemetry is not None:
+            telemetry.record("invoke", time.perf_counter() - t1)
+
+        if self.gate_threshold is not None:
+            self._gate_lm = lm.copy()
+            self._gate_limit2 = (self.gate_threshold * max(torso_length(lm), 1e-3)) ** 2
+            self._gate_result = results
+            self._gate_age = 0
+        return results
+
+    def predict_batch_all(self, landmarks_array) -> Dict[str, tuple]:
+        """(N, 33, 4) -> {head: (labels ndarray object (N,), probs float32 (N, C))}."""
+        lm = np.asarray(landmarks_array, dtype=np.float32)
+        if lm.ndim == 2:
+            lm = lm[None]
+        n = lm.shape[0]
+        probs = {name: np.empty((n, len(labels)), dtype=np.float32) for name, labels, *_ in self.heads}
+        if n > 0:
+            x = self._build_feature_vector(lm)
+            for start in range(0, n, self.max_batch_size):
+                chunk = x[start:start + self.max_batch_size]
+                interp = self._run_batch(chunk)
+                for name, _, index, quant in self.heads:
+                    probs[name][start:start + len(chunk)] = dequantize(
+                        interp.get_tensor(index)[:len(chunk)], quant
+                    )
+        return {
+            name: (labels[probs[name].argmax(axis=1)], probs[name])
+            for name, labels, *_ in self.heads
+        }
+
+
+class FusedHead:
+    """1 head FusedPoseClassifier dengan interface classifier biasa (predict / predict_batch / reset)."""
+
+    def __init__(self, fused: FusedPoseClassifier, exercise_name: str):
+        self.fused = fused
+        self.exercise_name = exercise_name
+
+    @property
+    def gate_threshold(self) -> Optional[float]:
+        return self.fused.gate_threshold
+
+    @property
+    def telemetry(self):
+        return self.fused.telemetry
+
+    @telemetry.setter
+    def telemetry(self, value):
+        self.fused.telemetry = value
+
+    def predict(self, pose_landmarks):
+        return self.fused.predict_all(pose_landmarks)[self.exercise_name]
+
+    def predict_batch(self, landmarks_array):
+        return self.fused.predict_batch_all(landmarks_array)[self.exercise_name]
+
+    def reset(self):
+        self.fused.reset()
+
 
 # -------------------------- SQUAT GEOMETRY & FORM -------------------------- #
+#
+# Versi biasa untuk 1 frame: input ndarray (33, 4) dari landmarks_to_array()
+# (protobuf landmark juga diterima). Versi *_batch: (N, 33, 4) -> array (N,),
+# full vectorized untuk offline / replay.
 
 def lower_body_visible(pose_landmarks, min_visibility: float = 0.6) -> bool:
     """True jika hip, knee, ankle kiri & kanan terlihat cukup jelas."""
-    if pose_landmarks is None:
+    lm = as_landmark_array(pose_landmarks)
+    if lm is None:
         return False
-    idxs = [
-        mp_pose.PoseLandmark.LEFT_HIP.value,
-        mp_pose.PoseLandmark.RIGHT_HIP.value,
-        mp_pose.PoseLandmark.LEFT_KNEE.value,
-        mp_pose.PoseLandmark.RIGHT_KNEE.value,
-        mp_pose.PoseLandmark.LEFT_ANKLE.value,
-        mp_pose.PoseLandmark.RIGHT_ANKLE.value,
-    ]
-    for i in idxs:
-        if pose_landmarks.landmark[i].visibility < min_visibility:
-            return False
-    return True
+    return bool(lm[LOWER_BODY_IDX, LM_VIS].min() >= min_visibility)
+
+
+def lower_body_visible_batch(lm: np.ndarray, min_visibility: float = 0.6) -> np.ndarray:
+    return (lm[:, LOWER_BODY_IDX, LM_VIS] >= min_visibility).all(axis=1)
 
 
 def knee_angle(hip, knee, ankle) -> float:
-    """Sudut lutut (derajat) antara segmen hip-knee dan ankle-knee."""
-    v1x, v1y = hip.x - knee.x, hip.y - knee.y
-    v2x, v2y = ankle.x - knee.x, ankle.y - knee.y
+    """Sudut lutut (derajat) antara segmen hip-knee dan ankle-knee. Titik = (x, y, ...)."""
+    v1x, v1y = hip[0] - knee[0], hip[1] - knee[1]
+    v2x, v2y = ankle[0] - knee[0], ankle[1] - knee[1]
     dot = v1x * v2x + v1y * v2y
     n1 = math.sqrt(v1x * v1x + v1y * v1y)
     n2 = math.sqrt(v2x * v2x + v2y * v2y)
@@ -386,20 +1507,14 @@ def is_standing_pose(pose_landmarks, knee_angle_min: float = 155.0) -> bool:
     Kasar: true kalau kedua kaki relatif lurus (lutut > knee_angle_min)
     dan urutan vertikal hip > knee > ankle (dari atas ke bawah).
     """
-    if pose_landmarks is None:
-        return False
-    try:
-        lh = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_HIP.value]
-        rh = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_HIP.value]
-        lk = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_KNEE.value]
-        rk = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_KNEE.value]
-        la = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-        ra = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-    except IndexError:
+    lm = as_landmark_array(pose_landmarks)
+    if lm is None or lm.shape[0] < NUM_LANDMARKS:
         return False
 
+    _, _, lh, rh, lk, rk, la, ra = lm[SQUAT_POINT_IDX, :2].tolist()
+
     # y makin besar = makin ke bawah
-    if not (lh.y < lk.y < la.y and rh.y < rk.y < ra.y):
+    if not (lh[1] < lk[1] < la[1] and rh[1] < rk[1] < ra[1]):
         return False
 
     ang_l = knee_angle(lh, lk, la)
@@ -410,6 +1525,31 @@ def is_standing_pose(pose_landmarks, knee_angle_min: float = 155.0) -> bool:
     return True
 
 
+def is_standing_pose_batch(lm: np.ndarray, knee_angle_min: float = 155.0) -> np.ndarray:
+    # (N, [hip, knee, ankle], [kiri, kanan], [x, y])
+    leg = lm[:, SQUAT_POINT_IDX[2:], :2].astype(np.float64).reshape(-1, 3, 2, 2)
+
+    y = leg[..., 1]
+    ordered = (y[:, 1:, :] > y[:, :-1, :]).all(axis=(1, 2))
+
+    # angle >= knee_angle_min  <=>  cos(angle) <= cos(knee_angle_min), jadi
+    # tidak perlu arccos. Segmen degenerate dianggap lurus (180 derajat).
+    v1 = leg[:, 0] - leg[:, 1]
+    v2 = leg[:, 2] - leg[:, 1]
+    dot = (v1 * v2).sum(-1)
+    denom = np.sqrt((v1 * v1).sum(-1) * (v2 * v2).sum(-1))
+    straight = (denom < 1e-6) | (dot <= math.cos(math.radians(knee_angle_min)) * denom)
+    return ordered & straight.all(axis=1)
+
+
+def _ratio_status(ratio: float, rmin: float, rmax: float) -> str:
+    if ratio < rmin:
+        return "terlalu rapat"
+    elif ratio > rmax:
+        return "terlalu lebar"
+    return "correct"
+
+
 def analyze_squat_feet_knee(pose_landmarks, thresholds: dict):
     """
     FEET & KNEE status terpisah:
@@ -418,21 +1558,14 @@ def analyze_squat_feet_knee(pose_landmarks, thresholds: dict):
 
     Menggunakan jarak 2D (x,y) untuk konsisten dengan perhitungan threshold training.
     """
-    if pose_landmarks is None:
+    lm = as_landmark_array(pose_landmarks)
+    if lm is None or lm.shape[0] < NUM_LANDMARKS:
         return "unknown", "unknown"
 
-    try:
-        ls = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-        rs = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-        lk = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_KNEE.value]
-        rk = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_KNEE.value]
-        la = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_ANKLE.value]
-        ra = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-    except IndexError:
-        return "unknown", "unknown"
+    ls, rs, _, _, lk, rk, la, ra = lm[SQUAT_POINT_IDX, :2].tolist()
 
     def dist_2d(p1, p2):
-        return math.sqrt((p2.x - p1.x) ** 2 + (p2.y - p1.y) ** 2)
+        return math.sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
 
     shoulder_w = dist_2d(ls, rs)
     feet_w = dist_2d(la, ra)
@@ -453,198 +1586,812 @@ def analyze_squat_feet_knee(pose_landmarks, thresholds: dict):
     except KeyError:
         return "unknown", "unknown"
 
-    # FEET
-    if feet_ratio < fmin:
-        feet_status = "terlalu rapat"
-    elif feet_ratio > fmax:
-        feet_status = "terlalu lebar"
-    else:
-        feet_status = "correct"
+    return _ratio_status(feet_ratio, fmin, fmax), _ratio_status(knee_ratio, kmin, kmax)
+
+
+# Index status untuk hasil vectorized (lihat analyze_squat_feet_knee_batch)
+_FORM_STATUS = np.array(["correct", "terlalu rapat", "terlalu lebar", "unknown"], dtype=object)
+
+
+def analyze_squat_feet_knee_batch(lm: np.ndarray, thresholds: dict):
+    """
+    Versi vectorized analyze_squat_feet_knee untuk (N, 33, 4).
+    Return (feet_status, knee_status): masing-masing array object (N,).
+    """
+    # Lebar 2D kiri-kanan: (N, 4) = [bahu, hip, lutut, ankle]
+    xy = lm[:, SQUAT_POINT_IDX, :2].astype(np.float64)
+    d = xy[:, 1::2, :] - xy[:, 0::2, :]
+    widths = np.sqrt((d * d).sum(-1))
+    shoulder_w, knee_w, feet_w = widths[:, 0], widths[:, 2], widths[:, 3]
+
+    eps = 1e-6
+    unknown = (shoulder_w < eps) | (feet_w < eps)
+
+    try:
+        rmin = np.array([thresholds["feet_ratio_min"], thresholds["knee_ratio_min"]])
+        rmax = np.array([thresholds["feet_ratio_max"], thresholds["knee_ratio_max"]])
+    except KeyError:
+        unknown[:] = True
+        rmin = rmax = np.zeros(2)
+
+    # (N, 2): [feet_ratio, knee_ratio]
+    ratio = np.stack([feet_w / (shoulder_w + eps), knee_w / (feet_w + eps)], axis=1)
+
+    # 0 = correct, 1 = terlalu rapat, 2 = terlalu lebar, 3 = unknown
+    code = (ratio < rmin) + 2 * (ratio > rmax)
+    code[unknown] = 3
+    status = _FORM_STATUS[code]
+    return status[:, 0], status[:, 1]
+
+
+# -------------------------- SQUAT COUNTER & ANALYZER -------------------------- #
+
+class SquatCounter:
+    """
+    State machine counting squat.
+
+    Count hanya bertambah jika lower body terlihat, ada transisi DOWN -> UP,
+    posisi up benar-benar berdiri, dan FORM BENAR (feet & knee correct).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.state = "none"  # "none" / "up" / "down"
+
+    def update(
+        self,
+        squat_stage: str,
+        lower_vis: bool,
+        standing_now: bool,
+        form_correct: bool,
+    ) -> int:
+        if not lower_vis:
+            self.state = "none"
+            return self.count
+
+        is_down = any(s in squat_stage for s in SQUAT_STAGE_DOWN_LABELS)
+        is_up = any(s in squat_stage for s in SQUAT_STAGE_UP_LABELS) and standing_now
+
+        if is_down and self.state != "down":
+            self.state = "down"
+        elif (
+            is_up
+            and self.state == "down"
+            and form_correct  # HANYA kalau knee & feet correct
+        ):
+            self.count += 1
+            self.state = "up"
+        return self.count
+
+
+def load_squat_thresholds(path: Path = SQUAT_THRESHOLDS) -> dict:
+    if not path.exists():
+        raise FileNotFoundError(f"Squat thresholds not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def classifier_loader(
+    tflite_path: Path,
+    meta_path: Path,
+    exercise_name: str,
+    classifier_cls: type = TFLitePoseClassifier,
+    **kwargs,
+) -> Callable[[], TFLitePoseClassifier]:
+    """
+    Factory lazy: interpreter baru dibuat saat loader() dipanggil pertama kali,
+    setelah itu instance yang sama dipakai ulang.
+    """
+    instance: Optional[TFLitePoseClassifier] = None
+
+    def load() -> TFLitePoseClassifier:
+        nonlocal instance
+        if instance is None:
+            instance = classifier_cls(tflite_path, meta_path, exercise_name, **kwargs)
+        return instance
+
+    return load
+
+
+def fused_loaders(
+    tflite_path: Path, meta_path: Path, **kwargs
+) -> Tuple[Callable[[], FusedHead], Callable[[], FusedHead]]:
+    """Loader head plank & squat_stage yang berbagi 1 FusedPoseClassifier (1 interpreter)."""
+    load = classifier_loader(tflite_path, meta_path, "fused", classifier_cls=FusedPoseClassifier, **kwargs)
+    return (lambda: load().head("plank")), (lambda: load().head("squat_stage"))
+
+
+# Instance classifier (bukan loader) yang diterima ExerciseAnalyzer
+CLASSIFIER_TYPES = (TFLitePoseClassifier, FusedHead)
+ClassifierOrLoader = Union[TFLitePoseClassifier, FusedHead, Callable[[], TFLitePoseClassifier]]
+
+
+class ExerciseAnalyzer:
+    """
+    Klasifikasi + form check + counting untuk 1 frame.
+
+    Semua state per-user (squat counter) ada di sini, jadi setiap stream /
+    session cukup punya 1 instance sendiri. analyze() harus dipanggil
+    berurutan sesuai urutan frame.
+    """
+
+    def __init__(
+        self,
+        plank_cls: ClassifierOrLoader,
+        squat_cls: ClassifierOrLoader,
+        squat_thresholds: dict,
+        telemetry=None,
+    ):
+        # Boleh instance classifier atau loader dari classifier_loader();
+        # loader baru dipanggil saat mode-nya pertama kali dipakai.
+        self._plank_cls = plank_cls
+        self._squat_cls = squat_cls
+        self.squat_thresholds = squat_thresholds
+        self.squat_counter = SquatCounter()
+        # Opsional FrameTelemetry: stage features / invoke / counting
+        self.telemetry = telemetry
+        self._last_mode: Optional[str] = None
+
+    @property
+    def plank_cls(self) -> TFLitePoseClassifier:
+        if not isinstance(self._plank_cls, CLASSIFIER_TYPES):
+            self._plank_cls = self._plank_cls()
+        if self.telemetry is not None:
+            self._plank_cls.telemetry = self.telemetry
+        return self._plank_cls
+
+    @property
+    def squat_cls(self) -> TFLitePoseClassifier:
+        if not isinstance(self._squat_cls, CLASSIFIER_TYPES):
+            self._squat_cls = self._squat_cls()
+        if self.telemetry is not None:
+            self._squat_cls.telemetry = self.telemetry
+        return self._squat_cls
+
+    def gate_stats(self) -> Dict[str, dict]:
+        """Statistik motion gate per classifier yang sudah di-load dan gate-nya aktif."""
+        stats = {}
+        for cls in (self._plank_cls, self._squat_cls):
+            if isinstance(cls, FusedHead):
+                cls = cls.fused  # 2 head, 1 gate
+            if isinstance(cls, TFLitePoseModel) and cls.gate_threshold is not None:
+                stats[cls.exercise_name] = cls.gate_stats()
+        return stats
+
+    def temporal_stats(self) -> Dict[str, dict]:
+        """Statistik invoke per classifier temporal yang sudah di-load."""
+        return {
+            cls.exercise_name: cls.temporal_stats()
+            for cls in (self._plank_cls, self._squat_cls)
+            if isinstance(cls, TemporalStageClassifier)
+        }
+
+    def analyze(self, pose_landmarks, mode: str, prediction: Optional[tuple] = None) -> dict:
+        """
+        pose_landmarks: protobuf landmark atau ndarray (33, 4).
+        prediction    : opsional (label, prob, probs) yang sudah dihitung di luar
+                        (mis. predict_batch lintas session); kalau None, predict() di sini.
+        Return dict berisi hasil analisis + teks overlay:
+        mode, label, prob, probs, feet_status, knee_status, form_correct,
+        squat_count, mode_text, text_main, form_text, count_line, feet_line, knee_line.
+        """
+        # Konversi protobuf -> (33, 4) cukup sekali per frame
+        lm = as_landmark_array(pose_landmarks)
+        if mode != self._last_mode:
+            # State antar frame (gate cache / window temporal) tidak berlaku
+            # lagi untuk frame dari mode sebelumnya
+            if prediction is None:
+                (self.plank_cls if mode == "plank" else self.squat_cls).reset()
+            self._last_mode = mode
+        if mode == "plank":
+            return self._analyze_plank(lm, prediction)
+        return self._analyze_squat(lm, prediction)
+
+    def analyze_batch(self, landmarks: Sequence[Optional[np.ndarray]], mode: str) -> List[dict]:
+        """
+        analyze() untuk banyak frame berurutan 1 stream (offline / replay):
+        1x predict_batch() + geometry squat vectorized (*_batch) untuk semua
+        frame yang punya pose, lalu squat counting per frame sesuai urutan.
+
+        landmarks: list ndarray (33, 4) atau None (pose tidak terdeteksi).
+        Hasil sama dengan analyze() per frame. Motion gate butuh urutan per
+        frame, jadi kalau aktif classifier tetap dipanggil lewat predict().
+        Classifier temporal: window mulai dari frame pertama tiap potongan
+        frame berpose yang berurutan (sama seperti reset() saat pose hilang).
+        """
+        cls = self.plank_cls if mode == "plank" else self.squat_cls
+        if mode != self._last_mode:
+            cls.reset()
+            self._last_mode = mode
+
+        n = len(landmarks)
+        valid = [i for i, lm in enumerate(landmarks) if lm is not None]
+        if cls.gate_threshold is not None:
+            predictions = [cls.predict(lm) for lm in landmarks]
+        else:
+            predictions = [(None, 0.0, None)] * n
+        lm = np.stack([landmarks[i] for i in valid]).astype(np.float32, copy=False) if valid else None
+
+        if lm is not None and cls.gate_threshold is None:
+            # Temporal: 1 predict_batch per potongan frame berpose yang berurutan
+            runs = [(0, len(valid))]
+            if isinstance(cls, TemporalStageClassifier):
+                breaks = [j for j in range(1, len(valid)) if valid[j] != valid[j - 1] + 1]
+                runs = list(zip([0, *breaks], [*breaks, len(valid)]))
+            for start, end in runs:
+                labels, probs = cls.predict_batch(lm[start:end])
+                prob = probs.max(axis=1).tolist()
+                for j in range(end - start):
+                    predictions[valid[start + j]] = (labels[j], prob[j], probs[j])
+
+        if mode == "plank":
+            return [self._analyze_plank(landmarks[i], predictions[i]) for i in range(n)]
+
+        lower_vis = np.zeros(n, dtype=bool)
+        standing = np.zeros(n, dtype=bool)
+        feet = np.full(n, "unknown", dtype=object)
+        knee = np.full(n, "unknown", dtype=object)
+        if lm is not None:
+            lower_vis[valid] = lower_body_visible_batch(lm, min_visibility=0.6)
+            standing[valid] = is_standing_pose_batch(lm)
+            feet[valid], knee[valid] = analyze_squat_feet_knee_batch(lm, self.squat_thresholds)
+        geometry = zip(lower_vis.tolist(), standing.tolist(), feet.tolist(), knee.tolist())
+        return [
+            self._analyze_squat(landmarks[i], predictions[i], geom)
+            for i, geom in enumerate(geometry)
+        ]
+
+    def _analyze_plank(self, lm: Optional[np.ndarray], prediction: Optional[tuple] = None) -> dict:
+        label, prob, probs = prediction if prediction is not None else self.plank_cls.predict(lm)
+        t0 = time.perf_counter()
+
+        if label is None:
+            text_main = "Plank: pose tidak terdeteksi"
+            form_text = ""
+            is_correct = False
+        else:
+            label_clean = label.strip().upper()
+            # HANYA C yang dianggap FORM BENAR
+            is_correct = (label_clean == "C")
+            text_main = f"Plank: {label} ({prob:.2f})"
+            form_text = "FORM BENAR" if is_correct else "FORM SALAH"
+
+        if self.telemetry is not None:
+            self.telemetry.record("counting", time.perf_counter() - t0)
+
+        return {
+            "mode": "plank",
+            "label": label,
+            "prob": prob,
+            "probs": probs,
+            "feet_status": None,
+            "knee_status": None,
+            "form_correct": is_correct,
+            "squat_count": self.squat_counter.count,
+            "mode_text": "MODE: PLANK",
+            "text_main": text_main,
+            "form_text": form_text,
+            "count_line": "",
+            "feet_line": "",
+            "knee_line": "",
+        }
+
+    def _analyze_squat(
+        self,
+        lm: Optional[np.ndarray],
+        prediction: Optional[tuple] = None,
+        geometry: Optional[tuple] = None,
+    ) -> dict:
+        """geometry: opsional (lower_vis, standing_now, feet_status, knee_status) dari versi *_batch."""
+        label, prob, probs = prediction if prediction is not None else self.squat_cls.predict(lm)
+        t0 = time.perf_counter()
+        if geometry is None:
+            lower_vis = lower_body_visible(lm, min_visibility=0.6)
+            standing_now = is_standing_pose(lm)
+            feet_status, knee_status = analyze_squat_feet_knee(lm, self.squat_thresholds)
+        else:
+            lower_vis, standing_now, feet_status, knee_status = geometry
+
+        if label is None or not lower_vis:
+            squat_stage = "unknown"
+            text_main = "Squat: pose tidak jelas / kaki tidak terlihat"
+        else:
+            squat_stage = label.lower()
+            text_main = f"Squat stage: {label} ({prob:.2f})"
+
+        # FORM BENAR hanya jika BOTH feet & knee correct
+        if feet_status == "correct" and knee_status == "correct":
+            form_text = "FORM BENAR"
+            form_correct_flag = True
+        elif feet_status == "unknown" and knee_status == "unknown":
+            form_text = ""
+            form_correct_flag = False
+        else:
+            form_text = "FORM SALAH"
+            form_correct_flag = False
+
+        squat_count = self.squat_counter.update(
+            squat_stage, lower_vis, standing_now, form_correct_flag
+        )
 
-    # KNEE
-    if knee_ratio < kmin:
-        knee_status = "terlalu rapat"
-    elif knee_ratio > kmax:
-        knee_status = "terlalu lebar"
+        if self.telemetry is not None:
+            self.telemetry.record("counting", time.perf_counter() - t0)
+
+        return {
+            "mode": "squat",
+            "label": label,
+            "prob": prob,
+            "probs": probs,
+            "feet_status": feet_status,
+            "knee_status": knee_status,
+            "form_correct": form_correct_flag,
+            "squat_count": squat_count,
+            "mode_text": "MODE: SQUAT",
+            "text_main": text_main,
+            "form_text": form_text,
+            "count_line": f"COUNT: {squat_count}, {label if label else 'unknown'}, {prob:.2f}",
+            "feet_line": f"FEET: {feet_status}",
+            "knee_line": f"KNEE: {knee_status}",
+        }
+
+
+# -------------------------- OVERLAY -------------------------- #
+
+def draw_skeleton(frame, pose_landmarks):
+    mp_drawing.draw_landmarks(
+        frame,
+        pose_landmarks,
+        mp_pose.POSE_CONNECTIONS,
+        landmark_drawing_spec=mp_drawing.DrawingSpec(
+            thickness=2, circle_radius=2
+        ),
+        connection_drawing_spec=mp_drawing.DrawingSpec(thickness=1),
+    )
+
+
+def draw_overlay(frame, info: dict, fps: float, extra_lines: Tuple[str, ...] = ()):
+    """Gambar semua teks hasil ExerciseAnalyzer.analyze() + FPS ke frame (pakai TEXT_SPRITES)."""
+    h, w, _ = frame.shape
+    fps_text = f"FPS: {fps:.1f}"
+    draw_text = TEXT_SPRITES.draw
+
+    draw_text(frame, info["mode_text"], (10, 30), 0.8, (0, 255, 255))
+    draw_text(frame, info["text_main"], (10, 60), 0.7, (255, 255, 255))
+
+    if info["mode"] == "plank":
+        if info["form_text"]:
+            draw_text(frame, info["form_text"], (10, 90), 0.7, (0, 255, 0))
     else:
-        knee_status = "correct"
+        if info["count_line"]:
+            draw_text(frame, info["count_line"], (10, 90), 0.7, (255, 255, 255))
+        if info["feet_line"]:
+            draw_text(frame, info["feet_line"], (10, 120), 0.7, (0, 255, 0))
+        if info["knee_line"]:
+            draw_text(frame, info["knee_line"], (10, 150), 0.7, (0, 255, 0))
+        if info["form_text"]:
+            draw_text(frame, info["form_text"], (10, 180), 0.7, (0, 255, 255))
+
+    draw_text(frame, fps_text, (w - 160, 30), 0.7, (255, 255, 255))
 
-    return feet_status, knee_status
+    # Baris tambahan (debug / diagnostics) di pojok kiri bawah
+    for i, line in enumerate(reversed(extra_lines)):
+        draw_text(frame, line, (10, h - 15 - 25 * i), 0.5, (200, 200, 200), 1)
+
+
+WINDOW_NAME = "Exercise Correction (TFLite, 480p)"
+
+
+def handle_key(key: int, state: dict) -> bool:
+    """Update state (mode / skeleton) dari tombol keyboard. Return False kalau harus quit."""
+    if key == ord("q"):
+        return False
+    elif key == ord("p"):
+        state["mode"] = "plank"
+    elif key == ord("s"):
+        state["mode"] = "squat"
+    elif key == ord("d"):
+        state["draw_skeleton"] = not state["draw_skeleton"]
+    return True
 
 
 # -------------------------- MAIN LOOP -------------------------- #
 
-def main():
-    plank_cls = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank")
-    squat_cls = TFLitePoseClassifier(SQUAT_TFLITE, SQUAT_META, "squat_stage")
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory proses ini (MB), None kalau tidak tersedia (Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def report_startup():
+    """Print waktu dari start proses sampai frame pertama tampil + peak RSS."""
+    elapsed = time.perf_counter() - _T_PROCESS_START
+    peak = peak_rss_mb()
+    peak_text = f"{peak:.0f} MB" if peak is not None else "n/a"
+    print(f"[startup] time-to-first-frame: {elapsed:.2f}s, peak RSS: {peak_text}")
 
-    if not SQUAT_THRESHOLDS.exists():
-        raise FileNotFoundError(f"Squat thresholds not found: {SQUAT_THRESHOLDS}")
-    with open(SQUAT_THRESHOLDS, "r", encoding="utf-8") as f:
-        squat_thresholds = json.load(f)
 
-    cap = cv2.VideoCapture(2)
+def open_camera(device: int, low_latency: bool = False) -> cv2.VideoCapture:
+    cap = cv2.VideoCapture(device)
     if not cap.isOpened():
-        raise RuntimeError("Tidak bisa membuka webcam (device 0)")
+        raise RuntimeError(f"Tidak bisa membuka webcam (device {device})")
 
+    if low_latency:
+        from latest_frame_capture import set_low_latency
+
+        # FOURCC di-set sebelum resolusi (V4L2 menegosiasi format bersama ukuran)
+        print(f"[capture] low-latency settings: {set_low_latency(cap)}")
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    return cap
+
+
+def create_pose(model_complexity: int = 0, roi: bool = False):
+    """mp_pose.Pose, atau RoiPose (pose hanya di crop sekitar badan) kalau roi=True."""
+    def factory():
+        return mp_pose.Pose(
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            model_complexity=model_complexity,
+        )
+
+    if roi:
+        from roi_pose import RoiPose
+
+        return RoiPose(factory)
+    return factory()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Realtime plank / squat correction (TFLite).")
+    parser.add_argument("--camera", type=int, default=2, help="Index device webcam (default: 2).")
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Jalankan capture / pose / classify / render di thread terpisah (bounded queue).",
+    )
+    parser.add_argument(
+        "--latest-frame",
+        action="store_true",
+        help="Thread capture yang hanya menyimpan frame terbaru (buffersize 1, MJPG), frame lama di-drop.",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=2,
+        help="Kapasitas queue antar stage untuk mode --pipelined (default: 2).",
+    )
+    parser.add_argument(
+        "--roi",
+        action="store_true",
+        help="Pose hanya di crop sekitar landmark frame sebelumnya (fallback ke full frame).",
+    )
+    parser.add_argument(
+        "--gate-threshold",
+        type=float,
+        default=None,
+        help=(
+            "Aktifkan motion gate: pakai hasil klasifikasi terakhir kalau perpindahan badan "
+            f"< nilai ini x panjang torso (mis. {GATE_THRESHOLD})."
+        ),
+    )
+    parser.add_argument(
+        "--gate-max-stale",
+        type=int,
+        default=GATE_MAX_STALE,
+        help=f"Maks frame berturut-turut memakai hasil cache (default: {GATE_MAX_STALE}).",
+    )
+    parser.add_argument(
+        "--model-variant",
+        choices=MODEL_VARIANTS,
+        default="dynamic",
+        help=(
+            "Varian TFLite hasil training: dynamic (file utama), float, int8 (full integer), fp16, "
+            "atau auto (rekomendasi quantization_report.json)."
+        ),
+    )
+    parser.add_argument(
+        "--backend",
+        choices=INFERENCE_BACKENDS,
+        default="tflite",
+        help=(
+            "Backend inference MLP: tflite (interpreter) atau numpy (matmul dari bobot .npz "
+            "hasil training, tanpa runtime TFLite). numpy tidak untuk --fused / --squat-model temporal."
+        ),
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Plank + squat stage dari 1 model fused (1 interpreter, 1 invoke per frame).",
+    )
+    parser.add_argument(
+        "--squat-model",
+        choices=["mlp", "temporal"],
+        default="mlp",
+        help=(
+            "mlp = stage per frame (1 invoke / frame), temporal = Conv1D di atas window "
+            "frame terakhir, invoke tiap --temporal-stride frame."
+        ),
+    )
+    parser.add_argument(
+        "--temporal-stride",
+        type=int,
+        default=None,
+        help="Invoke model temporal tiap N frame (default: 'stride' di meta_temporal.json).",
+    )
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        default=None,
+        help="Aktifkan quality governor: atur resolusi pose / model_complexity / overlay untuk FPS ini.",
+    )
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=None,
+        help="Seperti --target-fps, tapi dalam budget latency per frame (ms).",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        help="Rekam landmark per frame ke file .lmrec (replay: landmark_recording.py).",
+    )
+    parser.add_argument(
+        "--telemetry-overlay",
+        action="store_true",
+        help="Tampilkan p50/p95 latency per stage di frame.",
+    )
+    parser.add_argument(
+        "--telemetry-jsonl",
+        type=Path,
+        default=None,
+        help="Append snapshot latency per stage (1 per detik) ke file JSONL ini.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve metrics format Prometheus di http://127.0.0.1:<port>/metrics.",
+    )
+    parser.add_argument(
+        "--preview-port",
+        type=int,
+        default=None,
+        help="Headless: tanpa jendela OpenCV, stream MJPEG + kontrol tombol di http://<host>:<port>/.",
+    )
+    parser.add_argument("--preview-host", default="127.0.0.1", help="Alamat bind preview MJPEG.")
+    parser.add_argument("--jpeg-quality", type=int, default=80, help="Kualitas JPEG preview (default: 80).")
+    args = parser.parse_args(argv)
+    if args.backend == "numpy" and (args.fused or args.squat_model == "temporal"):
+        parser.error("--backend numpy hanya untuk MLP per frame (tanpa --fused / --squat-model temporal).")
+    if args.backend == "numpy" and args.model_variant != "dynamic":
+        parser.error("--model-variant hanya untuk backend tflite (bobot .npz selalu float).")
+    if args.fused:
+        missing = [p.relative_to(THIS_DIR) for p in (FUSED_TFLITE, FUSED_META) if not p.exists()]
+        if missing:
+            parser.error(
+                f"--fused butuh model fused yang belum ada ({', '.join(map(str, missing))}). "
+                "Training dulu: python train_plank_squat_models.py --only fused"
+            )
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    telemetry = FrameTelemetry()
+    exporter = JsonlExporter(telemetry, args.telemetry_jsonl) if args.telemetry_jsonl else None
+    metrics_server = start_metrics_server(telemetry, args.metrics_port) if args.metrics_port else None
+
+    # Interpreter tiap exercise baru di-load saat mode-nya pertama kali dipilih
+    gate = {"gate_threshold": args.gate_threshold, "gate_max_stale": args.gate_max_stale, "backend": args.backend}
+    variant = args.model_variant
+    if args.fused:
+        plank_cls, squat_cls = fused_loaders(tflite_variant_path(FUSED_TFLITE, variant), FUSED_META, **gate)
+    else:
+        plank_cls = classifier_loader(tflite_variant_path(PLANK_TFLITE, variant), PLANK_META, "plank", **gate)
+    if args.squat_model == "temporal":
+        squat_cls = classifier_loader(
+            tflite_variant_path(SQUAT_TEMPORAL_TFLITE, variant),
+            SQUAT_TEMPORAL_META,
+            "squat_stage",
+            classifier_cls=TemporalStageClassifier,
+            stride=args.temporal_stride,
+            **gate,
+        )
+    elif not args.fused:
+        squat_cls = classifier_loader(
+            tflite_variant_path(SQUAT_TFLITE, variant), SQUAT_META, "squat_stage", **gate
+        )
+    analyzer = ExerciseAnalyzer(plank_cls, squat_cls, load_squat_thresholds(), telemetry=telemetry)
+
+    cap = open_camera(args.camera, low_latency=args.latest_frame)
+    if args.latest_frame:
+        from latest_frame_capture import LatestFrameCapture
+
+        cap = LatestFrameCapture(cap, telemetry=telemetry)
+
+    recorder = None
+    if args.record:
+        from landmark_recording import LandmarkRecorder
+
+        recorder = LandmarkRecorder(args.record)
+        print(f"[record] Landmark -> {args.record}")
+
+    governor = None
+    if args.target_fps or args.latency_budget_ms:
+        from quality_governor import QualityGovernor
 
-    current_mode = "plank"  # "plank" / "squat"
-    draw_skeleton = True
+        governor = QualityGovernor(target_fps=args.target_fps, latency_budget_ms=args.latency_budget_ms)
 
-    prev_time = time.time()
-    fps = 0.0
+    state = {
+        "mode": "plank",  # "plank" / "squat"
+        "draw_skeleton": True,
+        "roi": args.roi,
+        "governor": governor,
+        "recorder": recorder,
+        "telemetry": telemetry,
+        "telemetry_overlay": args.telemetry_overlay,
+        "telemetry_exporter": exporter,
+        "preview": None,
+    }
 
-    squat_count = 0
-    squat_state = "none"  # "none" / "up" / "down"
+    if args.preview_port:
+        from mjpeg_preview import MjpegPreview
+
+        state["preview"] = MjpegPreview(args.preview_port, args.preview_host, args.jpeg_quality, state=state)
 
     print("=== Realtime demo (TFLite, 480p, no frame skip) ===")
     print("Tombol: 'p' = Plank, 's' = Squat, 'd' = toggle skeleton, 'q' = quit")
 
-    with mp_pose.Pose(
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5,
-        model_complexity=0,
-    ) as pose:
+    try:
+        if args.pipelined:
+            from realtime_pipeline import run_pipelined
+
+            run_pipelined(cap, analyzer, state, queue_size=args.queue_size)
+        else:
+            run_sequential(cap, analyzer, state)
+    finally:
+        cap.release()
+        if state["preview"] is not None:
+            state["preview"].close()
+        else:
+            cv2.destroyAllWindows()
+        if exporter is not None:
+            exporter.close()
+        if recorder is not None:
+            recorder.close()
+            print(f"[record] {recorder.frames} frames saved to: {args.record}")
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        for name, stats in analyzer.gate_stats().items():
+            print(
+                f"[gate] {name}: skipped {stats['skipped']}/{stats['calls']} "
+                f"({stats['skip_ratio'] * 100:.1f}%)"
+            )
+        for name, stats in analyzer.temporal_stats().items():
+            print(
+                f"[temporal] {name}: invoke {stats['invokes']}/{stats['calls']} frame "
+                f"({stats['invoke_ratio'] * 100:.1f}%)"
+            )
+        sprites = TEXT_SPRITES.stats()
+        print(
+            f"[overlay] text sprites: {sprites['sprites']} cached, {sprites['hits']} hits, "
+            f"{sprites['rasterized']} rasterized, {sprites['direct']} direct putText"
+        )
+
+
+def telemetry_lines(state: dict) -> Tuple[str, ...]:
+    """Baris overlay telemetry (kalau --telemetry-overlay), plus tulis JSONL kalau aktif."""
+    exporter = state.get("telemetry_exporter")
+    if exporter is not None:
+        exporter.maybe_write()
+    telemetry = state.get("telemetry")
+    if telemetry is None or not state.get("telemetry_overlay"):
+        return ()
+    return (telemetry.overlay_line(),)
+
+
+def flip_for_display(frame: np.ndarray) -> np.ndarray:
+    """Mirror frame untuk ditampilkan, in-place (frame dari cap.read() tidak dipakai lagi)."""
+    return cv2.flip(frame, 1, dst=frame)
+
+
+def show_frame(state: dict, frame) -> int:
+    """
+    Tampilkan frame: cv2.imshow + waitKey, atau kirim ke preview MJPEG kalau
+    headless. Return kode tombol (& 0xFF), 0xFF kalau tidak ada tombol.
+    """
+    preview = state.get("preview")
+    if preview is None:
+        cv2.imshow(WINDOW_NAME, frame)
+        return cv2.waitKey(1) & 0xFF
+    preview.submit(frame)
+    return preview.poll_key()
+
+
+def create_state_pose(state: dict):
+    """Pose sesuai state: RoiPose kalau --roi, dibungkus GovernedPose kalau governor aktif."""
+    roi = state.get("roi", False)
+    governor = state.get("governor")
+    if governor is None:
+        return create_pose(roi=roi)
+
+    from quality_governor import GovernedPose
+
+    return GovernedPose(governor, lambda model_complexity: create_pose(model_complexity, roi=roi))
+
+
+def overlay_detail(state: dict) -> str:
+    """'full' atau 'minimal' (tanpa skeleton / baris debug), diatur governor."""
+    governor = state.get("governor")
+    return governor.level.overlay if governor is not None else "full"
+
+
+def run_sequential(cap, analyzer: ExerciseAnalyzer, state: dict):
+    telemetry = state.setdefault("telemetry", FrameTelemetry())
+    governor = state.get("governor")
+    recorder = state.get("recorder")
+    frame_idx = 0
+    first_frame = True
+    clock = time.perf_counter
+    image_rgb = None
+
+    with create_state_pose(state) as pose:
         while True:
+            t0 = clock()
             ret, frame = cap.read()
             if not ret:
                 print("Frame tidak terbaca, stop.")
                 break
+            t1 = clock()
+            telemetry.record("capture", t1 - t0)
 
-            now = time.time()
-            dt = now - prev_time
-            if dt > 0:
-                fps = 1.0 / dt
-            prev_time = now
-
-            frame = cv2.flip(frame, 1)
-            image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Tanpa flip: pose di frame asli, landmark yang di-mirror
+            image_rgb = bgr_to_rgb(frame, image_rgb)
             image_rgb.flags.writeable = False
+            t2 = clock()
+            telemetry.record("convert", t2 - t1)
+
             results = pose.process(image_rgb)
-            image_rgb.flags.writeable = True
+            telemetry.record("pose", clock() - t2)
 
+            # Protobuf (koordinat frame asli) hanya untuk skeleton,
+            # analyze() cukup array yang sudah di-mirror
             pose_landmarks = results.pose_landmarks
-
-            if draw_skeleton and pose_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame,
-                    pose_landmarks,
-                    mp_pose.POSE_CONNECTIONS,
-                    landmark_drawing_spec=mp_drawing.DrawingSpec(
-                        thickness=2, circle_radius=2
-                    ),
-                    connection_drawing_spec=mp_drawing.DrawingSpec(thickness=1),
-                )
-
-            # ====== MODE PLANK ======
-            if current_mode == "plank":
-                mode_text = "MODE: PLANK"
-                label, prob, _ = plank_cls.predict(pose_landmarks)
-
-                if label is None:
-                    text_main = "Plank: pose tidak terdeteksi"
-                    form_text = ""
-                else:
-                    label_clean = label.strip().upper()
-                    # HANYA C yang dianggap FORM BENAR
-                    is_correct = (label_clean == "C")
-                    form_status = "FORM BENAR" if is_correct else "FORM SALAH"
-                    text_main = f"Plank: {label} ({prob:.2f})"
-                    form_text = form_status
-
-                count_line = ""
-                feet_line = ""
-                knee_line = ""
-
-            # ====== MODE SQUAT ======
-            else:
-                mode_text = "MODE: SQUAT"
-                label, prob, _ = squat_cls.predict(pose_landmarks)
-                lower_vis = lower_body_visible(pose_landmarks, min_visibility=0.6)
-                standing_now = is_standing_pose(pose_landmarks)
-
-                if label is None or not lower_vis:
-                    squat_stage = "unknown"
-                    text_main = "Squat: pose tidak jelas / kaki tidak terlihat"
-                else:
-                    squat_stage = label.lower()
-                    text_main = f"Squat stage: {label} ({prob:.2f})"
-
-                feet_status, knee_status = analyze_squat_feet_knee(
-                    pose_landmarks, squat_thresholds
-                )
-
-                # FORM BENAR hanya jika BOTH feet & knee correct
-                if feet_status == "correct" and knee_status == "correct":
-                    form_text = "FORM BENAR"
-                    form_correct_flag = True
-                elif feet_status == "unknown" and knee_status == "unknown":
-                    form_text = ""
-                    form_correct_flag = False
-                else:
-                    form_text = "FORM SALAH"
-                    form_correct_flag = False
-
-                # --------- COUNT: perlu lower_body, transisi DOWN->UP, standing, dan FORM BENAR --------- #
-                if not lower_vis:
-                    squat_state = "none"
-                else:
-                    is_down = any(s in squat_stage for s in SQUAT_STAGE_DOWN_LABELS)
-                    is_up = any(s in squat_stage for s in SQUAT_STAGE_UP_LABELS) and standing_now
-
-                    if is_down and squat_state != "down":
-                        squat_state = "down"
-                    elif (
-                        is_up
-                        and squat_state == "down"
-                        and form_correct_flag  # HANYA kalau knee & feet correct
-                    ):
-                        squat_count += 1
-                        squat_state = "up"
-                # ----------------------------------------------------------------------------------------- #
-
-                count_line = f"COUNT: {squat_count}, {label if label else 'unknown'}, {prob:.2f}"
-                feet_line = f"FEET: {feet_status}"
-                knee_line = f"KNEE: {knee_status}"
-
-            # -------------------------- OVERLAY TEKS -------------------------- #
-            h, w, _ = frame.shape
-            fps_text = f"FPS: {fps:.1f}"
-
-            draw_text_with_outline(frame, mode_text, (10, 30), 0.8, (0, 255, 255))
-            draw_text_with_outline(frame, text_main, (10, 60), 0.7, (255, 255, 255))
-
-            if current_mode == "plank":
-                if form_text:
-                    draw_text_with_outline(frame, form_text, (10, 90), 0.7, (0, 255, 0))
-            else:
-                if count_line:
-                    draw_text_with_outline(frame, count_line, (10, 90), 0.7, (255, 255, 255))
-                if feet_line:
-                    draw_text_with_outline(frame, feet_line, (10, 120), 0.7, (0, 255, 0))
-                if knee_line:
-                    draw_text_with_outline(frame, knee_line, (10, 150), 0.7, (0, 255, 0))
-                if form_text:
-                    draw_text_with_outline(frame, form_text, (10, 180), 0.7, (0, 255, 255))
-
-            draw_text_with_outline(frame, fps_text, (w - 160, 30), 0.7, (255, 255, 255))
-
-            cv2.imshow("Exercise Correction (TFLite, 480p)", frame)
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord("q"):
+            lm = mirror_landmarks(landmarks_to_array(pose_landmarks))
+            if recorder is not None:
+                recorder.write(frame_idx, None, lm)
+            frame_idx += 1
+
+            # features / invoke / counting dicatat di dalam analyze()
+            info = analyzer.analyze(lm, state["mode"])
+
+            t3 = clock()
+            full_overlay = overlay_detail(state) == "full"
+            if state["draw_skeleton"] and pose_landmarks and full_overlay:
+                draw_skeleton(frame, pose_landmarks)
+            flip_for_display(frame)
+            extra_lines = telemetry_lines(state)
+            draw_overlay(frame, info, telemetry.fps(), extra_lines=extra_lines if full_overlay else ())
+            t4 = clock()
+            telemetry.record("overlay", t4 - t3)
+
+            key = show_frame(state, frame)
+            if first_frame:
+                report_startup()
+                first_frame = False
+            t5 = clock()
+            telemetry.record("display", t5 - t4)
+            telemetry.frame_done()
+            if governor is not None:
+                # Latency proses 1 frame (tanpa nunggu kamera)
+                pose.report(t5 - t1)
+            if not handle_key(key, state):
                 break
-            elif key == ord("p"):
-                current_mode = "plank"
-            elif key == ord("s"):
-                current_mode = "squat"
-            elif key == ord("d"):
-                draw_skeleton = not draw_skeleton
-
-    cap.release()
-    cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
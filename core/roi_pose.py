@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ROI cropping untuk MediaPipe Pose (opsi --roi).
+
+Kamera gym wide-angle: orangnya cuma mengisi sebagian kecil frame 640x480,
+tapi pose.process() selalu dapat full frame. RoiPose memakai landmark frame
+sebelumnya untuk bounding box + padding, menjalankan pose HANYA di crop itu,
+lalu memetakan landmark kembali ke koordinat normalized full frame. Jadi
+TFLitePoseClassifier, geometry squat, dan overlay tidak perlu tahu ada crop.
+
+- Crop dibuat stabil (hysteresis): box lama dipakai terus selama badan masih
+  di dalamnya dan box tidak jadi jauh lebih kecil. Ini juga menjaga tracking
+  internal MediaPipe yang bekerja di koordinat crop.
+- Kalau pose di crop hilang / visibility rata-rata badan turun di bawah
+  min_visibility, frame yang sama diproses ulang di full frame (graph Pose
+  terpisah) dan ROI di-reset.
+- Saat close(), jumlah frame ROI / full frame / fallback di-print (lihat
+  stats_line()), jadi kelihatan seberapa sering crop benar-benar dipakai.
+"""
+
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from realtime_plank_squat_tflite import (
+    BODY_IDX,
+    LM_VIS,
+    LM_X,
+    LM_Y,
+    LM_Z,
+    array_to_landmarks,
+    landmarks_to_array,
+)
+
+# (x0, y0, x1, y1) dalam pixel
+Box = Tuple[int, int, int, int]
+
+
+class RoiPoseResult(NamedTuple):
+    pose_landmarks: object  # NormalizedLandmarkList (koordinat full frame) atau None
+
+
+class RoiPose:
+    """
+    Pengganti mp_pose.Pose dengan interface yang sama (process() + context manager).
+
+    pose_factory: fungsi tanpa argumen yang membuat 1 graph mp_pose.Pose baru.
+    padding     : padding tiap sisi, relatif terhadap ukuran bbox landmark.
+    min_size    : ukuran minimum crop, relatif terhadap lebar / tinggi frame.
+    max_area    : kalau crop > max_area x luas frame, langsung full frame.
+    """
+
+    def __init__(
+        self,
+        pose_factory: Callable[[], object],
+        padding: float = 0.25,
+        min_visibility: float = 0.5,
+        min_size: float = 0.25,
+        max_area: float = 0.8,
+    ):
+        self.crop_pose = pose_factory()
+        self.full_pose = pose_factory()
+        self.padding = padding
+        self.min_visibility = min_visibility
+        self.min_size = min_size
+        self.max_area = max_area
+
+        self.roi: Optional[Box] = None
+        self._prev: Optional[np.ndarray] = None
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.crop_pose.close()
+        self.full_pose.close()
+        if self.roi_frames or self.full_frames:
+            print(f"[RoiPose] {self.stats_line()}")
+
+    # ---------- ROI ---------- #
+
+    def _confident(self, lm: Optional[np.ndarray]) -> bool:
+        return lm is not None and float(lm[BODY_IDX, LM_VIS].mean()) >= self.min_visibility
+
+    def _landmark_box(self, lm: np.ndarray, w: int, h: int) -> Tuple[float, float, float, float]:
+        """Bbox landmark yang cukup terlihat, dalam pixel (belum dipadding)."""
+        visible = lm[:, LM_VIS] >= self.min_visibility
+        pts = lm[visible, :2] if visible.sum() >= 4 else lm[:, :2]
+        x0, y0 = pts.min(axis=0)
+        x1, y1 = pts.max(axis=0)
+        return float(x0) * w, float(y0) * h, float(x1) * w, float(y1) * h
+
+    def _next_roi(self, w: int, h: int) -> Optional[Box]:
+        if self._prev is None:
+            return None
+
+        bx0, by0, bx1, by1 = self._landmark_box(self._prev, w, h)
+
+        # Hysteresis: box lama tetap dipakai kalau badan masih di dalamnya
+        # (dengan margin setengah padding) dan box lama tidak > 2x kebesaran.
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            mx = 0.5 * self.padding * (bx1 - bx0)
+            my = 0.5 * self.padding * (by1 - by0)
+            inside = (
+                (bx0 - mx >= rx0 or rx0 == 0) and (bx1 + mx <= rx1 or rx1 == w)
+                and (by0 - my >= ry0 or ry0 == 0) and (by1 + my <= ry1 or ry1 == h)
+            )
+            new_area = (bx1 - bx0) * (by1 - by0) * (1 + 2 * self.padding) ** 2
+            if inside and new_area >= 0.5 * (rx1 - rx0) * (ry1 - ry0):
+                return self.roi
+
+        bw = max((bx1 - bx0) * (1 + 2 * self.padding), self.min_size * w)
+        bh = max((by1 - by0) * (1 + 2 * self.padding), self.min_size * h)
+        cx, cy = 0.5 * (bx0 + bx1), 0.5 * (by0 + by1)
+        x0 = int(max(0, cx - 0.5 * bw))
+        y0 = int(max(0, cy - 0.5 * bh))
+        x1 = int(min(w, cx + 0.5 * bw))
+        y1 = int(min(h, cy + 0.5 * bh))
+
+        if x1 - x0 < 2 or y1 - y0 < 2 or (x1 - x0) * (y1 - y0) > self.max_area * w * h:
+            return None
+        return x0, y0, x1, y1
+
+    # ---------- PROCESS ---------- #
+
+    def process(self, image_rgb: np.ndarray) -> RoiPoseResult:
+        h, w = image_rgb.shape[:2]
+        roi = self._next_roi(w, h)
+
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            crop = np.ascontiguousarray(image_rgb[y0:y1, x0:x1])
+            lm = landmarks_to_array(self.crop_pose.process(crop).pose_landmarks)
+            if self._confident(lm):
+                cw, ch = x1 - x0, y1 - y0
+                # crop normalized -> full frame normalized (z ikut skala lebar)
+                lm[:, LM_X] = (x0 + lm[:, LM_X] * cw) / w
+                lm[:, LM_Y] = (y0 + lm[:, LM_Y] * ch) / h
+                lm[:, LM_Z] *= cw / w
+                self.roi = roi
+                self._prev = lm
+                self.roi_frames += 1
+                return RoiPoseResult(array_to_landmarks(lm))
+            self.fallbacks += 1
+
+        # Full frame: frame pertama, setelah pose hilang, atau crop tidak yakin
+        pose_landmarks = self.full_pose.process(image_rgb).pose_landmarks
+        lm = landmarks_to_array(pose_landmarks)
+        self.roi = None
+        self._prev = lm if self._confident(lm) else None
+        self.full_frames += 1
+        return RoiPoseResult(pose_landmarks)
+
+    def stats_line(self) -> str:
+        """Jumlah frame yang diproses di crop / full frame / fallback (di-print saat close())."""
+        return f"ROI {self.roi_frames} full {self.full_frames} fallback {self.fallbacks}"
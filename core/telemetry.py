@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Telemetry latency per stage untuk loop realtime.
+
+Setiap frame diukur per stage:
+
+    capture   cap.read()
+    frame_age umur frame saat diambil dari slot LatestFrameCapture (hanya --latest-frame)
+    convert   cvtColor BGR -> RGB (ke buffer yang dipakai ulang)
+    pose      pose.process()
+    features  susun vektor fitur (ditulis ke input interpreter)
+    invoke    interpreter.invoke() + ambil output
+    counting  visibility / standing / feet-knee / SquatCounter
+    overlay   skeleton + flip tampilan + teks
+    display   imshow + waitKey (atau submit ke preview MJPEG)
+
+Disimpan di rolling window (default 300 sampel per stage) -> p50 / p95 / p99,
+plus jumlah frame, frame yang di-drop dan FPS rata-rata window (lebih stabil
+dari 1 / dt satu frame). Jumlah sampel dan total detik per stage juga
+dihitung kumulatif sejak start (_count / _sum di /metrics, hanya naik).
+
+Export (semua opsional):
+- JSONL  : 1 snapshot per interval ke file (--telemetry-jsonl).
+- HTTP   : endpoint teks format Prometheus di http://127.0.0.1:<port>/metrics
+           (--metrics-port).
+- Overlay: 1 baris ringkas p50/p95 di frame (--telemetry-overlay).
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Optional
+
+import numpy as np
+
+STAGES = ("capture", "frame_age", "convert", "pose", "features", "invoke", "counting", "overlay", "display")
+
+# Nama pendek untuk baris overlay
+STAGE_SHORT = {
+    "capture": "cap",
+    "frame_age": "age",
+    "convert": "cvt",
+    "pose": "pose",
+    "features": "feat",
+    "invoke": "inv",
+    "counting": "cnt",
+    "overlay": "ovl",
+    "display": "disp",
+}
+
+QUANTILES = (50, 95, 99)
+
+# Default ukuran rolling window per stage (jumlah frame)
+DEFAULT_WINDOW = 300
+
+# Snapshot untuk overlay / JSONL tidak dihitung ulang lebih sering dari ini (detik)
+SNAPSHOT_INTERVAL = 0.5
+
+
+class FrameTelemetry:
+    """
+    Rolling latency per stage. record() boleh dipanggil dari thread mana pun
+    (mode --pipelined), semua akses dilindungi 1 lock.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {s: deque(maxlen=window) for s in STAGES}
+        self._frame_times: Deque[float] = deque(maxlen=window)
+        # Kumulatif sejak start per stage: [jumlah sampel, total detik]
+        self._totals: Dict[str, list] = {s: [0, 0.0] for s in STAGES}
+        self.frames = 0
+        self.dropped = 0
+        self._snapshot: Optional[dict] = None
+        self._snapshot_time = 0.0
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples[stage].append(seconds)
+            total = self._totals[stage]
+            total[0] += 1
+            total[1] += seconds
+
+    def add_dropped(self, n: int = 1):
+        with self._lock:
+            self.dropped += n
+
+    def frame_done(self):
+        """Panggil sekali per frame yang selesai ditampilkan / diproses."""
+        now = time.perf_counter()
+        with self._lock:
+            self.frames += 1
+            self._frame_times.append(now)
+
+    def fps(self) -> float:
+        """FPS rata-rata dalam rolling window."""
+        with self._lock:
+            if len(self._frame_times) < 2:
+                return 0.0
+            span = self._frame_times[-1] - self._frame_times[0]
+            return (len(self._frame_times) - 1) / span if span > 0 else 0.0
+
+    def snapshot(self, max_age: float = 0.0) -> dict:
+        """
+        Ringkasan saat ini: {"ts", "frames", "dropped", "fps", "stages": {stage:
+        {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "total_count",
+        "total_s"}}}. count / mean / persentil dari rolling window, total_*
+        kumulatif sejak start. Hasil di-cache selama max_age detik supaya aman
+        dipanggil tiap frame.
+        """
+        now = time.perf_counter()
+        if self._snapshot is not None and now - self._snapshot_time < max_age:
+            return self._snapshot
+
+        with self._lock:
+            samples = {s: list(q) for s, q in self._samples.items()}
+            totals = {s: tuple(t) for s, t in self._totals.items()}
+            frames, dropped = self.frames, self.dropped
+
+        stages = {}
+        for stage, values in samples.items():
+            if not values:
+                continue
+            arr = np.asarray(values) * 1000.0
+            pcts = np.percentile(arr, QUANTILES)
+            stages[stage] = {
+                "count": len(values),
+                "mean_ms": round(float(arr.mean()), 3),
+                **{f"p{q}_ms": round(float(v), 3) for q, v in zip(QUANTILES, pcts)},
+                "total_count": totals[stage][0],
+                "total_s": round(totals[stage][1], 6),
+            }
+
+        self._snapshot = {
+            "ts": round(time.time(), 3),
+            "frames": frames,
+            "dropped": dropped,
+            "fps": round(self.fps(), 2),
+            "stages": stages,
+        }
+        self._snapshot_time = now
+        return self._snapshot
+
+    def overlay_line(self) -> str:
+        """Contoh: 'p50/p95 ms pose 11.2/14.0 inv 0.0/0.1 ... drop 3'."""
+        snap = self.snapshot(max_age=SNAPSHOT_INTERVAL)
+        parts = [
+            f"{STAGE_SHORT[s]} {st['p50_ms']:.1f}/{st['p95_ms']:.1f}"
+            for s, st in snap["stages"].items()
+        ]
+        return f"p50/p95 ms {' '.join(parts)} drop {snap['dropped']}"
+
+    def prometheus_text(self) -> str:
+        """Snapshot dalam format teks Prometheus (summary per stage)."""
+        snap = self.snapshot()
+        lines = [
+            "# HELP autoreps_stage_latency_seconds Per-frame latency per pipeline stage "
+            "(quantiles over the rolling window, _count / _sum since start).",
+            "# TYPE autoreps_stage_latency_seconds summary",
+        ]
+        for stage, st in snap["stages"].items():
+            for q in QUANTILES:
+                lines.append(
+                    f'autoreps_stage_latency_seconds{{stage="{stage}",quantile="{q / 100:g}"}} '
+                    f"{st[f'p{q}_ms'] / 1000.0:.6f}"
+                )
+            lines.append(f'autoreps_stage_latency_seconds_sum{{stage="{stage}"}} {st["total_s"]:.6f}')
+            lines.append(f'autoreps_stage_latency_seconds_count{{stage="{stage}"}} {st["total_count"]}')
+        lines += [
+            "# HELP autoreps_frames_total Frames processed.",
+            "# TYPE autoreps_frames_total counter",
+            f"autoreps_frames_total {snap['frames']}",
+            "# HELP autoreps_dropped_frames_total Frames dropped before pose inference.",
+            "# TYPE autoreps_dropped_frames_total counter",
+            f"autoreps_dropped_frames_total {snap['dropped']}",
+            "# HELP autoreps_fps Average frames per second over the rolling window.",
+            "# TYPE autoreps_fps gauge",
+            f"autoreps_fps {snap['fps']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class JsonlExporter:
+    """Tulis 1 snapshot per `interval` detik ke file JSONL (dipanggil dari loop utama)."""
+
+    def __init__(self, telemetry: FrameTelemetry, path: Path, interval: float = 1.0):
+        self.telemetry = telemetry
+        self.interval = interval
+        self._f = open(path, "a", encoding="utf-8")
+        self._last = time.perf_counter()
+
+    def maybe_write(self):
+        now = time.perf_counter()
+        if now - self._last < self.interval:
+            return
+        self._last = now
+        self._f.write(json.dumps(self.telemetry.snapshot()) + "\n")
+        self._f.flush()
+
+    def close(self):
+        self._f.write(json.dumps(self.telemetry.snapshot()) + "\n")
+        self._f.close()
+
+
+def start_metrics_server(telemetry: FrameTelemetry, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics (format Prometheus) di background thread. Return server (panggil .shutdown())."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = telemetry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # jangan spam console tiap scrape
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"[telemetry] Prometheus metrics: http://{host}:{port}/metrics")
+    return server
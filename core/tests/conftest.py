@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# Script di core/ di-import langsung (bukan package), sama seperti saat dijalankan
+CORE_DIR = Path(__file__).resolve().parent.parent
+if str(CORE_DIR) not in sys.path:
+    sys.path.insert(0, str(CORE_DIR))
+
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
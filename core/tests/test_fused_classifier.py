@@ -0,0 +1,106 @@
+"""
+FusedPoseClassifier: API multi-head (predict_all / predict_batch_all / head)
+tanpa predict() 1 head warisan, plus motion gate yang diteruskan dari loader.
+
+Model fused tidak di-commit, jadi dibuat dari build_fused_classifier()
+(bobot acak, yang dicek hanya plumbing-nya).
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import (
+    NUM_LANDMARKS,
+    PLANK_META,
+    SQUAT_META,
+    ExerciseAnalyzer,
+    FusedPoseClassifier,
+    TFLitePoseClassifier,
+    fused_loaders,
+)
+
+train = pytest.importorskip("train_plank_squat_models")
+
+
+@pytest.fixture(scope="module")
+def fused_model(tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("fused")
+    with open(PLANK_META, "r", encoding="utf-8") as f:
+        plank = json.load(f)
+    with open(SQUAT_META, "r", encoding="utf-8") as f:
+        squat = json.load(f)
+    heads = {"plank": plank, "squat_stage": squat}
+    num_features = len(plank["feature_columns"]) + len(squat["feature_columns"])
+
+    train.tf.keras.utils.set_random_seed(21)
+    model = train.build_fused_classifier(
+        num_features, {name: len(head["label_mapping"]) for name, head in heads.items()}
+    )
+    tflite_path = model_dir / "plank_squat_fused.tflite"
+    train.export_tflite(model, tflite_path, "float")
+    x = np.random.default_rng(21).normal(size=(32, num_features)).astype(np.float32)
+    order = train._tflite_output_order(tflite_path, model, x)
+
+    meta = {
+        "feature_columns": plank["feature_columns"] + squat["feature_columns"],
+        "heads": {
+            name: {
+                "feature_columns": head["feature_columns"],
+                "label_mapping": head["label_mapping"],
+                "output_index": order[name],
+            }
+            for name, head in heads.items()
+        },
+    }
+    meta_path = model_dir / "meta.json"
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return tflite_path, meta_path
+
+
+def frames(n: int) -> np.ndarray:
+    rng = np.random.default_rng(21)
+    return rng.uniform(0.1, 0.9, size=(n, NUM_LANDMARKS, 4)).astype(np.float32)
+
+
+def test_no_single_head_api(fused_model):
+    fused = FusedPoseClassifier(*fused_model, use_profile=False)
+    assert not isinstance(fused, TFLitePoseClassifier)
+    assert not hasattr(fused, "predict") and not hasattr(fused, "predict_batch")
+
+
+def test_heads_match_predict_all_and_batch(fused_model):
+    fused = FusedPoseClassifier(*fused_model, use_profile=False)
+    lm = frames(16)
+    batch = fused.predict_batch_all(lm)
+    for name in ("plank", "squat_stage"):
+        head = fused.head(name)
+        labels, probs = head.predict_batch(lm)
+        assert list(labels) == list(batch[name][0])
+        for i in range(len(lm)):
+            label, prob, p = head.predict(lm[i])
+            assert label == labels[i]
+            assert prob == pytest.approx(float(probs[i].max()), abs=1e-5)
+            np.testing.assert_allclose(p, probs[i], rtol=0, atol=1e-5)
+
+
+def test_gate_kwargs_reach_fused_model(fused_model):
+    plank_cls, squat_cls = fused_loaders(*fused_model, gate_threshold=0.05, use_profile=False)
+    analyzer = ExerciseAnalyzer(plank_cls, squat_cls, {})
+    static = frames(1)[0]
+    for _ in range(10):
+        analyzer.analyze(static, "plank")
+
+    head = analyzer.plank_cls
+    assert head.gate_threshold == 0.05
+    assert head.fused is analyzer.squat_cls.fused
+    stats = analyzer.gate_stats()
+    assert list(stats) == ["fused"]
+    assert stats["fused"]["calls"] == 10 and stats["fused"]["skipped"] > 0
+
+
+def test_numpy_backend_is_rejected(fused_model):
+    with pytest.raises(ValueError):
+        FusedPoseClassifier(*fused_model, backend="numpy")
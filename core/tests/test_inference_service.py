@@ -0,0 +1,107 @@
+"""MicroBatcher (executor + backpressure) dan validasi frame di inference_service."""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from inference_service import InferenceService, MicroBatcher, Overloaded
+from realtime_plank_squat_tflite import NUM_LANDMARKS
+
+
+class SlowClassifier:
+    """predict_batch() yang menahan worker thread sampai release di-set."""
+
+    exercise_name = "fake"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batch_sizes = []
+        self.threads = set()
+
+    def predict_batch(self, lm):
+        self.threads.add(threading.get_ident())
+        self.release.wait(5.0)
+        self.batch_sizes.append(len(lm))
+        probs = np.tile(np.array([[0.25, 0.75]], dtype=np.float32), (len(lm), 1))
+        return np.array(["up"] * len(lm), dtype=object), probs
+
+
+def frame() -> np.ndarray:
+    return np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+
+
+def test_flush_runs_off_loop_and_applies_max_pending():
+    cls = SlowClassifier()
+    batcher = MicroBatcher(cls, max_batch=4, max_wait_ms=1.0, max_pending=10)
+
+    async def scenario():
+        first = [batcher.submit(frame()) for _ in range(4)]  # penuh -> flush ke executor
+        # Event loop tidak terblokir selama invoke
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - t0 < 1.0
+        assert batcher.in_flight == 4
+
+        queued = [batcher.submit(frame()) for _ in range(6)]
+        assert batcher.in_flight == 10
+        with pytest.raises(Overloaded):
+            batcher.submit(frame())
+
+        cls.release.set()
+        results = await asyncio.gather(*first, *queued)
+        return results
+
+    results = asyncio.run(scenario())
+    batcher.close()
+
+    assert [r[0] for r in results] == ["up"] * 10
+    assert results[0][1] == pytest.approx(0.75)
+    # Batch pertama 4, frame yang antre selama invoke di-flush per max_batch
+    assert cls.batch_sizes == [4, 4, 2]
+    assert threading.get_ident() not in cls.threads
+    assert batcher.rejected == 1 and batcher.in_flight == 0
+
+
+def test_predict_error_is_set_on_futures():
+    class Broken(SlowClassifier):
+        def predict_batch(self, lm):
+            raise RuntimeError("boom")
+
+    batcher = MicroBatcher(Broken(), max_batch=2, max_wait_ms=1.0)
+
+    async def scenario():
+        futures = [batcher.submit(frame()) for _ in range(3)]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    batcher.close()
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.in_flight == 0
+
+
+def test_non_object_frame_is_bad_request():
+    test_utils = pytest.importorskip("aiohttp.test_utils")
+    service = InferenceService(max_wait_ms=1.0)
+
+    async def scenario():
+        async with test_utils.TestClient(test_utils.TestServer(service.make_app())) as client:
+            resp = await client.post("/sessions", json={"mode": "squat"})
+            session_id = (await resp.json())["session_id"]
+            statuses = []
+            for body in ([1, 2, 3], "squat", 42, None):
+                resp = await client.post(f"/sessions/{session_id}/frames", json=body)
+                statuses.append(resp.status)
+            resp = await client.post(f"/sessions/{session_id}/frames", data=b"{not json")
+            statuses.append(resp.status)
+            resp = await client.post("/sessions", json=["squat"])
+            statuses.append(resp.status)
+
+            ok = await client.post(f"/sessions/{session_id}/frames", json={"landmarks": frame().tolist()})
+            return statuses, ok.status, await ok.json()
+
+    statuses, ok_status, result = asyncio.run(scenario())
+    assert statuses == [400] * 6
+    assert ok_status == 200 and result["frame"] == 0
@@ -0,0 +1,78 @@
+"""Profil host tune_interpreter.py dipakai TFLitePoseClassifier: threads, XNNPACK, ukuran chunk batch."""
+
+import json
+
+import numpy as np
+import pytest
+
+import realtime_plank_squat_tflite as rt
+from realtime_plank_squat_tflite import NUM_LANDMARKS, PLANK_META, PLANK_TFLITE, TFLitePoseClassifier
+
+PROFILE = {
+    "single": {"num_threads": 2, "xnnpack": False, "us_p50": 10.0},
+    "batch": {"num_threads": 3, "xnnpack": True, "batch_size": 64, "us_per_frame": 1.0},
+}
+
+
+@pytest.fixture
+def profiled(tmp_path, monkeypatch):
+    """Profil host sementara + catat argumen setiap create_interpreter."""
+    monkeypatch.setattr(rt, "INTERPRETER_PROFILE_DIR", tmp_path)
+    with open(rt.host_profile_path(), "w", encoding="utf-8") as f:
+        json.dump({"host": {}, "models": {PLANK_TFLITE.name: PROFILE}}, f)
+    rt.load_interpreter_profile.cache_clear()
+
+    calls = []
+    real_create = rt.create_interpreter
+
+    def recording_create(model_path, num_threads=None, xnnpack=True):
+        calls.append((num_threads, xnnpack))
+        return real_create(model_path, num_threads=num_threads, xnnpack=xnnpack)
+
+    monkeypatch.setattr(rt, "create_interpreter", recording_create)
+    yield calls
+    rt.load_interpreter_profile.cache_clear()
+
+
+def frames(n: int) -> np.ndarray:
+    return np.random.default_rng(3).uniform(0.1, 0.9, size=(n, NUM_LANDMARKS, 4)).astype(np.float32)
+
+
+def test_profile_sets_threads_xnnpack_and_batch_chunk(profiled, monkeypatch):
+    cls = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank")
+    assert profiled == [(2, False)]
+    assert cls.max_batch_size == 64
+
+    chunks = []
+    run_batch = cls._run_batch
+
+    def recording_run_batch(x):
+        chunks.append(x.shape[0])
+        return run_batch(x)
+
+    monkeypatch.setattr(cls, "_run_batch", recording_run_batch)
+    lm = frames(150)
+    labels, probs = cls.predict_batch(lm)
+
+    assert profiled == [(2, False), (3, True)]
+    assert chunks == [64, 64, 22]
+    assert cls._batch_capacity == 64
+
+    # Setting interpreter tidak mengubah hasil
+    plain = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank", use_profile=False)
+    np.testing.assert_allclose(probs, plain.predict_batch(lm)[1], atol=1e-5)
+
+
+def test_explicit_num_threads_overrides_profile(profiled):
+    cls = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank", num_threads=1)
+    cls.predict_batch(frames(8))
+    # num_threads eksplisit menang untuk interpreter realtime dan batch; XNNPACK tetap dari profil
+    assert profiled == [(1, False), (1, True)]
+    assert cls.max_batch_size == 64
+
+
+def test_without_profile_uses_runtime_defaults(profiled):
+    cls = TFLitePoseClassifier(PLANK_TFLITE, PLANK_META, "plank", use_profile=False)
+    cls.predict_batch(frames(8))
+    assert profiled == [(None, True), (None, True)]
+    assert cls.max_batch_size == TFLitePoseClassifier.MAX_BATCH_SIZE
@@ -0,0 +1,55 @@
+"""LatestFrameCapture: read() memberi frame terbaru, frame yang tertimpa dihitung dropped, umur frame ke telemetry."""
+
+import time
+
+import numpy as np
+
+from latest_frame_capture import LatestFrameCapture
+from telemetry import FrameTelemetry
+
+
+class FakeCamera:
+    """Kamera palsu: frame berisi nomor urut, berhenti setelah n frame."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.i = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.i >= self.n:
+            time.sleep(0.01)
+            return False, None
+        self.i += 1
+        return True, np.full((2, 2, 3), self.i, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+def test_read_returns_latest_frame_and_counts_drops():
+    telemetry = FrameTelemetry()
+    cam = FakeCamera(5)
+    cap = LatestFrameCapture(cam, telemetry=telemetry)
+    cap._thread.join(timeout=2.0)
+
+    ret, frame = cap.read()
+    assert ret and int(frame[0, 0, 0]) == 5
+    assert cap.captured == 5 and cap.dropped == 4
+    assert telemetry.dropped == 4
+    # Kamera selesai, slot kosong -> tidak menunggu sampai timeout
+    assert cap.read() == (False, None)
+
+    age = telemetry.snapshot()["stages"]["frame_age"]
+    assert age["count"] == 1 and age["p50_ms"] >= 0.0
+    cap.release()
+
+
+def test_each_frame_is_returned_once():
+    cap = LatestFrameCapture(FakeCamera(1))
+    ret, frame = cap.read()
+    assert ret and int(frame[0, 0, 0]) == 1
+    assert cap.read() == (False, None)
+    cap.release()
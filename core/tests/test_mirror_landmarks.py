@@ -0,0 +1,80 @@
+"""
+mirror_landmarks() harus memberi landmark yang sama dengan pose di frame
+cv2.flip(frame, 1): x -> 1 - x dan titik kiri / kanan bertukar index.
+"""
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import (
+    MIRROR_INDEX,
+    NUM_LANDMARKS,
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TFLITE,
+    TFLitePoseClassifier,
+    mirror_landmarks,
+)
+
+# Pasangan kiri / kanan MediaPipe Pose (index dari dokumentasi, bukan dari enum)
+LEFT_RIGHT_PAIRS = [
+    (1, 4), (2, 5), (3, 6), (7, 8), (9, 10), (11, 12), (13, 14), (15, 16),
+    (17, 18), (19, 20), (21, 22), (23, 24), (25, 26), (27, 28), (29, 30), (31, 32),
+]
+
+
+def flipped_frame_landmarks(lm: np.ndarray) -> np.ndarray:
+    """
+    Landmark yang dilaporkan pose untuk frame yang di-flip horizontal: titik
+    yang di frame asli adalah RIGHT_x terlihat sebagai LEFT_x di posisi 1 - x.
+    """
+    out = lm.copy()
+    for left, right in LEFT_RIGHT_PAIRS:
+        out[..., left, :] = lm[..., right, :]
+        out[..., right, :] = lm[..., left, :]
+    out[..., 0] = 1.0 - out[..., 0]
+    return out
+
+
+@pytest.fixture(scope="module")
+def frames() -> np.ndarray:
+    rng = np.random.default_rng(18)
+    lm = rng.uniform(0.05, 0.95, size=(64, NUM_LANDMARKS, 4)).astype(np.float32)
+    lm[..., 2] = rng.normal(0.0, 0.3, size=lm.shape[:2])
+    return lm
+
+
+def test_mirror_index_swaps_left_and_right():
+    expected = np.arange(NUM_LANDMARKS)
+    for left, right in LEFT_RIGHT_PAIRS:
+        expected[left], expected[right] = right, left
+    assert np.array_equal(MIRROR_INDEX, expected)
+
+
+def test_mirror_matches_flipped_frame(frames):
+    for lm in frames:
+        np.testing.assert_array_equal(mirror_landmarks(lm), flipped_frame_landmarks(lm))
+    # Versi batch (N, 33, 4) sama dengan per frame
+    np.testing.assert_array_equal(mirror_landmarks(frames), flipped_frame_landmarks(frames))
+
+
+def test_mirror_does_not_modify_input(frames):
+    before = frames.copy()
+    mirror_landmarks(frames)
+    np.testing.assert_array_equal(frames, before)
+
+
+@pytest.mark.parametrize(
+    "tflite_path, meta_path, exercise_name",
+    [(SQUAT_TFLITE, SQUAT_META, "squat"), (PLANK_TFLITE, PLANK_META, "plank")],
+)
+def test_features_match_flipped_frame(frames, tflite_path, meta_path, exercise_name):
+    if not tflite_path.exists():
+        pytest.skip(f"{tflite_path.name} tidak ada")
+    cls = TFLitePoseClassifier(tflite_path, meta_path, exercise_name, use_profile=False)
+    for lm in frames:
+        mirrored = cls._build_feature_vector(mirror_landmarks(lm))
+        flipped = cls._build_feature_vector(flipped_frame_landmarks(lm))
+        assert mirrored is not None
+        np.testing.assert_array_equal(mirrored, flipped)
@@ -0,0 +1,73 @@
+"""multi_camera.stream_worker: selalu kirim "done" ke supervisor, juga saat model / source / pose gagal."""
+
+import queue
+import threading
+
+import pytest
+
+import multi_camera
+import realtime_plank_squat_tflite
+
+
+def drain(q: queue.Queue) -> list:
+    messages = []
+    while True:
+        try:
+            messages.append(q.get_nowait())
+        except queue.Empty:
+            return messages
+
+
+def run_worker(source: str) -> queue.Queue:
+    result_queue = queue.Queue()
+    multi_camera.stream_worker("stream0", source, "squat", True, 0, 1, result_queue, threading.Event())
+    return result_queue
+
+
+def test_unopenable_source_reports_failed_done(tmp_path):
+    messages = drain(run_worker(str(tmp_path / "tidak_ada.mp4")))
+
+    assert [kind for kind, _, _ in messages] == ["error", "done"]
+    summary = messages[-1][2]
+    assert summary["status"] == "failed"
+    assert summary["frames"] == 0
+
+
+def test_worker_exception_reports_failed_done(tmp_path, monkeypatch):
+    import cv2
+    import numpy as np
+
+    video = tmp_path / "v.avi"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for _ in range(3):
+        writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    writer.release()
+
+    def broken_pose(*args, **kwargs):
+        raise RuntimeError("pose graph gagal")
+
+    monkeypatch.setattr(realtime_plank_squat_tflite, "create_pose", broken_pose)
+    result_queue = queue.Queue()
+    with pytest.raises(RuntimeError):
+        multi_camera.stream_worker("stream0", str(video), "squat", True, 0, 1, result_queue, threading.Event())
+
+    messages = drain(result_queue)
+    assert [kind for kind, _, _ in messages] == ["error", "done"]
+    assert "pose graph gagal" in messages[0][2]
+    assert messages[-1][2]["status"] == "failed"
+
+
+def test_model_load_error_reports_failed_done(tmp_path, monkeypatch):
+    def missing_model(*args, **kwargs):
+        raise FileNotFoundError("squat_stage_mlp.tflite")
+
+    monkeypatch.setattr(realtime_plank_squat_tflite, "classifier_loader", missing_model)
+    result_queue = queue.Queue()
+    with pytest.raises(FileNotFoundError):
+        multi_camera.stream_worker("stream0", str(tmp_path / "v.mp4"), "squat", True, 0, 1, result_queue, threading.Event())
+
+    messages = drain(result_queue)
+    assert [kind for kind, _, _ in messages] == ["error", "done"]
+    assert "squat_stage_mlp.tflite" in messages[0][2]
+    assert messages[-1][2]["status"] == "failed"
+    assert messages[-1][2]["frames"] == 0
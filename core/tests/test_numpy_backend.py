@@ -0,0 +1,71 @@
+"""Parity backend numpy (NumpyMLPInterpreter) vs TFLite float untuk model squat yang di-commit."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from realtime_plank_squat_tflite import (
+    SQUAT_META,
+    SQUAT_TFLITE,
+    NumpyMLPInterpreter,
+    create_interpreter,
+    mlp_weights_path,
+    tflite_variant_path,
+)
+
+# Sama-sama float32, beda urutan operasi saja
+ATOL = 1e-5
+# Jumlah baris yang juga dicek lewat jalur 1 frame (batch 1)
+N_SINGLE = 200
+
+FLOAT_TFLITE = tflite_variant_path(SQUAT_TFLITE, "float")
+SQUAT_CSV = SQUAT_TFLITE.parent.parent / "train.csv"
+
+pytestmark = pytest.mark.skipif(
+    not (FLOAT_TFLITE.exists() and SQUAT_CSV.exists()),
+    reason="squat_stage_mlp_float.tflite / squat train.csv tidak ada",
+)
+
+
+@pytest.fixture(scope="module")
+def features() -> np.ndarray:
+    with open(SQUAT_META, "r", encoding="utf-8") as f:
+        columns = json.load(f)["feature_columns"]
+    return pd.read_csv(SQUAT_CSV)[columns].to_numpy(dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def reference(features) -> np.ndarray:
+    interp = create_interpreter(FLOAT_TFLITE, num_threads=1)
+    inp = interp.get_input_details()[0]
+    out = interp.get_output_details()[0]
+    interp.resize_tensor_input(inp["index"], list(features.shape))
+    interp.allocate_tensors()
+    interp.set_tensor(inp["index"], features)
+    interp.invoke()
+    return interp.get_tensor(out["index"])
+
+
+def test_batch_matches_float_tflite(features, reference):
+    backend = NumpyMLPInterpreter(mlp_weights_path(SQUAT_TFLITE))
+    backend.resize_tensor_input(backend.INPUT_INDEX, list(features.shape))
+    backend.allocate_tensors()
+    backend.set_tensor(backend.INPUT_INDEX, features)
+    backend.invoke()
+    probs = backend.get_tensor(backend.OUTPUT_INDEX)
+
+    np.testing.assert_allclose(probs, reference, rtol=0, atol=ATOL)
+    assert np.array_equal(probs.argmax(axis=1), reference.argmax(axis=1))
+
+
+def test_single_frame_matches_float_tflite(features, reference):
+    backend = NumpyMLPInterpreter(mlp_weights_path(SQUAT_TFLITE))
+    backend.allocate_tensors()
+    for i in range(min(N_SINGLE, len(features))):
+        backend.set_tensor(backend.INPUT_INDEX, features[i:i + 1])
+        backend.invoke()
+        np.testing.assert_allclose(
+            backend.get_tensor(backend.OUTPUT_INDEX)[0], reference[i], rtol=0, atol=ATOL
+        )
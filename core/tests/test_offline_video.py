@@ -0,0 +1,140 @@
+"""offline_video.score_video: klasifikasi per batch == per frame, dan decoder error tidak membuat hang."""
+
+import json
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import offline_video
+from realtime_plank_squat_tflite import (
+    NUM_LANDMARKS,
+    PLANK_META,
+    PLANK_TFLITE,
+    SQUAT_META,
+    SQUAT_TFLITE,
+    ExerciseAnalyzer,
+    array_to_landmarks,
+    classifier_loader,
+    load_squat_thresholds,
+    mirror_landmarks,
+)
+
+
+class FakeCapture:
+    """cv2.VideoCapture palsu: n frame hitam, opsional error setelah fail_after frame."""
+
+    def __init__(self, n: int, fail_after: int = None):
+        self.n = n
+        self.fail_after = fail_after
+        self.pos = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.fail_after is not None and self.pos >= self.fail_after:
+            raise OSError("decoder rusak")
+        if self.pos >= self.n:
+            return False, None
+        self.pos += 1
+        return True, np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def get(self, prop):
+        return self.pos * 33.3
+
+    def release(self):
+        pass
+
+
+class FakePose:
+    """Pose palsu: landmark dari urutan yang sudah ditentukan (None = tidak terdeteksi)."""
+
+    def __init__(self, landmarks):
+        self.landmarks = iter(landmarks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def process(self, image):
+        lm = next(self.landmarks)
+        return SimpleNamespace(pose_landmarks=None if lm is None else array_to_landmarks(lm))
+
+
+def sequence(n: int) -> list:
+    rng = np.random.default_rng(2)
+    frames = list(rng.uniform(0.1, 0.9, size=(n, NUM_LANDMARKS, 4)).astype(np.float32))
+    for i in range(0, n, 7):
+        frames[i] = None
+    return frames
+
+
+def make_analyzer() -> ExerciseAnalyzer:
+    return ExerciseAnalyzer(
+        classifier_loader(PLANK_TFLITE, PLANK_META, "plank", use_profile=False),
+        classifier_loader(SQUAT_TFLITE, SQUAT_META, "squat_stage", use_profile=False),
+        load_squat_thresholds(),
+    )
+
+
+def run_in_thread(fn, timeout: float = 30.0):
+    """Jalankan fn di thread; gagal kalau tidak selesai (hang) dalam timeout."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = fn()
+        except BaseException as exc:  # dilaporkan ke thread test
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "score_video hang"
+    return outcome
+
+
+@pytest.mark.parametrize("mode", ["squat", "plank"])
+def test_batched_scoring_matches_per_frame(tmp_path, monkeypatch, mode):
+    n = 45
+    landmarks = sequence(n)
+    monkeypatch.setattr(offline_video.cv2, "VideoCapture", lambda path: FakeCapture(n))
+    monkeypatch.setattr(offline_video, "create_pose", lambda *a, **k: FakePose(landmarks))
+
+    analyzer = make_analyzer()
+    label_mapping = (analyzer.plank_cls if mode == "plank" else analyzer.squat_cls).label_mapping
+    out = tmp_path / "out.jsonl"
+    writer = offline_video.ResultWriter(out, list(label_mapping.values()))
+    summary = offline_video.score_video(tmp_path / "v.mp4", analyzer, mode, writer, batch_size=16)
+    writer.close()
+
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    single = make_analyzer()
+    expected = [single.analyze(mirror_landmarks(lm), mode) for lm in landmarks]
+    assert summary["frames"] == n and len(records) == n
+    assert [r["frame"] for r in records] == list(range(n))
+    assert [r["label"] for r in records] == [e["label"] for e in expected]
+    assert [r["squat_count"] for r in records] == [e["squat_count"] for e in expected]
+    assert [r["feet_status"] for r in records] == [e["feet_status"] for e in expected]
+    assert summary["squat_count"] == expected[-1]["squat_count"]
+
+
+def test_decoder_error_is_raised_instead_of_hanging(tmp_path, monkeypatch):
+    landmarks = sequence(10)
+    monkeypatch.setattr(offline_video.cv2, "VideoCapture", lambda path: FakeCapture(10, fail_after=5))
+    monkeypatch.setattr(offline_video, "create_pose", lambda *a, **k: FakePose(landmarks))
+
+    analyzer = make_analyzer()
+    out = tmp_path / "out.jsonl"
+    writer = offline_video.ResultWriter(out, ["down", "up"])
+    outcome = run_in_thread(lambda: offline_video.score_video(tmp_path / "v.mp4", analyzer, "squat", writer))
+    writer.close()
+
+    assert isinstance(outcome.get("error"), RuntimeError)
+    assert isinstance(outcome["error"].__cause__, OSError)
+    # Frame sebelum error tetap ditulis
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 5
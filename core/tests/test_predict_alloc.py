@@ -0,0 +1,90 @@
+"""
+predict() steady state: fitur ditulis langsung ke buffer input interpreter
+yang sudah dialokasi, jadi tidak ada buffer fitur baru per frame.
+
+Model MLP asli cuma ~36 fitur (buffer ~250 byte, setara noise alokasi
+lain per predict), jadi dipakai model sintetis dengan WIDE_FEATURES fitur:
+buffer fitur 16 KB, jauh di atas semua alokasi kecil lain dalam 1 predict().
+"""
+
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import (
+    NUM_LANDMARKS,
+    PLANK_META,
+    SQUAT_META,
+    TFLitePoseClassifier,
+)
+
+WIDE_FEATURES = 4096
+FEATURE_BYTES = WIDE_FEATURES * 4
+WARMUP = 20
+FRAMES = 300
+
+
+def write_wide_model(model_dir, base_meta, backend: str):
+    """meta.json (kolom base_meta diulang sampai WIDE_FEATURES) + .npz / .tflite Dense (F, 2)."""
+    with open(base_meta, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    columns = base["feature_columns"]
+    columns = (columns * (WIDE_FEATURES // len(columns) + 1))[:WIDE_FEATURES]
+    meta_path = model_dir / "meta.json"
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"feature_columns": columns, "label_mapping": base["label_mapping"]}, f)
+
+    rng = np.random.default_rng(6)
+    kernel = rng.normal(0.0, 0.05, size=(WIDE_FEATURES, 2)).astype(np.float32)
+    bias = np.zeros(2, dtype=np.float32)
+    tflite_path = model_dir / "wide_mlp.tflite"
+    if backend == "numpy":
+        np.savez(
+            tflite_path.with_suffix(".npz"),
+            num_layers=np.array(1), kernel_0=kernel, bias_0=bias, activation_0=np.array("softmax"),
+        )
+    else:
+        tf = pytest.importorskip("tensorflow")
+        inputs = tf.keras.Input(shape=(WIDE_FEATURES,))
+        dense = tf.keras.layers.Dense(2, activation="softmax")
+        model = tf.keras.Model(inputs, dense(inputs))
+        dense.set_weights([kernel, bias])
+        tflite_path.write_bytes(tf.lite.TFLiteConverter.from_keras_model(model).convert())
+    return tflite_path, meta_path
+
+
+@pytest.fixture(scope="module")
+def frames() -> np.ndarray:
+    rng = np.random.default_rng(6)
+    return rng.uniform(0.05, 0.95, size=(64, NUM_LANDMARKS, 4)).astype(np.float32)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "tflite"])
+@pytest.mark.parametrize("exercise_name, base_meta", [("squat", SQUAT_META), ("plank", PLANK_META)])
+def test_predict_allocates_no_feature_buffers(tmp_path, frames, exercise_name, base_meta, backend):
+    tflite_path, meta_path = write_wide_model(tmp_path, base_meta, backend)
+    cls = TFLitePoseClassifier(tflite_path, meta_path, exercise_name, use_profile=False, backend=backend)
+    for i in range(WARMUP):
+        cls.predict(frames[i % len(frames)])
+
+    worst = 0
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for i in range(FRAMES):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            label, _, _ = cls.predict(frames[i % len(frames)])
+            _, peak = tracemalloc.get_traced_memory()
+            worst = max(worst, peak - before)
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert label is not None
+    # Puncak alokasi 1 predict() jauh di bawah 1 buffer fitur
+    assert worst < FEATURE_BYTES // 4, f"predict() mengalokasi {worst} byte (buffer fitur {FEATURE_BYTES})"
+    # Tidak ada yang tertahan antar frame
+    assert end - start < FEATURE_BYTES // 4, f"{end - start} byte tertahan setelah {FRAMES} frame"
@@ -0,0 +1,147 @@
+"""QualityGovernor: turun saat overload, hysteresis (tanpa flapping), patience + backoff untuk naik, clamp low / max."""
+
+import numpy as np
+import pytest
+
+from quality_governor import (
+    COOLDOWN_FRAMES,
+    EVAL_WINDOW,
+    UPGRADE_HEADROOM,
+    UPGRADE_PATIENCE,
+    GovernedPose,
+    QualityGovernor,
+)
+
+BUDGET_MS = 100.0
+# Latency per frame (detik): di atas budget, di band tengah, dan jauh di bawah headroom
+OVER = 0.150
+UNDER_BAND = 0.080
+HEADROOM = BUDGET_MS / 1000.0 * UPGRADE_HEADROOM * 0.5
+
+
+def feed(gov: QualityGovernor, latencies) -> list:
+    """Masukkan latency per frame, return nama level setiap kali berubah."""
+    changed = []
+    for latency in latencies:
+        new = gov.update(latency)
+        if new is not None:
+            changed.append(new.name)
+    return changed
+
+
+def windows(latency: float, n: int) -> list:
+    return [latency] * (EVAL_WINDOW * n)
+
+
+def test_sustained_overload_steps_down_and_clamps_at_low():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    assert gov.level.name == "default"
+
+    # 1 window penuh -> turun 1 level, lalu cooldown sebelum evaluasi lagi
+    assert feed(gov, windows(OVER, 1)) == ["medium"]
+    assert feed(gov, [OVER] * COOLDOWN_FRAMES) == []
+    assert feed(gov, windows(OVER, 1)) == ["low"]
+
+    # Sudah di level paling ringan: tetap di sana
+    assert feed(gov, [OVER] * (COOLDOWN_FRAMES + EVAL_WINDOW * 10)) == []
+    assert gov.level.name == "low"
+    assert [c["reason"] for c in gov.changes] == ["over budget", "over budget"]
+
+
+def test_latency_hovering_below_budget_never_changes_level():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    rng = np.random.default_rng(0)
+    # Di antara budget * headroom dan budget: tidak turun, tidak juga naik
+    latencies = rng.uniform(BUDGET_MS / 1000.0 * UPGRADE_HEADROOM * 1.01, BUDGET_MS / 1000.0 * 0.99, 3000)
+    assert feed(gov, latencies) == []
+    assert gov.level.name == "default"
+
+
+def test_no_flapping_around_threshold():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    # Window bergantian sedikit di atas / sedikit di bawah budget
+    latencies = []
+    for i in range(20):
+        latencies += windows(0.102 if i % 2 == 0 else 0.098, 1) + [0.1] * COOLDOWN_FRAMES
+    changed = feed(gov, latencies)
+    # Hanya turun (over budget), tidak pernah naik lagi karena 0.098 bukan headroom
+    assert changed == ["medium", "low"]
+    assert all(c["reason"] == "over budget" for c in gov.changes)
+
+
+def test_step_up_only_after_patience_window():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    assert feed(gov, windows(HEADROOM, UPGRADE_PATIENCE - 1)) == []
+    # Window di band tengah me-reset hitungan headroom
+    assert feed(gov, windows(UNDER_BAND, 1)) == []
+    assert feed(gov, windows(HEADROOM, UPGRADE_PATIENCE - 1)) == []
+    assert feed(gov, windows(HEADROOM, 1)) == ["high"]
+    assert gov.changes[-1]["reason"] == "headroom"
+
+
+def test_failed_level_doubles_upgrade_patience():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    assert feed(gov, windows(HEADROOM, UPGRADE_PATIENCE)) == ["high"]
+    feed(gov, [HEADROOM] * COOLDOWN_FRAMES)
+    # "high" gagal -> turun lagi ke default
+    assert feed(gov, windows(OVER, 1)) == ["default"]
+    feed(gov, [HEADROOM] * COOLDOWN_FRAMES)
+
+    # Naik ke "high" sekarang butuh 2x patience
+    assert feed(gov, windows(HEADROOM, 2 * UPGRADE_PATIENCE - 1)) == []
+    assert feed(gov, windows(HEADROOM, 1)) == ["high"]
+
+
+def test_clamps_at_max():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS, start_level="max")
+    assert feed(gov, windows(HEADROOM, UPGRADE_PATIENCE * 10)) == []
+    assert gov.level.name == "max"
+
+
+def test_budget_from_target_fps_and_invalid_args():
+    assert QualityGovernor(target_fps=20).budget == pytest.approx(0.05)
+    with pytest.raises(ValueError):
+        QualityGovernor()
+    with pytest.raises(ValueError):
+        QualityGovernor(target_fps=20, start_level="ultra")
+
+
+class FakePose:
+    def __init__(self, model_complexity: int):
+        self.model_complexity = model_complexity
+        self.closed = False
+        self.sizes = []
+
+    def process(self, image):
+        self.sizes.append(image.shape[:2])
+
+    def close(self):
+        self.closed = True
+
+
+def test_governed_pose_resizes_and_rebuilds_only_on_complexity_change():
+    gov = QualityGovernor(latency_budget_ms=BUDGET_MS)
+    created = []
+
+    def factory(model_complexity):
+        created.append(FakePose(model_complexity))
+        return created[-1]
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    with GovernedPose(gov, factory) as pose:
+        # default -> medium: input diperkecil, model_complexity sama -> graph tetap
+        for latency in windows(OVER, 1):
+            pose.process(frame)
+            pose.report(latency)
+        pose.process(frame)
+        assert len(created) == 1
+        assert created[0].sizes[-1] == (360, 480)
+
+        # medium -> default (pernah gagal: 2x patience) -> high: model_complexity 0 -> 1 -> graph baru
+        frames = 2 * COOLDOWN_FRAMES + EVAL_WINDOW * (2 * UPGRADE_PATIENCE + UPGRADE_PATIENCE)
+        for latency in [HEADROOM] * frames:
+            pose.report(latency)
+        assert gov.level.name == "high"
+        assert [p.model_complexity for p in created] == [0, 1]
+        assert created[0].closed
+    assert created[1].closed
@@ -0,0 +1,31 @@
+"""parse_args realtime: kombinasi flag yang tidak valid / model yang belum ada -> error CLI, bukan traceback."""
+
+import pytest
+
+import realtime_plank_squat_tflite as rt
+
+
+def test_fused_without_model_is_cli_error(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(rt, "FUSED_TFLITE", rt.THIS_DIR / "fused_model" / "model" / "tidak_ada.tflite")
+    with pytest.raises(SystemExit) as exc:
+        rt.parse_args(["--fused"])
+    assert exc.value.code == 2
+    err = capsys.readouterr().err
+    assert "tidak_ada.tflite" in err
+    assert "train_plank_squat_models.py --only fused" in err
+
+
+def test_fused_with_model_parses(tmp_path, monkeypatch):
+    tflite, meta = tmp_path / "fused.tflite", tmp_path / "meta.json"
+    tflite.write_bytes(b"")
+    meta.write_text("{}", encoding="utf-8")
+    monkeypatch.setattr(rt, "THIS_DIR", tmp_path)
+    monkeypatch.setattr(rt, "FUSED_TFLITE", tflite)
+    monkeypatch.setattr(rt, "FUSED_META", meta)
+    assert rt.parse_args(["--fused"]).fused
+
+
+def test_numpy_backend_rejects_fused(capsys):
+    with pytest.raises(SystemExit):
+        rt.parse_args(["--backend", "numpy", "--fused"])
+    assert "--backend numpy" in capsys.readouterr().err
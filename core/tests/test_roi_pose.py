@@ -0,0 +1,156 @@
+"""RoiPose: landmark crop -> full frame, hysteresis ROI, dan fallback ke full frame saat pose hilang."""
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import (
+    BODY_IDX,
+    LM_VIS,
+    LM_X,
+    LM_Y,
+    LM_Z,
+    NUM_LANDMARKS,
+    array_to_landmarks,
+    landmarks_to_array,
+)
+from roi_pose import RoiPose
+
+W, H = 320, 240
+
+
+def make_frame() -> np.ndarray:
+    """Frame yang setiap pixel-nya menyimpan koordinatnya: (x // 2, y, x % 2)."""
+    ys, xs = np.mgrid[0:H, 0:W]
+    return np.stack([xs // 2, ys, xs % 2], axis=-1).astype(np.uint8)
+
+
+class FakePose:
+    """
+    Pose palsu: "mendeteksi" landmark truth (normalized full frame) di image
+    apa pun yang diberikan. Offset crop dibaca dari pixel kiri atas, jadi
+    landmark yang dikembalikan sudah dalam koordinat normalized crop.
+    """
+
+    def __init__(self, truth: np.ndarray):
+        self.truth = truth
+        self.lost = False
+        self.calls = []
+
+    def process(self, image):
+        from types import SimpleNamespace
+
+        ch, cw = image.shape[:2]
+        x0 = int(image[0, 0, 0]) * 2 + int(image[0, 0, 2])
+        y0 = int(image[0, 0, 1])
+        self.calls.append((x0, y0, cw, ch))
+        if self.lost:
+            return SimpleNamespace(pose_landmarks=None)
+        lm = self.truth.copy()
+        lm[:, LM_X] = (self.truth[:, LM_X] * W - x0) / cw
+        lm[:, LM_Y] = (self.truth[:, LM_Y] * H - y0) / ch
+        lm[:, LM_Z] = self.truth[:, LM_Z] * W / cw
+        return SimpleNamespace(pose_landmarks=array_to_landmarks(lm))
+
+    def close(self):
+        pass
+
+
+def make_truth(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    lm = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    lm[:, LM_X] = rng.uniform(0.40, 0.60, NUM_LANDMARKS)
+    lm[:, LM_Y] = rng.uniform(0.30, 0.80, NUM_LANDMARKS)
+    lm[:, LM_Z] = rng.uniform(-0.2, 0.2, NUM_LANDMARKS)
+    lm[:, LM_VIS] = 0.9
+    return lm
+
+
+@pytest.fixture
+def roi_pose():
+    truth = make_truth()
+    poses = iter([FakePose(truth), FakePose(truth)])
+    pose = RoiPose(lambda: next(poses))
+    return pose, truth
+
+
+def test_crop_landmarks_map_back_to_full_frame(roi_pose):
+    pose, truth = roi_pose
+    frame = make_frame()
+
+    first = landmarks_to_array(pose.process(frame).pose_landmarks)
+    assert pose.roi is None and pose.full_frames == 1
+    np.testing.assert_allclose(first, truth, atol=1e-6)
+
+    second = landmarks_to_array(pose.process(frame).pose_landmarks)
+    assert pose.roi is not None and pose.roi_frames == 1
+    x0, y0, x1, y1 = pose.roi
+    assert pose.crop_pose.calls[-1] == (x0, y0, x1 - x0, y1 - y0)
+    assert (x1 - x0) * (y1 - y0) < W * H
+    np.testing.assert_allclose(second[:, [LM_X, LM_Y, LM_Z]], truth[:, [LM_X, LM_Y, LM_Z]], atol=1e-5)
+    np.testing.assert_allclose(second[:, LM_VIS], truth[:, LM_VIS], atol=1e-6)
+
+
+def test_roi_is_kept_while_body_stays_inside(roi_pose):
+    pose, _ = roi_pose
+    frame = make_frame()
+    pose.process(frame)
+    pose.process(frame)
+    roi = pose.roi
+    for _ in range(5):
+        pose.process(frame)
+    assert pose.roi == roi
+    assert pose.roi_frames == 6 and pose.fallbacks == 0
+
+
+@pytest.mark.parametrize("failure", ["lost", "low_visibility"])
+def test_falls_back_to_full_frame_when_crop_loses_pose(roi_pose, failure):
+    pose, truth = roi_pose
+    frame = make_frame()
+    pose.process(frame)
+    pose.process(frame)
+    assert pose.roi is not None
+
+    if failure == "lost":
+        pose.crop_pose.lost = True
+    else:
+        pose.crop_pose.truth = truth.copy()
+        pose.crop_pose.truth[BODY_IDX, LM_VIS] = 0.1
+    full_calls = len(pose.full_pose.calls)
+
+    result = landmarks_to_array(pose.process(frame).pose_landmarks)
+    # Frame yang sama diproses ulang di full frame, ROI di-reset
+    assert len(pose.full_pose.calls) == full_calls + 1
+    assert pose.full_pose.calls[-1] == (0, 0, W, H)
+    assert pose.roi is None and pose.fallbacks == 1
+    np.testing.assert_allclose(result, truth, atol=1e-6)
+
+    # Full frame yakin -> frame berikutnya kembali ke crop
+    pose.crop_pose.lost = False
+    pose.crop_pose.truth = truth
+    pose.process(frame)
+    assert pose.roi is not None and pose.roi_frames == 2
+
+
+def test_full_frame_miss_resets_roi(roi_pose):
+    pose, _ = roi_pose
+    frame = make_frame()
+    pose.process(frame)
+    pose.process(frame)
+    pose.crop_pose.lost = True
+    pose.full_pose.lost = True
+
+    assert pose.process(frame).pose_landmarks is None
+    assert pose.roi is None
+    # Tanpa landmark sebelumnya, frame berikutnya langsung full frame
+    crop_calls = len(pose.crop_pose.calls)
+    pose.process(frame)
+    assert len(pose.crop_pose.calls) == crop_calls
+
+
+def test_close_prints_stats(roi_pose, capsys):
+    pose, _ = roi_pose
+    frame = make_frame()
+    with pose:
+        pose.process(frame)
+        pose.process(frame)
+    assert "[RoiPose] ROI 1 full 1 fallback 0" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+"""FrameTelemetry: persentil rolling window, total kumulatif, dan format teks Prometheus."""
+
+import numpy as np
+import pytest
+
+from telemetry import FrameTelemetry
+
+
+def parse_metrics(text: str) -> dict:
+    """Baris sampel Prometheus -> {nama{label}: float}, komentar dilewati."""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def test_snapshot_percentiles_over_window():
+    telemetry = FrameTelemetry(window=100)
+    values_ms = np.arange(1, 101, dtype=np.float64)
+    for v in values_ms:
+        telemetry.record("pose", v / 1000.0)
+
+    st = telemetry.snapshot()["stages"]["pose"]
+    assert st["count"] == 100
+    assert st["mean_ms"] == pytest.approx(50.5)
+    for q in (50, 95, 99):
+        assert st[f"p{q}_ms"] == pytest.approx(np.percentile(values_ms, q), abs=1e-3)
+    # Stage tanpa sampel tidak muncul
+    assert "invoke" not in telemetry.snapshot()["stages"]
+
+
+def test_window_rolls_but_totals_keep_growing():
+    telemetry = FrameTelemetry(window=10)
+    for _ in range(25):
+        telemetry.record("invoke", 0.002)
+    for _ in range(5):
+        telemetry.record("invoke", 0.010)
+
+    st = telemetry.snapshot()["stages"]["invoke"]
+    # Window hanya 10 sampel terakhir: 5x 2 ms + 5x 10 ms
+    assert st["count"] == 10
+    assert st["mean_ms"] == pytest.approx(6.0)
+    assert st["total_count"] == 30
+    assert st["total_s"] == pytest.approx(25 * 0.002 + 5 * 0.010)
+
+
+def test_prometheus_text_summary_format():
+    telemetry = FrameTelemetry(window=4)
+    for _ in range(3):
+        telemetry.frame_done()
+    telemetry.add_dropped(2)
+
+    counts = []
+    for i in range(10):
+        telemetry.record("pose", 0.01)
+        text = telemetry.prometheus_text()
+        samples = parse_metrics(text)
+        counts.append(samples['autoreps_stage_latency_seconds_count{stage="pose"}'])
+
+    assert "# TYPE autoreps_stage_latency_seconds summary" in text
+    assert "# TYPE autoreps_frames_total counter" in text
+    # _count kumulatif: naik terus walau window cuma 4 sampel
+    assert counts == list(range(1, 11))
+    assert samples['autoreps_stage_latency_seconds_sum{stage="pose"}'] == pytest.approx(0.1)
+    for q in ("0.5", "0.95", "0.99"):
+        assert samples[f'autoreps_stage_latency_seconds{{stage="pose",quantile="{q}"}}'] == pytest.approx(0.01)
+    assert samples["autoreps_frames_total"] == 3
+    assert samples["autoreps_dropped_frames_total"] == 2
+    assert text.endswith("\n")
@@ -0,0 +1,71 @@
+"""TemporalStageClassifier: predict_batch() == reset() + predict() per frame, plus motion gate."""
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import (
+    NUM_LANDMARKS,
+    SQUAT_TEMPORAL_META,
+    SQUAT_TEMPORAL_TFLITE,
+    TemporalStageClassifier,
+)
+
+pytestmark = pytest.mark.skipif(not SQUAT_TEMPORAL_TFLITE.exists(), reason="model temporal tidak ada")
+
+
+def random_walk(n: int, seed: int = 19) -> np.ndarray:
+    """n frame berurutan: landmark bergerak sedikit tiap frame."""
+    rng = np.random.default_rng(seed)
+    lm = np.empty((n, NUM_LANDMARKS, 4), dtype=np.float32)
+    lm[0] = rng.uniform(0.2, 0.8, size=(NUM_LANDMARKS, 4))
+    steps = rng.normal(0.0, 0.02, size=(n - 1, NUM_LANDMARKS, 4)).astype(np.float32)
+    lm[1:] = lm[0] + np.cumsum(steps, axis=0)
+    return lm
+
+
+@pytest.mark.parametrize("stride", [1, 3])
+def test_predict_batch_matches_sequential_predict(stride):
+    cls = TemporalStageClassifier(SQUAT_TEMPORAL_TFLITE, SQUAT_TEMPORAL_META, stride=stride, use_profile=False)
+    frames = random_walk(3 * cls.window + 5)
+
+    labels, probs = cls.predict_batch(frames)
+
+    cls.reset()
+    expected = [cls.predict(lm) for lm in frames]
+    assert list(labels) == [label for label, _, _ in expected]
+    np.testing.assert_allclose(probs, np.stack([p for _, _, p in expected]), rtol=0, atol=1e-5)
+    assert probs.shape == (len(frames), len(cls.label_mapping))
+
+
+def test_predict_batch_chunks_and_keeps_stream_state():
+    cls = TemporalStageClassifier(SQUAT_TEMPORAL_TFLITE, SQUAT_TEMPORAL_META, stride=1, use_profile=False)
+    frames = random_walk(40)
+    cls.predict(frames[0])
+    invokes = cls.invokes
+
+    full_labels, full_probs = cls.predict_batch(frames)
+    cls.max_batch_size = 8  # paksa beberapa chunk
+    cls._batch_capacity = 0
+    labels, probs = cls.predict_batch(frames)
+
+    assert list(labels) == list(full_labels)
+    np.testing.assert_allclose(probs, full_probs, rtol=0, atol=1e-6)
+    assert cls.invokes == invokes  # predict_batch tidak menyentuh ring buffer / counter
+    assert cls.predict_batch(frames[:0])[1].shape == (0, full_probs.shape[1])
+
+
+def test_gate_skips_invokes_for_static_pose():
+    cls = TemporalStageClassifier(
+        SQUAT_TEMPORAL_TFLITE, SQUAT_TEMPORAL_META, stride=1, gate_threshold=0.05, use_profile=False
+    )
+    static = np.repeat(random_walk(1), 30, axis=0)
+    results = [cls.predict(lm) for lm in static]
+
+    assert cls.invokes < len(static)
+    assert cls.gate_stats()["skipped"] == len(static) - cls.invokes
+    assert all(label == results[0][0] for label, _, _ in results)
+
+
+def test_numpy_backend_is_rejected():
+    with pytest.raises(ValueError):
+        TemporalStageClassifier(SQUAT_TEMPORAL_TFLITE, SQUAT_TEMPORAL_META, backend="numpy")
@@ -0,0 +1,41 @@
+"""TextSpriteCache.draw == draw_text_with_outline (selisih pembulatan), termasuk baris berangka."""
+
+import numpy as np
+import pytest
+
+from realtime_plank_squat_tflite import draw_text_with_outline
+from text_sprites import TextSpriteCache
+
+TEXTS = ["MODE: SQUAT", "FPS: 29.97", "COUNT: 11, up, 0.81", "1111.11"]
+
+
+@pytest.mark.parametrize("font_scale,thickness", [(0.5, 1), (0.7, 2), (0.8, 2)])
+@pytest.mark.parametrize("text", TEXTS)
+def test_draw_matches_put_text(text, font_scale, thickness):
+    background = np.random.default_rng(0).integers(0, 256, (80, 360, 3), dtype=np.uint8)
+    expected = background.copy()
+    draw_text_with_outline(expected, text, (10, 50), font_scale, (0, 255, 0), thickness)
+
+    cache = TextSpriteCache()
+    # 3x: gambar langsung / rasterize / hit cache
+    for _ in range(3):
+        frame = background.copy()
+        cache.draw(frame, text, (10, 50), font_scale, (0, 255, 0), thickness)
+        diff = np.abs(frame.astype(np.int16) - expected.astype(np.int16))
+        assert diff.max() <= 1
+
+    stats = cache.stats()
+    assert stats["sprites"] == 1 and stats["rasterized"] == 1
+    if any(c.isdigit() for c in text):
+        # Baris berangka: putText langsung dulu, sprite baru saat teks muncul lagi
+        assert stats["direct"] == 1 and stats["hits"] == 1
+    else:
+        assert stats["direct"] == 0 and stats["hits"] == 2
+
+
+def test_sprite_is_clipped_at_frame_edges():
+    cache = TextSpriteCache()
+    frame = np.zeros((20, 40, 3), dtype=np.uint8)
+    for org in [(-30, 10), (30, 5), (10, 40)]:
+        cache.draw(frame, "MODE: SQUAT", org, 0.7, (255, 255, 255))
+    assert frame.shape == (20, 40, 3)
@@ -0,0 +1,93 @@
+"""run_parallel: worker error jadi record "failed"; feature cache aman ditulis 2 proses sekaligus."""
+
+import json
+
+import numpy as np
+import pytest
+
+train = pytest.importorskip("train_plank_squat_models")
+
+
+def write_cache(path, num_samples: int):
+    path.mkdir(parents=True)
+    np.save(path / "X.npy", np.zeros((num_samples, 2), dtype=np.float32))
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"num_samples": num_samples}, f)
+
+
+def test_worker_exception_still_writes_summary(tmp_path, monkeypatch):
+    jobs_path = tmp_path / "jobs.json"
+    jobs_path.write_text(json.dumps([
+        {"name": "ok_job", "type": "squat_thresholds"},
+        {"name": "broken_job", "type": "squat_thresholds"},
+    ]), encoding="utf-8")
+
+    def fake_worker(job, threads, cores, log_dir, print_lock):
+        if job["name"] == "broken_job":
+            raise FileNotFoundError("python tidak ditemukan")
+        return {"name": job["name"], "status": "ok", "seconds": 0.1, "wall_seconds": 0.2}
+
+    monkeypatch.setattr(train, "_run_worker", fake_worker)
+    log_dir = tmp_path / "logs"
+    rc = train.main(["--jobs", str(jobs_path), "--parallel", "--workers", "2", "--log-dir", str(log_dir)])
+
+    assert rc == 1
+    with open(log_dir / "training_summary.json", "r", encoding="utf-8") as f:
+        jobs = {r["name"]: r for r in json.load(f)["jobs"]}
+    assert jobs["ok_job"]["status"] == "ok"
+    assert jobs["broken_job"]["status"] == "failed"
+    assert "python tidak ditemukan" in jobs["broken_job"]["error"]
+
+
+def test_publish_loser_keeps_winner_cache(tmp_path):
+    cache_dir = tmp_path / "squat-abc"
+    write_cache(cache_dir, 3)
+    tmp_dir = tmp_path / "squat-abc.tmp-1"
+    write_cache(tmp_dir, 5)
+
+    assert not train._publish_feature_cache(tmp_dir, cache_dir)
+    assert not tmp_dir.exists()
+    assert json.loads((cache_dir / "meta.json").read_text(encoding="utf-8"))["num_samples"] == 3
+
+
+@pytest.mark.parametrize("leftover", [[], ["X.npy"]])
+def test_publish_replaces_invalid_target(tmp_path, leftover):
+    cache_dir = tmp_path / "squat-abc"
+    cache_dir.mkdir()
+    for name in leftover:
+        (cache_dir / name).write_bytes(b"rusak")
+    tmp_dir = tmp_path / "squat-abc.tmp-1"
+    write_cache(tmp_dir, 5)
+
+    assert train._publish_feature_cache(tmp_dir, cache_dir)
+    assert not tmp_dir.exists()
+    assert json.loads((cache_dir / "meta.json").read_text(encoding="utf-8"))["num_samples"] == 5
+    assert np.load(cache_dir / "X.npy").shape == (5, 2)
+
+
+@pytest.mark.parametrize(
+    "cpus,workers_arg,expected",
+    [
+        (2, None, 2),   # default: jumlah job (4), maks jumlah CPU
+        (8, None, 4),   # default: jumlah job kalau CPU cukup
+        (2, 3, 3),      # --workers eksplisit tidak dibatasi CPU
+        (8, 16, 4),     # ... tapi tetap maks jumlah job
+    ],
+)
+def test_default_workers_capped_at_cpu_count(tmp_path, monkeypatch, cpus, workers_arg, expected):
+    jobs_path = tmp_path / "jobs.json"
+    jobs_path.write_text(json.dumps([{"name": f"job{i}", "type": "squat_thresholds"} for i in range(4)]), encoding="utf-8")
+    seen = {}
+
+    def fake_run_parallel(jobs, workers, threads, log_dir):
+        seen["workers"] = workers
+        return [{"name": job["name"], "status": "ok", "seconds": 0.0} for job in jobs]
+
+    monkeypatch.setattr(train.os, "cpu_count", lambda: cpus)
+    monkeypatch.setattr(train, "run_parallel", fake_run_parallel)
+    argv = ["--jobs", str(jobs_path), "--parallel", "--log-dir", str(tmp_path)]
+    if workers_arg is not None:
+        argv += ["--workers", str(workers_arg)]
+
+    assert train.main(argv) == 0
+    assert seen["workers"] == expected
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache sprite teks untuk overlay realtime.
+
+draw_text_with_outline() memanggil cv2.putText 2x (outline + isi, anti-alias)
+untuk setiap baris setiap frame, padahal sebagian besar teks ("MODE: SQUAT",
+"FEET: correct", ...) jarang berubah. TextSpriteCache me-rasterize setiap
+(teks, scale, warna, thickness) sekali jadi sprite yang sudah ber-outline,
+lalu tiap frame hanya blit sprite itu ke frame.
+
+- Sprite = faktor background k (0..255) + warna premultiplied, jadi blit
+  cuma frame * k / 255 + warna (2 operasi cv2 uint8). Outline dan isi
+  di-rasterize untuk seluruh string (2 pass putText, sama seperti
+  draw_text_with_outline), hasilnya beda maksimal 1 level per channel
+  karena pembulatan.
+- Baris yang teksnya sama dengan frame sebelumnya: 1 lookup + 1 blit.
+- Baris dengan angka (FPS, COUNT, prob) yang belum ada di cache langsung
+  digambar dengan 2x putText seperti draw_text_with_outline. Kalau teks yang
+  sama muncul lagi, baru di-rasterize jadi sprite utuh.
+  Sprite per glyph tidak dipakai: putText menaruh glyph di posisi
+  sub-pixel dan outline glyph berikutnya menutupi isi glyph sebelumnya
+  di pass yang sama, jadi gabungan sprite per glyph tidak bisa sama
+  dengan hasil putText.
+- Cache LRU (default 256 sprite), sprite paling lama tidak dipakai dibuang.
+
+Tidak thread-safe: pakai dari 1 thread (thread render / loop utama).
+"""
+
+import re
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+DEFAULT_CACHE_SIZE = 256
+
+_HAS_DIGIT_RE = re.compile(r"[0-9]")
+
+
+class TextSprite(NamedTuple):
+    k: np.ndarray      # (h, w, 3) uint8, sisa background (255 = transparan)
+    color: np.ndarray  # (h, w, 3) uint8, warna teks premultiplied
+    dx: int            # posisi kiri atas sprite relatif ke org putText
+    dy: int
+
+
+def rasterize_text(
+    text: str,
+    font_scale: float,
+    color: Tuple[int, int, int],
+    thickness: int = 2,
+) -> TextSprite:
+    """Render teks + outline hitam sekali (sama seperti draw_text_with_outline) jadi sprite."""
+    outline_thickness = thickness + 2
+    (tw, th), baseline = cv2.getTextSize(text, FONT, font_scale, outline_thickness)
+    pad = outline_thickness
+    h, w = th + baseline + 2 * pad, tw + 2 * pad
+    org = (pad, pad + th)
+
+    outline = np.zeros((h, w), dtype=np.uint8)
+    fill = np.zeros((h, w), dtype=np.uint8)
+    cv2.putText(outline, text, org, FONT, font_scale, 255, outline_thickness, cv2.LINE_AA)
+    cv2.putText(fill, text, org, FONT, font_scale, 255, thickness, cv2.LINE_AA)
+
+    # Outline hitam dulu lalu isi berwarna:
+    #   out = bg * (1 - a_outline) * (1 - a_fill) + color * a_fill
+    a_outline = outline.astype(np.float32) / 255.0
+    a_fill = fill.astype(np.float32) / 255.0
+    k = np.rint((1.0 - a_outline) * (1.0 - a_fill) * 255.0).astype(np.uint8)
+    premul = np.rint(a_fill[..., None] * np.asarray(color, dtype=np.float32)).astype(np.uint8)
+
+    # Potong ke area yang benar-benar tergambar
+    ys, xs = np.nonzero(k < 255)
+    if ys.size == 0:
+        return TextSprite(np.full((0, 0, 3), 255, np.uint8), np.zeros((0, 0, 3), np.uint8), 0, 0)
+    y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+    return TextSprite(
+        np.repeat(k[y0:y1, x0:x1, None], 3, axis=2),
+        np.ascontiguousarray(premul[y0:y1, x0:x1]),
+        int(x0) - org[0],
+        int(y0) - org[1],
+    )
+
+
+def _clip(sprite: TextSprite, org: Tuple[int, int], shape) -> Tuple[slice, slice, slice, slice]:
+    """(slice y / x di target, slice y / x di sprite), None kalau di luar target."""
+    th, tw = shape[:2]
+    sh, sw = sprite.k.shape[:2]
+    x0, y0 = org[0] + sprite.dx, org[1] + sprite.dy
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x0 + sw, tw), min(y0 + sh, th)
+    if cx0 >= cx1 or cy0 >= cy1:
+        return None
+    return slice(cy0, cy1), slice(cx0, cx1), slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0)
+
+
+def blit_sprite(frame: np.ndarray, sprite: TextSprite, org: Tuple[int, int]):
+    """Tempel sprite ke frame BGR uint8 (in-place), dipotong di tepi frame."""
+    clip = _clip(sprite, org, frame.shape)
+    if clip is None:
+        return
+    fy, fx, sy, sx = clip
+    roi = frame[fy, fx]
+    cv2.multiply(roi, sprite.k[sy, sx], dst=roi, scale=1.0 / 255.0)
+    cv2.add(roi, sprite.color[sy, sx], dst=roi)
+
+
+def put_text_outlined(
+    frame: np.ndarray,
+    text: str,
+    org: Tuple[int, int],
+    font_scale: float,
+    color: Tuple[int, int, int],
+    thickness: int = 2,
+):
+    """putText outline hitam lalu isi berwarna langsung ke frame (tanpa cache)."""
+    cv2.putText(frame, text, org, FONT, font_scale, (0, 0, 0), thickness + 2, cv2.LINE_AA)
+    cv2.putText(frame, text, org, FONT, font_scale, color, thickness, cv2.LINE_AA)
+
+
+class TextSpriteCache:
+    """LRU sprite teks. draw() pengganti draw_text_with_outline()."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._sprites: "OrderedDict[tuple, TextSprite]" = OrderedDict()
+        # Baris berangka yang baru dilihat 1x (belum dijadikan sprite utuh)
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()
+        self.hits = 0
+        self.rasterized = 0
+        self.direct = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def _lookup(self, key: tuple):
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+        return sprite
+
+    def _put(self, key: tuple, sprite: TextSprite):
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_size:
+            self._sprites.popitem(last=False)
+
+    def sprite(self, text: str, font_scale: float, color: Tuple[int, int, int], thickness: int = 2) -> TextSprite:
+        """Sprite 1 teks utuh (rasterize kalau belum ada di cache)."""
+        key = (text, font_scale, tuple(color), thickness)
+        sprite = self._lookup(key)
+        if sprite is None:
+            sprite = rasterize_text(text, font_scale, color, thickness)
+            self.rasterized += 1
+            self._put(key, sprite)
+        return sprite
+
+    def draw(
+        self,
+        frame: np.ndarray,
+        text: str,
+        org: Tuple[int, int],
+        font_scale: float,
+        color: Tuple[int, int, int],
+        thickness: int = 2,
+    ):
+        """Sama seperti draw_text_with_outline(frame, text, org, ...)."""
+        key = (text, font_scale, tuple(color), thickness)
+        sprite = self._lookup(key)
+        if sprite is not None:
+            blit_sprite(frame, sprite, org)
+            return
+        if not _HAS_DIGIT_RE.search(text):
+            blit_sprite(frame, self.sprite(text, font_scale, color, thickness), org)
+            return
+
+        # Baris berangka: angka sering berganti tiap frame, jadi gambar
+        # langsung. Baru kalau teks yang sama muncul lagi, dijadikan sprite.
+        if key in self._seen:
+            del self._seen[key]
+            blit_sprite(frame, self.sprite(text, font_scale, color, thickness), org)
+            return
+
+        self._seen[key] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        put_text_outlined(frame, text, org, font_scale, color, thickness)
+        self.direct += 1
+
+    def stats(self) -> dict:
+        return {
+            "sprites": len(self._sprites),
+            "hits": self.hits,
+            "rasterized": self.rasterized,
+            "direct": self.direct,
+        }
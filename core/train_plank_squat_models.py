@@ -8,29 +8,74 @@ Training model Plank + Squat untuk Exercise-Correction repo.
     core/plank_model/train.csv
     core/squat_model/train.csv
 
+- Job (lihat DEFAULT_JOBS / --jobs): plank, squat_stage, squat_thresholds,
+  squat_stage_temporal, fused. Default berurutan di 1 proses; --parallel
+  menjalankan tiap job di worker process sendiri (thread TF dibatasi per
+  worker), log diberi tag [nama job] dan disimpan per job.
+
+    python train_plank_squat_models.py                       # semua job, berurutan
+    python train_plank_squat_models.py --parallel            # semua job bersamaan
+    python train_plank_squat_models.py --parallel --only plank squat_stage
+    python train_plank_squat_models.py --parallel --jobs my_jobs.json --workers 3
+
 - Output:
     core/plank_model/model/plank_mlp.h5
     core/plank_model/model/plank_mlp.tflite
+    core/plank_model/model/plank_mlp_{float,int8,fp16}.tflite
+    core/plank_model/model/plank_mlp.npz
+    core/plank_model/model/quantization_report.json
     core/plank_model/model/meta.json
     core/plank_model/model/plank_training_curve.png
     core/plank_model/model/plank_confusion_matrix.png
 
     core/squat_model/model/squat_stage_mlp.h5
     core/squat_model/model/squat_stage_mlp.tflite
+    core/squat_model/model/squat_stage_mlp_{float,int8,fp16}.tflite
+    core/squat_model/model/squat_stage_mlp.npz
+    core/squat_model/model/quantization_report.json
     core/squat_model/model/meta.json
     core/squat_model/model/squat_stage_training_curve.png
     core/squat_model/model/squat_stage_confusion_matrix.png
     core/squat_model/model/squat_thresholds.json
+
+    core/squat_model/model/squat_stage_temporal.h5
+    core/squat_model/model/squat_stage_temporal.tflite
+    core/squat_model/model/squat_stage_temporal_{float,int8,fp16}.tflite
+
+    core/fused_model/model/plank_squat_fused.h5
+    core/fused_model/model/plank_squat_fused.tflite
+    core/fused_model/model/meta.json
+    core/squat_model/model/meta_temporal.json
+    core/squat_model/model/squat_stage_temporal_training_curve.png
+    core/squat_model/model/squat_stage_temporal_confusion_matrix.png
+
+File .tflite utama = dynamic range quantization (default runtime). Varian
+float / int8 (full integer) / fp16 dibandingkan di quantization_report.json
+(accuracy & F1 val, ukuran, latency per invoke) + varian yang direkomendasikan.
+Fitur hasil parse CSV + feature engineering di-cache di core/feature_cache/
+(key = hash isi CSV + FEATURE_CODE_VERSION), input model.fit lewat tf.data
+(cache / shuffle / prefetch).
+File .npz = bobot Dense MLP untuk backend numpy di runtime; parity-nya
+terhadap varian float dicek di tests/test_numpy_backend.py.
 """
 
 import os
+import argparse
+import hashlib
 import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GroupShuffleSplit, train_test_split
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import (
     classification_report,
@@ -57,9 +102,11 @@ SQUAT_TRAIN_CSV = THIS_DIR / "squat_model" / "train.csv"
 
 PLANK_MODEL_DIR = THIS_DIR / "plank_model" / "model"
 SQUAT_MODEL_DIR = THIS_DIR / "squat_model" / "model"
+FUSED_MODEL_DIR = THIS_DIR / "fused_model" / "model"
 
 PLANK_MODEL_DIR.mkdir(parents=True, exist_ok=True)
 SQUAT_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+FUSED_MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
 
 # -------------------------
@@ -232,6 +279,9 @@ def add_plank_pose_features(df: pd.DataFrame) -> pd.DataFrame:
         "left_ankle", "right_ankle",
     ]
 
+    # Kolom baru dikumpulkan dulu lalu digabung sekali di akhir (pd.concat),
+    # bukan df[col] = ... satu per satu yang meng-copy / memecah block DataFrame.
+    new_cols = {}
     for joint in key_joints:
         jx = df[f"{joint}_x"].values
         jy = df[f"{joint}_y"].values
@@ -239,8 +289,8 @@ def add_plank_pose_features(df: pd.DataFrame) -> pd.DataFrame:
         x_rel = (jx - center_x) / body_scale
         y_rel = (jy - center_y) / body_scale
 
-        df[f"{joint}_x_rel"] = x_rel
-        df[f"{joint}_y_rel"] = y_rel
+        new_cols[f"{joint}_x_rel"] = x_rel
+        new_cols[f"{joint}_y_rel"] = y_rel
 
     # 3) Angle-based features (hip angle kiri & kanan, body_incline)
     # Sudut di hip kiri: shoulder_left - hip_left - ankle_left
@@ -255,8 +305,8 @@ def add_plank_pose_features(df: pd.DataFrame) -> pd.DataFrame:
         df["right_ankle_x"].values,    df["right_ankle_y"].values,
     )
 
-    df["left_hip_angle_deg"] = left_hip_angle
-    df["right_hip_angle_deg"] = right_hip_angle
+    new_cols["left_hip_angle_deg"] = left_hip_angle
+    new_cols["right_hip_angle_deg"] = right_hip_angle
 
     # Body incline angle: shoulder_mid - hip_mid - ankle_mid
     body_angle = _compute_angle(
@@ -264,14 +314,178 @@ def add_plank_pose_features(df: pd.DataFrame) -> pd.DataFrame:
         hip_mid_x,      hip_mid_y,
         ankle_mid_x,    ankle_mid_y,
     )
-    df["body_angle_deg"] = body_angle
+    new_cols["body_angle_deg"] = body_angle
 
     # 4) Normalisasi sudut -> 0..1
-    df["left_hip_angle_norm"] = df["left_hip_angle_deg"] / 180.0
-    df["right_hip_angle_norm"] = df["right_hip_angle_deg"] / 180.0
-    df["body_angle_norm"] = df["body_angle_deg"] / 180.0
+    new_cols["left_hip_angle_norm"] = left_hip_angle / 180.0
+    new_cols["right_hip_angle_norm"] = right_hip_angle / 180.0
+    new_cols["body_angle_norm"] = body_angle / 180.0
 
-    return df
+    df = df.drop(columns=list(new_cols), errors="ignore")
+    return pd.concat([df, pd.DataFrame(new_cols, index=df.index)], axis=1)
+
+
+# -------------------------
+# Varian TFLite + laporan kuantisasi
+# -------------------------
+
+# "dynamic" = file .tflite utama; varian lain disimpan sebagai <nama>_<varian>.tflite
+TFLITE_VARIANTS = ("float", "dynamic", "int8", "fp16")
+QUANT_REPORT_NAME = "quantization_report.json"
+# Jumlah sampel train untuk kalibrasi int8
+REPRESENTATIVE_SAMPLES = 300
+# Varian boleh direkomendasikan kalau accuracy val turun maksimal segini dari float
+MAX_ACCURACY_DROP = 0.005
+# Latency diukur seperti realtime: batch 1, 1 thread, invoke saja
+LATENCY_WARMUP = 50
+LATENCY_RUNS = 2000
+
+
+def tflite_variant_path(tflite_path: Path, variant: str) -> Path:
+    if variant == "dynamic":
+        return tflite_path
+    return tflite_path.with_name(f"{tflite_path.stem}_{variant}.tflite")
+
+
+def _quantize_input(x: np.ndarray, detail: dict) -> np.ndarray:
+    if detail["dtype"] == np.float32:
+        return x.astype(np.float32)
+    scale, zero_point = detail["quantization"]
+    info = np.iinfo(detail["dtype"])
+    return np.clip(np.rint(x / scale + zero_point), info.min, info.max).astype(detail["dtype"])
+
+
+def _dequantize_output(q: np.ndarray, detail: dict) -> np.ndarray:
+    if detail["dtype"] == np.float32:
+        return q
+    scale, zero_point = detail["quantization"]
+    return (q.astype(np.float32) - zero_point) * scale
+
+
+def evaluate_tflite(tflite_path: Path, X_val: np.ndarray, y_val: np.ndarray) -> dict:
+    """Accuracy / F1 val, ukuran file, dan latency per invoke untuk 1 file TFLite."""
+    # Accuracy: 1 invoke untuk seluruh X_val
+    interpreter = tf.lite.Interpreter(model_path=str(tflite_path), num_threads=1)
+    inp = interpreter.get_input_details()[0]
+    out = interpreter.get_output_details()[0]
+    interpreter.resize_tensor_input(inp["index"], [len(X_val), *X_val.shape[1:]])
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(inp["index"], _quantize_input(X_val, inp))
+    interpreter.invoke()
+    y_pred = np.argmax(_dequantize_output(interpreter.get_tensor(out["index"]), out), axis=1)
+
+    # Latency: interpreter baru dengan input (1, ...) seperti di realtime.
+    # invoke = invoke() saja; call = + quantize input / dequantize output
+    # (overhead tambahan varian int8 di sisi Python).
+    interpreter = tf.lite.Interpreter(model_path=str(tflite_path), num_threads=1)
+    interpreter.allocate_tensors()
+    inp = interpreter.get_input_details()[0]
+    out = interpreter.get_output_details()[0]
+    invoke_times = np.empty(LATENCY_RUNS)
+    call_times = np.empty(LATENCY_RUNS)
+    for i in range(LATENCY_WARMUP + LATENCY_RUNS):
+        t0 = time.perf_counter()
+        interpreter.set_tensor(inp["index"], _quantize_input(X_val[i % len(X_val)][None], inp))
+        t1 = time.perf_counter()
+        interpreter.invoke()
+        t2 = time.perf_counter()
+        _dequantize_output(interpreter.get_tensor(out["index"]), out)
+        if i >= LATENCY_WARMUP:
+            invoke_times[i - LATENCY_WARMUP] = t2 - t1
+            call_times[i - LATENCY_WARMUP] = time.perf_counter() - t0
+
+    return {
+        "size_bytes": tflite_path.stat().st_size,
+        "val_accuracy": round(float(np.mean(y_pred == y_val)), 4),
+        "f1_weighted": round(float(f1_score(y_val, y_pred, average="weighted")), 4),
+        "f1_macro": round(float(f1_score(y_val, y_pred, average="macro")), 4),
+        "invoke_us_p50": round(float(np.percentile(invoke_times, 50)) * 1e6, 2),
+        "invoke_us_mean": round(float(invoke_times.mean()) * 1e6, 2),
+        "call_us_p50": round(float(np.percentile(call_times, 50)) * 1e6, 2),
+    }
+
+
+def export_tflite_variants(
+    model: keras.Model,
+    model_dir: Path,
+    tflite_name: str,
+    X_train: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    exercise_name: str,
+    variants=TFLITE_VARIANTS,
+) -> dict:
+    """
+    Export varian TFLite di samping file utama (dynamic, sudah diexport), lalu
+    bandingkan semuanya. Laporan ditulis ke <model_dir>/quantization_report.json
+    dengan key = nama model (1 folder bisa berisi beberapa model).
+
+    recommended = varian dengan latency call p50 (invoke + konversi I/O)
+    terkecil yang accuracy val-nya turun maksimal MAX_ACCURACY_DROP dari float.
+    """
+    rng = np.random.default_rng(42)
+    n_rep = min(REPRESENTATIVE_SAMPLES, len(X_train))
+    representative = X_train[rng.choice(len(X_train), size=n_rep, replace=False)]
+
+    results = {}
+    for variant in variants:
+        path = tflite_variant_path(model_dir / tflite_name, variant)
+        if variant != "dynamic":
+            export_tflite(model, path, variant, representative_data=representative)
+        results[variant] = {"file": path.name, **evaluate_tflite(path, X_val, y_val)}
+
+    reference = results["float"] if "float" in results else next(iter(results.values()))
+    candidates = [
+        v for v, r in results.items()
+        if r["val_accuracy"] >= reference["val_accuracy"] - MAX_ACCURACY_DROP
+    ]
+    recommended = min(candidates, key=lambda v: results[v]["call_us_p50"])
+
+    print(f"\n[{exercise_name}] TFLite variants (val, batch 1 / 1 thread):")
+    print(f"  {'variant':<8} {'size KB':>8} {'acc':>7} {'F1 macro':>9} {'invoke us':>10} {'call us':>8}")
+    for variant, r in results.items():
+        mark = "  <- recommended" if variant == recommended else ""
+        print(
+            f"  {variant:<8} {r['size_bytes'] / 1024:>8.1f} {r['val_accuracy']:>7.4f} "
+            f"{r['f1_macro']:>9.4f} {r['invoke_us_p50']:>10.2f} {r['call_us_p50']:>8.2f}{mark}"
+        )
+
+    report_path = model_dir / QUANT_REPORT_NAME
+    report = {}
+    if report_path.exists():
+        with open(report_path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+    report[Path(tflite_name).stem] = {
+        "variants": results,
+        "recommended": recommended,
+        "max_accuracy_drop": MAX_ACCURACY_DROP,
+        "latency": {"batch": 1, "num_threads": 1, "runs": LATENCY_RUNS},
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[{exercise_name}] Saved quantization report to: {report_path}")
+
+    return report[Path(tflite_name).stem]
+
+
+# -------------------------
+# Bobot NumPy (backend numpy di runtime)
+# -------------------------
+
+
+def export_numpy_weights(model: keras.Model, npz_path: Path):
+    """
+    Kernel, bias, dan aktivasi tiap Dense -> .npz (Dropout tidak dipakai saat inference).
+    Parity dengan TFLite float dicek di tests/test_numpy_backend.py.
+    """
+    dense = [layer for layer in model.layers if isinstance(layer, layers.Dense)]
+    arrays = {"num_layers": np.array(len(dense))}
+    for i, layer in enumerate(dense):
+        kernel, bias = layer.get_weights()
+        arrays[f"kernel_{i}"] = kernel.astype(np.float32)
+        arrays[f"bias_{i}"] = bias.astype(np.float32)
+        arrays[f"activation_{i}"] = np.array(layer.activation.__name__)
+    np.savez(npz_path, **arrays)
 
 
 # -------------------------
@@ -299,11 +513,73 @@ def build_mlp_classifier(input_dim: int, num_classes: int) -> keras.Model:
     return model
 
 
-def load_and_prepare(csv_path: Path, exercise_name: str):
-    """Load CSV -> (df, X, y, feature_cols, label_encoder) dengan feature engineering opsional."""
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV not found: {csv_path}")
+def export_tflite(
+    model: keras.Model,
+    tflite_path: Path,
+    variant: str = "dynamic",
+    representative_data: np.ndarray | None = None,
+):
+    """
+    Convert Keras model -> TFLite.
+
+    variant:
+    - float  : tanpa kuantisasi
+    - dynamic: dynamic range quantization (weight int8, aktivasi float)
+    - int8   : full integer, input / output juga int8; butuh representative_data
+               (sampel fitur training) untuk kalibrasi range aktivasi
+    - fp16   : weight float16
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant != "float":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        if representative_data is None:
+            raise ValueError("Export int8 butuh representative_data (sampel fitur training).")
+
+        def representative_dataset():
+            for x in representative_data:
+                yield [x[None].astype(np.float32)]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif variant not in ("float", "dynamic"):
+        raise ValueError(f"Unknown TFLite variant: {variant}")
+
+    tflite_model = converter.convert()
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+
+
+# Naikkan kalau add_plank_pose_features / pemilihan kolom fitur berubah:
+# key cache ikut berubah, jadi cache lama tidak terpakai lagi.
+FEATURE_CODE_VERSION = 1
+# Cache fitur per (CSV, exercise): raw.npy (float64), X.npy (float32), labels.npy
+# + meta.json. Hapus folder ini untuk memaksa feature engineering ulang.
+FEATURE_CACHE_DIR = THIS_DIR / "feature_cache"
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def feature_cache_dir(csv_path: Path, exercise_name: str) -> Path:
+    """Folder cache: key = hash isi CSV + exercise + FEATURE_CODE_VERSION."""
+    key = hashlib.sha256(
+        f"{file_sha256(csv_path)}:{exercise_name}:{FEATURE_CODE_VERSION}".encode("utf-8")
+    ).hexdigest()[:16]
+    return FEATURE_CACHE_DIR / f"{exercise_name}-{key}"
+
 
+def _engineer_features(csv_path: Path, exercise_name: str):
+    """Parse CSV + feature engineering (tanpa cache)."""
     df = pd.read_csv(csv_path)
 
     if "label" not in df.columns:
@@ -311,6 +587,7 @@ def load_and_prepare(csv_path: Path, exercise_name: str):
 
     # Buang kolom 'Unnamed' kalau ada
     df = df[[c for c in df.columns if not c.lower().startswith("unnamed")]]
+    raw_cols = list(df.drop(columns="label").select_dtypes("number").columns)
 
     # 1) Feature engineering
     if exercise_name == "plank":
@@ -334,16 +611,117 @@ def load_and_prepare(csv_path: Path, exercise_name: str):
     if not feature_cols:
         raise ValueError("Tidak ada kolom fitur yang terdeteksi setelah feature engineering/selection.")
 
-    # 2) Ambil X, y, encode label
+    raw = df[raw_cols].astype("float64").values
     X = df[feature_cols].astype("float32").values
-    y_str = df["label"].astype(str).values
+    labels = np.asarray(df["label"].astype(str), dtype=str)
+    return raw_cols, raw, feature_cols, X, labels
+
+
+def load_features(csv_path: Path, exercise_name: str):
+    """
+    CSV -> (raw_cols, raw (N, R) float64, feature_cols, X (N, F) float32, labels (N,) str).
+
+    Hasil disimpan di FEATURE_CACHE_DIR; run berikutnya dengan isi CSV dan
+    FEATURE_CODE_VERSION yang sama cukup np.load, tanpa pandas.read_csv dan
+    feature engineering.
+    """
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+
+    cache_dir = feature_cache_dir(csv_path, exercise_name)
+    meta_path = cache_dir / "meta.json"
+    if meta_path.exists():
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        print(f"[{exercise_name}] Feature cache: {cache_dir.name} ({meta['num_samples']} samples)")
+        return (
+            meta["raw_columns"],
+            np.load(cache_dir / "raw.npy"),
+            meta["feature_columns"],
+            np.load(cache_dir / "X.npy"),
+            np.load(cache_dir / "labels.npy"),
+        )
+
+    raw_cols, raw, feature_cols, X, labels = _engineer_features(csv_path, exercise_name)
+
+    # Tulis ke folder sementara lalu rename: job paralel (--parallel) yang
+    # membaca CSV yang sama tidak pernah melihat cache setengah jadi.
+    tmp_dir = cache_dir.with_name(f"{cache_dir.name}.tmp-{os.getpid()}")
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    np.save(tmp_dir / "raw.npy", raw)
+    np.save(tmp_dir / "X.npy", X)
+    np.save(tmp_dir / "labels.npy", labels)
+    meta = {
+        "csv": str(csv_path),
+        "exercise": exercise_name,
+        "feature_code_version": FEATURE_CODE_VERSION,
+        "num_samples": len(X),
+        "raw_columns": raw_cols,
+        "feature_columns": feature_cols,
+    }
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    if _publish_feature_cache(tmp_dir, cache_dir):
+        print(f"[{exercise_name}] Saved feature cache to: {cache_dir}")
+    elif not meta_path.exists():
+        print(f"[{exercise_name}] [WARN] Feature cache tidak bisa disimpan ke: {cache_dir}")
+    return raw_cols, raw, feature_cols, X, labels
+
+
+def _publish_feature_cache(tmp_dir: Path, cache_dir: Path) -> bool:
+    """
+    Rename tmp_dir -> cache_dir (atomik). Aman kalau 2 proses (mis. job pose
+    dan fused di --parallel) menulis entry yang sama bersamaan: yang kalah
+    membuang tmp_dir-nya dan cache milik pemenang tetap utuh.
+    Return True kalau tmp_dir ini yang jadi cache.
+    """
+    for _ in range(2):
+        try:
+            # Target kosong ditimpa, target berisi -> OSError
+            os.rename(tmp_dir, cache_dir)
+            return True
+        except OSError:
+            if (cache_dir / "meta.json").exists():
+                # Proses lain sudah menulis cache yang sama lebih dulu
+                break
+            # Target berisi sisa yang tidak valid (tanpa meta.json): hapus, coba lagi
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    return False
 
+
+def load_and_prepare(csv_path: Path, exercise_name: str):
+    """Load CSV -> (df, X, y, feature_cols, label_encoder) dengan feature engineering opsional."""
+    raw_cols, raw, feature_cols, X, y_str = load_features(csv_path, exercise_name)
+
+    # df disusun dari array (cache hit / miss sama persis): kolom raw, kolom
+    # fitur engineered yang belum ada di raw, lalu label
+    df = pd.DataFrame(raw, columns=raw_cols)
+    extra = [i for i, c in enumerate(feature_cols) if c not in df.columns]
+    if extra:
+        df = pd.concat([df, pd.DataFrame(X[:, extra], columns=[feature_cols[i] for i in extra])], axis=1)
+    df["label"] = y_str
+
+    # 2) Encode label
     le = LabelEncoder()
     y = le.fit_transform(y_str)
 
     return df, X, y, feature_cols, le
 
 
+def make_dataset(x, y, batch_size: int, training: bool, sample_weight=None) -> tf.data.Dataset:
+    """
+    Input model.fit: cache -> shuffle (hanya train, tiap epoch) -> batch -> prefetch.
+    x / y / sample_weight boleh array atau dict per output (model fused).
+    """
+    tensors = (x, y) if sample_weight is None else (x, y, sample_weight)
+    ds = tf.data.Dataset.from_tensor_slices(tensors).cache()
+    if training:
+        n = len(x)
+        ds = ds.shuffle(n, seed=42, reshuffle_each_iteration=True)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
 def train_pose_classifier(
     csv_path: Path,
     model_dir: Path,
@@ -352,8 +730,13 @@ def train_pose_classifier(
     exercise_name: str,
     epochs: int = 80,
     batch_size: int = 64,
+    variants=TFLITE_VARIANTS,
+    verbose: int = 1,
 ):
-    """Training pose classifier (plank / squat_stage) + simpan model, meta, TFLite, dan plot."""
+    """
+    Training pose classifier (plank / squat_stage) + simpan model, meta, TFLite, dan plot.
+    variants: varian TFLite yang diexport + dibandingkan (kosong = hanya file utama).
+    """
     print(f"\n=== Training {exercise_name.upper()} model ===")
 
     df, X, y, feature_cols, le = load_and_prepare(csv_path, exercise_name=exercise_name)
@@ -378,12 +761,10 @@ def train_pose_classifier(
     ]
 
     history = model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_val, y_val),
+        make_dataset(X_train, y_train, batch_size, training=True),
+        validation_data=make_dataset(X_val, y_val, batch_size, training=False),
         epochs=epochs,
-        batch_size=batch_size,
-        verbose=1,
+        verbose=verbose,
         callbacks=callbacks,
     )
 
@@ -428,14 +809,19 @@ def train_pose_classifier(
     print(f"[{exercise_name}] Saved Keras model to: {keras_path}")
 
     # --- Export TFLite (dynamic range quantization) ---
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    tflite_model = converter.convert()
     tflite_path = model_dir / tflite_name
-    with open(tflite_path, "wb") as f:
-        f.write(tflite_model)
+    export_tflite(model, tflite_path)
     print(f"[{exercise_name}] Saved TFLite model to: {tflite_path}")
 
+    # --- Varian float / int8 / fp16 + laporan perbandingan ---
+    if variants:
+        export_tflite_variants(model, model_dir, tflite_name, X_train, X_val, y_val, exercise_name, variants)
+
+    # --- Bobot NumPy (backend numpy) ---
+    npz_path = tflite_path.with_suffix(".npz")
+    export_numpy_weights(model, npz_path)
+    print(f"[{exercise_name}] Saved NumPy weights to: {npz_path}")
+
     # --- Save meta (feature order + label mapping) ---
     label_mapping = {int(i): cls for i, cls in enumerate(le.classes_)}
     meta = {
@@ -451,6 +837,335 @@ def train_pose_classifier(
     return df, model, meta
 
 
+# -------------------------
+# Squat temporal stage model (sliding window)
+# -------------------------
+
+# Panjang window (frame berturut-turut) dan default interval invoke di realtime
+TEMPORAL_WINDOW = 8
+TEMPORAL_STRIDE = 4
+# train.csv = gabungan banyak klip pendek (1 label per klip). Perpindahan
+# landmark antar 2 baris berurutan di atas nilai ini dianggap batas klip.
+TEMPORAL_SEGMENT_JUMP = 0.05
+
+
+def split_sequence_segments(df: pd.DataFrame, y: np.ndarray, jump: float = TEMPORAL_SEGMENT_JUMP) -> np.ndarray:
+    """
+    Id segment per baris: baris berurutan dianggap 1 klip selama label sama
+    dan perpindahan x / y landmark maksimum antar baris < jump.
+    """
+    xy_cols = [c for c in df.columns if c.endswith("_x") or c.endswith("_y")]
+    xy = df[xy_cols].astype("float32").values
+    big_jump = np.abs(np.diff(xy, axis=0)).max(axis=1) >= jump
+    new_segment = big_jump | (y[1:] != y[:-1])
+    return np.concatenate([[0], np.cumsum(new_segment)])
+
+
+def make_temporal_windows(X: np.ndarray, y: np.ndarray, segments: np.ndarray, window: int):
+    """
+    Sliding window (stride 1) yang tidak melewati batas segment.
+    Return (Xw (M, window, F), yw (M,), group (M,)); label = label frame terakhir.
+    """
+    # segments naik monoton, jadi cukup cek frame pertama & terakhir window
+    starts = np.flatnonzero(segments[:len(X) - window + 1] == segments[window - 1:])
+    idx = starts[:, None] + np.arange(window)[None, :]
+    return X[idx], y[starts + window - 1], segments[starts]
+
+
+def build_temporal_classifier(window: int, num_features: int, num_classes: int) -> keras.Model:
+    """Conv1D kecil di atas window landmark (tanpa RNN, supaya tetap ringan di TFLite)."""
+    model = keras.Sequential(
+        [
+            layers.Input(shape=(window, num_features)),
+            layers.Conv1D(32, 3, activation="relu"),
+            layers.Conv1D(32, 3, activation="relu"),
+            layers.GlobalAveragePooling1D(),
+            layers.Dropout(0.25),
+            layers.Dense(num_classes, activation="softmax"),
+        ]
+    )
+
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=1e-3),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def train_temporal_stage_classifier(
+    csv_path: Path,
+    model_dir: Path,
+    keras_name: str,
+    tflite_name: str,
+    window: int = TEMPORAL_WINDOW,
+    stride: int = TEMPORAL_STRIDE,
+    epochs: int = 80,
+    batch_size: int = 64,
+    variants=TFLITE_VARIANTS,
+    verbose: int = 1,
+):
+    """
+    Training stage squat dari window frame berturut-turut (fitur per frame sama
+    dengan squat_stage MLP). Di realtime model ini dijalankan tiap `stride` frame
+    di atas ring buffer landmark (lihat TemporalStageClassifier).
+    """
+    exercise_name = "squat_stage_temporal"
+    print(f"\n=== Training {exercise_name.upper()} model (window {window}) ===")
+
+    df, X, y, feature_cols, le = load_and_prepare(csv_path, exercise_name="squat_stage")
+    segments = split_sequence_segments(df, y)
+    Xw, yw, groups = make_temporal_windows(X, y, segments, window)
+
+    num_classes = len(le.classes_)
+    print(f"Segments: {segments[-1] + 1}, windows: {len(Xw)}, num features: {X.shape[1]}")
+
+    # Split per segment: window yang overlap tidak boleh ada di train dan val sekaligus
+    splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    train_idx, val_idx = next(splitter.split(Xw, yw, groups))
+    X_train, X_val, y_train, y_val = Xw[train_idx], Xw[val_idx], yw[train_idx], yw[val_idx]
+
+    model = build_temporal_classifier(window, X.shape[1], num_classes)
+
+    callbacks = [
+        keras.callbacks.EarlyStopping(
+            monitor="val_accuracy", patience=10, restore_best_weights=True
+        ),
+        keras.callbacks.ReduceLROnPlateau(
+            monitor="val_loss", factor=0.5, patience=5, min_lr=1e-5
+        ),
+    ]
+
+    history = model.fit(
+        make_dataset(X_train, y_train, batch_size, training=True),
+        validation_data=make_dataset(X_val, y_val, batch_size, training=False),
+        epochs=epochs,
+        verbose=verbose,
+        callbacks=callbacks,
+    )
+
+    y_val_pred = np.argmax(model.predict(X_val, batch_size=batch_size, verbose=0), axis=1)
+    print(f"[{exercise_name}] F1-score (weighted): {f1_score(y_val, y_val_pred, average='weighted'):.4f}")
+    print(f"[{exercise_name}] F1-score (macro):    {f1_score(y_val, y_val_pred, average='macro'):.4f}")
+    print(classification_report(y_val, y_val_pred, target_names=le.classes_, digits=4))
+
+    plot_training_history(
+        history,
+        title=f"{exercise_name} - Training & Validation",
+        save_path=model_dir / f"{exercise_name}_training_curve.png",
+    )
+    plot_confusion_matrix(
+        y_val,
+        y_val_pred,
+        class_names=list(le.classes_),
+        title=f"{exercise_name} - Confusion Matrix (val)",
+        save_path=model_dir / f"{exercise_name}_confusion_matrix.png",
+    )
+
+    keras_path = model_dir / keras_name
+    model.save(keras_path)
+    print(f"[{exercise_name}] Saved Keras model to: {keras_path}")
+
+    tflite_path = model_dir / tflite_name
+    export_tflite(model, tflite_path)
+    print(f"[{exercise_name}] Saved TFLite model to: {tflite_path}")
+
+    if variants:
+        export_tflite_variants(model, model_dir, tflite_name, X_train, X_val, y_val, exercise_name, variants)
+
+    meta = {
+        "feature_columns": feature_cols,
+        "label_mapping": {int(i): cls for i, cls in enumerate(le.classes_)},
+        "window": window,
+        "stride": stride,
+    }
+    meta_path = model_dir / "meta_temporal.json"
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    print(f"[{exercise_name}] Saved meta to: {meta_path}")
+
+    return model, meta
+
+
+# -------------------------
+# Fused model: 1 trunk, head plank + head squat_stage
+# -------------------------
+
+FUSED_HEADS = ("plank", "squat_stage")
+
+
+def build_fused_classifier(input_dim: int, num_classes: dict) -> keras.Model:
+    """Trunk MLP bersama + 1 head softmax per exercise (nama output = nama head)."""
+    inputs = layers.Input(shape=(input_dim,))
+    x = layers.Dense(64, activation="relu")(inputs)
+    x = layers.Dropout(0.25)(x)
+    x = layers.Dense(32, activation="relu")(x)
+    x = layers.Dropout(0.25)(x)
+    outputs = {
+        head: layers.Dense(num_classes[head], activation="softmax", name=head)(x)
+        for head in FUSED_HEADS
+    }
+    model = keras.Model(inputs, outputs)
+
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=1e-3),
+        loss={head: "sparse_categorical_crossentropy" for head in FUSED_HEADS},
+        metrics={head: ["accuracy"] for head in FUSED_HEADS},
+    )
+    return model
+
+
+def _tflite_output_order(tflite_path: Path, model: keras.Model, x: np.ndarray) -> dict:
+    """
+    Urutan output TFLite tidak dijamin sama dengan urutan head Keras, jadi
+    dicocokkan lewat nilai prediksi pada sampel x. Return {head: output_index}.
+    """
+    expected = model.predict(x, verbose=0)
+    interpreter = tf.lite.Interpreter(model_path=str(tflite_path))
+    interpreter.resize_tensor_input(interpreter.get_input_details()[0]["index"], list(x.shape))
+    interpreter.allocate_tensors()
+    interpreter.set_tensor(interpreter.get_input_details()[0]["index"], x.astype(np.float32))
+    interpreter.invoke()
+    outputs = [interpreter.get_tensor(d["index"]) for d in interpreter.get_output_details()]
+
+    order = {}
+    for head in FUSED_HEADS:
+        errors = [
+            np.abs(out - expected[head]).max() if out.shape == expected[head].shape else np.inf
+            for out in outputs
+        ]
+        order[head] = int(np.argmin(errors))
+    if len(set(order.values())) != len(FUSED_HEADS):
+        raise RuntimeError(f"Output TFLite tidak bisa dicocokkan ke head: {order}")
+    return order
+
+
+def train_fused_classifier(
+    plank_csv: Path,
+    squat_csv: Path,
+    model_dir: Path,
+    keras_name: str = "plank_squat_fused.h5",
+    tflite_name: str = "plank_squat_fused.tflite",
+    epochs: int = 80,
+    batch_size: int = 64,
+    verbose: int = 1,
+):
+    """
+    1 model untuk plank + squat_stage: 1 invoke per frame untuk kedua hasil.
+
+    Input = fitur plank (engineered) lalu fitur squat_stage (raw), dihitung
+    untuk SEMUA baris dari kedua CSV. Baris plank hanya melatih head plank dan
+    sebaliknya (sample_weight 0 untuk head yang labelnya tidak ada).
+    """
+    exercise_name = "fused"
+    print(f"\n=== Training {exercise_name.upper()} model ({' + '.join(FUSED_HEADS)}) ===")
+
+    plank_df, X_plank, y_plank, plank_cols, plank_le = load_and_prepare(plank_csv, exercise_name="plank")
+    squat_df, X_squat, y_squat, squat_cols, squat_le = load_and_prepare(squat_csv, exercise_name="squat_stage")
+
+    # Fitur head lain untuk tiap dataset (kolom raw yang tidak ada diisi 0)
+    squat_on_plank = plank_df.reindex(columns=squat_cols, fill_value=0.0).astype("float32").values
+    _, _, plank_cols_on_squat, X_plank_on_squat, _ = load_features(squat_csv, "plank")
+    plank_on_squat = X_plank_on_squat[:, [plank_cols_on_squat.index(c) for c in plank_cols]]
+
+    X = np.vstack([
+        np.hstack([X_plank, squat_on_plank]),
+        np.hstack([plank_on_squat, X_squat]),
+    ])
+    n_plank, n_squat = len(X_plank), len(X_squat)
+    labels = {
+        "plank": np.concatenate([y_plank, np.zeros(n_squat, dtype=y_plank.dtype)]),
+        "squat_stage": np.concatenate([np.zeros(n_plank, dtype=y_squat.dtype), y_squat]),
+    }
+    weights = {
+        "plank": np.concatenate([np.ones(n_plank), np.zeros(n_squat)]).astype("float32"),
+        "squat_stage": np.concatenate([np.zeros(n_plank), np.ones(n_squat)]).astype("float32"),
+    }
+    encoders = {"plank": plank_le, "squat_stage": squat_le}
+    print(f"Samples: plank {n_plank}, squat {n_squat}, num features: {X.shape[1]}")
+
+    # Stratify per (dataset, label) supaya val berisi kedua exercise
+    strata = np.concatenate([y_plank, len(plank_le.classes_) + y_squat])
+    train_idx, val_idx = train_test_split(
+        np.arange(len(X)), test_size=0.2, random_state=42, stratify=strata
+    )
+
+    model = build_fused_classifier(X.shape[1], {h: len(encoders[h].classes_) for h in FUSED_HEADS})
+
+    callbacks = [
+        keras.callbacks.EarlyStopping(
+            monitor="val_loss", patience=10, restore_best_weights=True
+        ),
+        keras.callbacks.ReduceLROnPlateau(
+            monitor="val_loss", factor=0.5, patience=5, min_lr=1e-5
+        ),
+    ]
+
+    model.fit(
+        make_dataset(
+            X[train_idx],
+            {h: labels[h][train_idx] for h in FUSED_HEADS},
+            batch_size,
+            training=True,
+            sample_weight={h: weights[h][train_idx] for h in FUSED_HEADS},
+        ),
+        validation_data=make_dataset(
+            X[val_idx],
+            {h: labels[h][val_idx] for h in FUSED_HEADS},
+            batch_size,
+            training=False,
+            sample_weight={h: weights[h][val_idx] for h in FUSED_HEADS},
+        ),
+        epochs=epochs,
+        verbose=verbose,
+        callbacks=callbacks,
+    )
+
+    # --- Eval per head, hanya baris yang punya label head itu ---
+    preds = model.predict(X[val_idx], batch_size=batch_size, verbose=0)
+    for head in FUSED_HEADS:
+        own = weights[head][val_idx] > 0
+        y_true = labels[head][val_idx][own]
+        y_pred = np.argmax(preds[head][own], axis=1)
+        print(f"[{exercise_name}/{head}] F1-score (macro): {f1_score(y_true, y_pred, average='macro'):.4f}")
+        print(classification_report(y_true, y_pred, target_names=encoders[head].classes_, digits=4))
+        plot_confusion_matrix(
+            y_true,
+            y_pred,
+            class_names=list(encoders[head].classes_),
+            title=f"{exercise_name} {head} - Confusion Matrix (val)",
+            save_path=model_dir / f"{exercise_name}_{head}_confusion_matrix.png",
+        )
+
+    keras_path = model_dir / keras_name
+    model.save(keras_path)
+    print(f"[{exercise_name}] Saved Keras model to: {keras_path}")
+
+    tflite_path = model_dir / tflite_name
+    export_tflite(model, tflite_path)
+    print(f"[{exercise_name}] Saved TFLite model to: {tflite_path}")
+
+    output_order = _tflite_output_order(tflite_path, model, X[val_idx][:32])
+    meta = {
+        # Urutan input: fitur plank lalu fitur squat_stage
+        "feature_columns": plank_cols + squat_cols,
+        "heads": {
+            head: {
+                "feature_columns": plank_cols if head == "plank" else squat_cols,
+                "label_mapping": {int(i): cls for i, cls in enumerate(encoders[head].classes_)},
+                "output_index": output_order[head],
+            }
+            for head in FUSED_HEADS
+        },
+    }
+    meta_path = model_dir / "meta.json"
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    print(f"[{exercise_name}] Saved meta to: {meta_path}")
+
+    return model, meta
+
+
 # -------------------------
 # Squat thresholds (versi sederhana)
 # -------------------------
@@ -504,35 +1219,307 @@ def compute_squat_thresholds(df: pd.DataFrame) -> dict:
 
 
 # -------------------------
-# Main
+# Job training (sequential / paralel)
 # -------------------------
-
-def main():
-    # 1) Train Plank (menggunakan feature engineering khusus)
-    train_pose_classifier(
-        csv_path=PLANK_TRAIN_CSV,
-        model_dir=PLANK_MODEL_DIR,
-        keras_name="plank_mlp.h5",
-        tflite_name="plank_mlp.tflite",
-        exercise_name="plank",
+#
+# Setiap langkah training = 1 job {"name", "type", ...kwargs}. Exercise baru
+# cukup ditambah sebagai job "pose" di file --jobs (JSON), tanpa ubah kode.
+# Path relatif di kwargs (PATH_KEYS) dihitung dari folder script ini.
+
+DEFAULT_JOBS = [
+    {
+        "name": "plank",
+        "type": "pose",
+        "csv_path": "plank_model/train.csv",
+        "model_dir": "plank_model/model",
+        "keras_name": "plank_mlp.h5",
+        "tflite_name": "plank_mlp.tflite",
+        "exercise_name": "plank",
+    },
+    {
+        "name": "squat_stage",
+        "type": "pose",
+        "csv_path": "squat_model/train.csv",
+        "model_dir": "squat_model/model",
+        "keras_name": "squat_stage_mlp.h5",
+        "tflite_name": "squat_stage_mlp.tflite",
+        "exercise_name": "squat_stage",
+    },
+    {
+        "name": "squat_thresholds",
+        "type": "squat_thresholds",
+        "csv_path": "squat_model/train.csv",
+        "output": "squat_model/model/squat_thresholds.json",
+    },
+    {
+        "name": "squat_stage_temporal",
+        "type": "temporal",
+        "csv_path": "squat_model/train.csv",
+        "model_dir": "squat_model/model",
+        "keras_name": "squat_stage_temporal.h5",
+        "tflite_name": "squat_stage_temporal.tflite",
+    },
+    {
+        "name": "fused",
+        "type": "fused",
+        "plank_csv": "plank_model/train.csv",
+        "squat_csv": "squat_model/train.csv",
+        "model_dir": "fused_model/model",
+    },
+]
+
+PATH_KEYS = {"csv_path", "model_dir", "plank_csv", "squat_csv", "output"}
+TRAINING_LOG_DIR = THIS_DIR / "training_logs"
+
+
+def run_squat_thresholds_job(csv_path: Path, output: Path) -> dict:
+    """Threshold feet/knee squat dari CSV (fitur sama dengan job squat_stage, lewat cache)."""
+    df, _, _, _, _ = load_and_prepare(csv_path, exercise_name="squat_stage")
+    thresholds = compute_squat_thresholds(df)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(thresholds, f, indent=2)
+    print(f"[Squat] Saved thresholds to: {output}")
+    return {"output": str(output), **thresholds}
+
+
+def run_pose_job(**kwargs) -> dict:
+    _, _, meta = train_pose_classifier(**kwargs)
+    return {"tflite": str(kwargs["model_dir"] / kwargs["tflite_name"]), "labels": list(meta["label_mapping"].values())}
+
+
+def run_temporal_job(**kwargs) -> dict:
+    train_temporal_stage_classifier(**kwargs)
+    return {"tflite": str(kwargs["model_dir"] / kwargs["tflite_name"])}
+
+
+def run_fused_job(**kwargs) -> dict:
+    train_fused_classifier(**kwargs)
+    return {"model_dir": str(kwargs["model_dir"])}
+
+
+JOB_TYPES = {
+    "pose": run_pose_job,
+    "temporal": run_temporal_job,
+    "fused": run_fused_job,
+    "squat_thresholds": run_squat_thresholds_job,
+}
+
+
+def load_jobs(path: Path | None) -> list:
+    if path is None:
+        return DEFAULT_JOBS
+    with open(path, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nama job harus unik: {names}")
+    for job in jobs:
+        if job.get("type") not in JOB_TYPES:
+            raise ValueError(f"Job {job['name']}: type harus salah satu dari {list(JOB_TYPES)}")
+    return jobs
+
+
+def run_job(job: dict, verbose: int | None = None) -> dict:
+    """Jalankan 1 job di proses ini, return ringkasan (JSON-able)."""
+    kwargs = {k: v for k, v in job.items() if k not in ("name", "type")}
+    for key in PATH_KEYS & kwargs.keys():
+        kwargs[key] = THIS_DIR / kwargs[key]
+    if "model_dir" in kwargs:
+        kwargs["model_dir"].mkdir(parents=True, exist_ok=True)
+    if verbose is not None and job["type"] != "squat_thresholds":
+        kwargs.setdefault("verbose", verbose)
+
+    t0 = time.perf_counter()
+    result = JOB_TYPES[job["type"]](**kwargs)
+    return {"name": job["name"], "status": "ok", "seconds": round(time.perf_counter() - t0, 1), **result}
+
+
+def _pin_threads(num_threads: int):
+    """Batasi thread TF di worker (dipanggil sebelum op TF pertama)."""
+    tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def worker_main(job_json: str, result_path: Path, num_threads: int) -> int:
+    """Entry point worker (--run-job): 1 job, hasil ditulis ke result_path."""
+    _pin_threads(num_threads)
+    # verbose=2: 1 baris per epoch, progress bar \r tidak cocok untuk log bertag
+    result = run_job(json.loads(job_json), verbose=2)
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return 0
+
+
+def _cpu_slots(workers: int, threads: int) -> list:
+    """Core set terpisah per slot worker (Linux), None kalau core tidak cukup / tidak didukung."""
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * workers
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) < workers * threads:
+        return [None] * workers
+    return [set(cores[i * threads:(i + 1) * threads]) for i in range(workers)]
+
+
+def _run_worker(job: dict, threads: int, cores, log_dir: Path, print_lock: threading.Lock) -> dict:
+    """Jalankan 1 job di subprocess; output diberi tag [nama job] + disimpan ke <log_dir>/<nama>.log."""
+    name = job["name"]
+    env = dict(
+        os.environ,
+        PYTHONUNBUFFERED="1",
+        OMP_NUM_THREADS=str(threads),
+        TF_NUM_INTRAOP_THREADS=str(threads),
+        TF_NUM_INTEROP_THREADS="1",
     )
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = Path(tmp) / "result.json"
+        cmd = [
+            sys.executable, str(Path(__file__).resolve()),
+            "--run-job", json.dumps(job),
+            "--result", str(result_path),
+            "--threads-per-job", str(threads),
+        ]
+        t0 = time.perf_counter()
+        # Log dibuka dulu: kalau gagal, belum ada child yang ditinggal jalan
+        with open(log_dir / f"{name}.log", "w", encoding="utf-8") as log:
+            # Affinity di-set di child sebelum exec -> TF / BLAS hanya melihat core slot ini
+            proc = subprocess.Popen(
+                cmd,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace",
+                preexec_fn=(lambda: os.sched_setaffinity(0, cores)) if cores else None,
+            )
+            try:
+                for line in proc.stdout:
+                    log.write(line)
+                    with print_lock:
+                        print(f"[{name}] {line.rstrip()}", flush=True)
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                raise
+        returncode = proc.wait()
+
+        # wall_seconds = termasuk start proses + import TF, seconds = job saja
+        wall_seconds = round(time.perf_counter() - t0, 1)
+        if returncode == 0 and result_path.exists():
+            with open(result_path, "r", encoding="utf-8") as f:
+                return {**json.load(f), "wall_seconds": wall_seconds}
+    return {
+        "name": name,
+        "status": "failed",
+        "returncode": returncode,
+        "seconds": wall_seconds,
+        "wall_seconds": wall_seconds,
+        "log": str(log_dir / f"{name}.log"),
+    }
 
-    # 2) Train Squat stage model (fitur generik: semua kolom numerik selain label)
-    squat_df, _, _ = train_pose_classifier(
-        csv_path=SQUAT_TRAIN_CSV,
-        model_dir=SQUAT_MODEL_DIR,
-        keras_name="squat_stage_mlp.h5",
-        tflite_name="squat_stage_mlp.tflite",
-        exercise_name="squat_stage",
-    )
 
-    # 3) Hitung dan simpan threshold squat (feet/knee)
-    thresholds = compute_squat_thresholds(squat_df)
-    thresholds_path = SQUAT_MODEL_DIR / "squat_thresholds.json"
-    with open(thresholds_path, "w", encoding="utf-8") as f:
-        json.dump(thresholds, f, indent=2)
-    print(f"[Squat] Saved thresholds to: {thresholds_path}")
+def run_parallel(jobs: list, workers: int, threads: int, log_dir: Path) -> list:
+    """
+    Semua job di subprocess terpisah, maks `workers` sekaligus; waktu total
+    ~ job paling lambat (kalau workers >= jumlah job), bukan jumlah semua job.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    slots = _cpu_slots(workers, threads)
+    free_slots = list(range(workers))
+    slot_lock = threading.Lock()
+    print_lock = threading.Lock()
+
+    def run(job: dict) -> dict:
+        with slot_lock:
+            slot = free_slots.pop()
+        t0 = time.perf_counter()
+        try:
+            return _run_worker(job, threads, slots[slot], log_dir, print_lock)
+        except Exception as exc:
+            # Popen gagal, log tidak bisa ditulis, ...: job lain tetap jalan
+            # dan training_summary.json tetap ditulis
+            error = f"{type(exc).__name__}: {exc}"
+            with print_lock:
+                print(f"[{job['name']}] Worker gagal: {error}", flush=True)
+            return {
+                "name": job["name"],
+                "status": "failed",
+                "returncode": None,
+                "seconds": round(time.perf_counter() - t0, 1),
+                "error": error,
+            }
+        finally:
+            with slot_lock:
+                free_slots.append(slot)
+
+    pinned = "core terpisah per worker" if slots[0] else "tanpa pin core"
+    print(f"=== Parallel training: {len(jobs)} job, {workers} worker x {threads} thread ({pinned}) ===")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, jobs))
+
+
+def print_summary(results: list, wall_seconds: float):
+    print(f"\n=== Training summary (wall clock {wall_seconds:.1f}s) ===")
+    print(f"  {'job':<24} {'status':<7} {'job s':>8} {'process s':>10}")
+    for r in results:
+        process = f"{r['wall_seconds']:>9.1f}s" if "wall_seconds" in r else f"{'-':>10}"
+        print(f"  {r['name']:<24} {r['status']:<7} {r['seconds']:>7.1f}s {process}")
+
+
+# -------------------------
+# Main
+# -------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Training model plank / squat (+ temporal, fused, threshold).")
+    parser.add_argument("--jobs", type=Path, default=None,
+                        help="File JSON berisi list job (default: DEFAULT_JOBS, semua model repo ini).")
+    parser.add_argument("--only", nargs="+", default=None, help="Hanya job dengan nama ini.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Setiap job di worker process sendiri, jalan bersamaan.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Maks worker bersamaan untuk --parallel (default: jumlah job, maks jumlah CPU).")
+    parser.add_argument("--threads-per-job", type=int, default=None,
+                        help="Thread TF per worker (default: jumlah CPU / workers).")
+    parser.add_argument("--log-dir", type=Path, default=TRAINING_LOG_DIR,
+                        help="Log per job (<nama>.log) + training_summary.json untuk --parallel.")
+    # Internal: dipanggil run_parallel() untuk 1 worker
+    parser.add_argument("--run-job", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", type=Path, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.run_job is not None:
+        return worker_main(args.run_job, args.result, args.threads_per_job or 1)
+
+    jobs = load_jobs(args.jobs)
+    if args.only:
+        jobs = [job for job in jobs if job["name"] in args.only]
+    if not jobs:
+        print("Tidak ada job yang dijalankan.")
+        return 1
+
+    t0 = time.perf_counter()
+    if args.parallel:
+        cpus = os.cpu_count() or 1
+        # Default: 1 worker per job, maks jumlah CPU; --workers eksplisit dipakai apa adanya
+        workers = max(1, min(args.workers or min(len(jobs), cpus), len(jobs)))
+        threads = args.threads_per_job or max(1, cpus // min(workers, cpus))
+        results = run_parallel(jobs, workers, threads, args.log_dir)
+    else:
+        # Berurutan di proses ini (perilaku lama), error langsung dilempar
+        results = [run_job(job) for job in jobs]
+    wall_seconds = time.perf_counter() - t0
+
+    print_summary(results, wall_seconds)
+    if args.parallel:
+        summary_path = args.log_dir / "training_summary.json"
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump({"wall_seconds": round(wall_seconds, 1), "jobs": results}, f, indent=2)
+        print(f"Saved summary to: {summary_path}")
+    return 0 if all(r["status"] == "ok" for r in results) else 1
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
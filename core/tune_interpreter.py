@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Auto-tune interpreter TFLite untuk host ini.
+
+Setiap model .tflite diukur untuk semua kombinasi num_threads x XNNPACK
+(on / off) x ukuran batch, lalu setting terbaik disimpan ke profil
+interpreter_profiles/<hostname>-<arch>.json. TFLitePoseClassifier membaca
+profil host yang sedang jalan saat startup (lihat TFLITE RUNTIME di
+realtime_plank_squat_tflite.py), jadi tidak perlu flag tambahan.
+
+Per model, profil berisi:
+    single  threads + XNNPACK dengan p50 invoke batch 1 terkecil
+            -> interpreter realtime (predict() per frame)
+    batch   threads + XNNPACK + batch_size: batch terkecil yang us/frame-nya
+            paling banyak --batch-slack di atas us/frame terbaik
+            -> interpreter batch + ukuran chunk predict_batch()
+    results semua pengukuran (untuk dibandingkan antar host)
+
+Untuk MLP kecil seperti model di repo ini, overhead thread pool dan
+delegate bisa lebih besar dari komputasinya, jadi hasilnya beda per CPU.
+Model yang tidak ikut di-tune tetap memakai default runtime.
+
+Contoh:
+    python tune_interpreter.py                      # semua .tflite di */model/
+    python tune_interpreter.py --models squat_model/model/squat_stage_mlp.tflite
+    python tune_interpreter.py --threads 1 2 --batch-sizes 1 64 256
+    python tune_interpreter.py --dry-run            # hanya print, profil tidak ditulis
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from realtime_plank_squat_tflite import (
+    THIS_DIR,
+    create_interpreter,
+    get_interpreter_class,
+    host_id,
+    host_profile_path,
+)
+
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128, 512]
+
+# Batch terkecil yang us/frame-nya masih dalam (1 + slack) x yang terbaik:
+# batch lebih besar hanya menambah latency per chunk tanpa untung berarti.
+DEFAULT_BATCH_SLACK = 0.10
+
+
+def default_models() -> List[Path]:
+    return sorted(THIS_DIR.glob("*/model/*.tflite"))
+
+
+def default_threads() -> List[int]:
+    cpus = os.cpu_count() or 1
+    return sorted({n for n in (1, 2, 4, cpus) if n <= cpus})
+
+
+def random_input(shape, dtype, rng: np.random.Generator) -> np.ndarray:
+    """Input acak; latency MLP tidak bergantung nilai, cukup dtype + shape yang benar."""
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return rng.integers(info.min, info.max, size=shape, endpoint=True).astype(dtype)
+    return rng.normal(0.0, 0.5, size=shape).astype(dtype)
+
+
+def time_invoke(
+    model_path: Path,
+    num_threads: int,
+    xnnpack: bool,
+    batch_size: int,
+    iterations: int,
+    warmup: int,
+    rng: np.random.Generator,
+) -> float:
+    """p50 1x invoke (us) dengan input (batch_size, ...)."""
+    interp = create_interpreter(model_path, num_threads=num_threads, xnnpack=xnnpack)
+    inp = interp.get_input_details()[0]
+    shape = [batch_size, *inp["shape"][1:]]
+    interp.resize_tensor_input(inp["index"], shape)
+    interp.allocate_tensors()
+    interp.set_tensor(inp["index"], random_input(shape, inp["dtype"], rng))
+
+    for _ in range(warmup):
+        interp.invoke()
+    samples = np.empty(iterations, dtype=np.float64)
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        interp.invoke()
+        samples[i] = time.perf_counter() - t0
+    return float(np.percentile(samples, 50) * 1e6)
+
+
+def tune_model(
+    model_path: Path,
+    threads: List[int],
+    batch_sizes: List[int],
+    iterations: int,
+    warmup: int,
+    batch_slack: float,
+    rng: np.random.Generator,
+) -> dict:
+    results = []
+    for batch_size in batch_sizes:
+        for num_threads in threads:
+            for xnnpack in (True, False):
+                us = time_invoke(model_path, num_threads, xnnpack, batch_size, iterations, warmup, rng)
+                results.append({
+                    "batch_size": batch_size,
+                    "num_threads": num_threads,
+                    "xnnpack": xnnpack,
+                    "us_p50": round(us, 2),
+                    "us_per_frame": round(us / batch_size, 3),
+                })
+                print(
+                    f"  batch {batch_size:>4} threads {num_threads:>2} "
+                    f"xnnpack {'on ' if xnnpack else 'off'} {us:>10.1f} us "
+                    f"({us / batch_size:>8.2f} us/frame)"
+                )
+
+    single_candidates = [r for r in results if r["batch_size"] == 1] or results
+    best_single = min(single_candidates, key=lambda r: r["us_p50"])
+    best_per_frame = min(r["us_per_frame"] for r in results)
+    best_batch = min(
+        (r for r in results if r["us_per_frame"] <= best_per_frame * (1.0 + batch_slack)),
+        key=lambda r: (r["batch_size"], r["us_per_frame"]),
+    )
+    return {
+        "single": {
+            "num_threads": best_single["num_threads"],
+            "xnnpack": best_single["xnnpack"],
+            "us_p50": best_single["us_p50"],
+        },
+        "batch": {
+            "num_threads": best_batch["num_threads"],
+            "xnnpack": best_batch["xnnpack"],
+            "batch_size": best_batch["batch_size"],
+            "us_per_frame": best_batch["us_per_frame"],
+        },
+        "results": results,
+    }
+
+
+def host_info() -> dict:
+    return {
+        "host": host_id(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "runtime": get_interpreter_class().__module__,
+    }
+
+
+def load_profile(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tune num_threads / XNNPACK / batch size interpreter TFLite per host."
+    )
+    parser.add_argument("--models", type=Path, nargs="+", default=None,
+                        help="File .tflite yang di-tune (default: semua */model/*.tflite).")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="Kandidat num_threads (default: 1, 2, 4, jumlah CPU).")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--iterations", type=int, default=300, help="Jumlah invoke terukur per kombinasi.")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--batch-slack", type=float, default=DEFAULT_BATCH_SLACK)
+    parser.add_argument("--output", type=Path, default=None,
+                        help="File profil (default: interpreter_profiles/<host>.json, dibaca otomatis saat startup).")
+    parser.add_argument("--dry-run", action="store_true", help="Jangan tulis profil.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    models = args.models or default_models()
+    threads = sorted(set(args.threads or default_threads()))
+    batch_sizes = sorted(set(args.batch_sizes))
+    if not models:
+        print("Tidak ada model .tflite, jalankan training dulu.")
+        return 1
+    missing = [m for m in models if not m.exists()]
+    if missing:
+        print(f"Model tidak ditemukan: {', '.join(str(m) for m in missing)}")
+        return 1
+
+    info = host_info()
+    print(
+        f"=== Interpreter tuning: host {info['host']} ({info['cpu_count']} CPU, {info['runtime']}) ===\n"
+        f"threads {threads}, batch sizes {batch_sizes}, {args.iterations} invokes/kombinasi"
+    )
+
+    rng = np.random.default_rng(0)
+    tuned: Dict[str, dict] = {}
+    for model_path in models:
+        print(f"\n[{model_path.name}]")
+        tuned[model_path.name] = tune_model(
+            model_path, threads, batch_sizes, args.iterations, args.warmup, args.batch_slack, rng
+        )
+
+    print(f"\n{'model':<34} {'single':>24} {'batch':>30}")
+    for name, res in tuned.items():
+        s, b = res["single"], res["batch"]
+        single = f"t{s['num_threads']} xnn {'on' if s['xnnpack'] else 'off'} {s['us_p50']:.1f}us"
+        batch = (
+            f"b{b['batch_size']} t{b['num_threads']} xnn {'on' if b['xnnpack'] else 'off'} "
+            f"{b['us_per_frame']:.2f}us/f"
+        )
+        print(f"{name:<34} {single:>24} {batch:>30}")
+
+    if args.dry_run:
+        return 0
+
+    # Model yang tidak ikut di-tune kali ini tetap disimpan dari profil lama
+    path = args.output or host_profile_path()
+    profile = load_profile(path) or {}
+    if profile.get("host") not in (None, info):
+        print("\n[WARN] Profil lama dibuat dengan host / runtime berbeda, model lama tetap disimpan.")
+    profile["host"] = info
+    profile.setdefault("models", {}).update(tuned)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+        f.write("\n")
+    print(f"\nProfil disimpan ke: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())